@@ -81,11 +81,13 @@ class Unreal(juniper.engine.JuniperEngine):
 
     def initialize_tick(self):
         import unreal
+        import juniper.engine.tick
 
         def slate_tick(delta_seconds):
             self.__tick__()
 
         self.slate_tick_handle = unreal.register_slate_post_tick_callback(slate_tick)
+        juniper.engine.tick.TickScheduler().attach()
 
     def on_post_startup(self):
         import unreal
@@ -13,12 +13,19 @@ from importlib.machinery import SourceFileLoader
 class Bootstrap(object):
     def __init__(self):
         # initialize the juniper_globals module
-        SourceFileLoader(
+        juniper_globals = SourceFileLoader(
             "juniper_globals",
             os.path.join(self.workspace_root, "Source\\Libs\\python\\juniper_globals.py")
         ).load_module("juniper_globals")
+        juniper_globals.set("workspace_root", self.workspace_root)
 
-        sys.path.insert(0, os.path.join(self.workspace_root, "Source\\Libs\\Python"))
+        # import the juniper libraries from the library bundle when it is up to date - else from the loose tree
+        library_dir = os.path.join(self.workspace_root, "Source\\Libs\\Python")
+        library_bundle = self.library_bundle
+        if(library_bundle is not None):
+            juniper_globals.set("library_bundle", library_bundle)
+            library_dir = library_bundle.to_archive_path(library_dir)
+        sys.path.insert(0, library_dir)
 
         self.engine_override_class(bootstrap=True)
 
@@ -45,6 +52,23 @@ class Bootstrap(object):
             return json.load(f)["path"]
         return None
 
+    @property
+    def library_bundle(self):
+        """
+        Library bundles can be disabled with "juniper:library_bundle=false"
+        :return <LibraryBundle:bundle> The library bundle for the current host - None if it is disabled or out of date
+        """
+        if("juniper:library_bundle=false" in sys.argv or "juniper:install=true" in sys.argv):
+            return None
+        try:
+            bundle_module = SourceFileLoader(
+                "juniper_bundle",
+                os.path.join(self.workspace_root, "Source\\Libs\\python\\juniper\\bootstrap\\bundle.py")
+            ).load_module("juniper_bundle")
+            return bundle_module.LibraryBundle.find(self.workspace_root, self.program_context)
+        except Exception:
+            return None
+
     @property
     def engine_base_class(self):
         engine_script = os.path.join(
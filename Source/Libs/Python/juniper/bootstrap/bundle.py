@@ -0,0 +1,420 @@
+"""
+Zip bundle of the Juniper library directories for workspaces deployed to a network share
+
+Importing from the loose library tree costs a round trip to the share for every directory searched and every
+file opened. The bundle packs the workspace, host and module library directories into a single uncompressed zip
+(along with precompiled bytecode) which `zipimport` reads from one file handle.
+
+Each bundle is named from a content hash of the library trees (the relative path, size and mtime of every python file).
+Hashing the trees means listing every library directory - the cost the bundle is meant to avoid - so it is never done
+before the bundle is used. Instead a small manifest next to the bundles records the last bundle built for the host
+along with a cheap fingerprint of the library trees (see `get_library_fingerprint`). The bundle is only used while the
+fingerprint matches - else the loose tree is used - and the library trees are hashed on a background thread, building
+a new bundle for the next launch if the hash no longer matches.
+Deploy tooling should touch the deploy stamp ("<workspace>\\deploy.stamp") after updating the workspace, so in place
+edits below the top level packages are also picked up. Pass "juniper:library_bundle=false" while developing the libraries
+
+Previous bundles may still be imported from by running hosts (`zipimport` re-opens the bundle for every read, so this
+can not be detected) - so they are only removed once they have been superseded for `BUNDLE_GRACE_SECONDS`
+
+Note: Only python files are bundled, other files (Ie, ".ui" files) must be resolved from the workspace
+This module is loaded by the bootstrap before juniper is on `sys.path` - so it must only rely on vanilla Python
+"""
+import hashlib
+import importlib.util
+import json
+import marshal
+import os
+import struct
+import sys
+import threading
+import time
+import zipfile
+
+
+BUNDLE_VERSION = 1
+
+# number of seconds a superseded bundle is kept for hosts which are still running from it
+BUNDLE_GRACE_SECONDS = 7 * 24 * 60 * 60
+
+# file in the workspace root touched by deploy tooling - invalidates the bundles of every host
+DEPLOY_STAMP = "deploy.stamp"
+
+# directories which are never bundled
+PRUNED_DIRECTORIES = {"__pycache__", ".git", ".vscode"}
+
+# flags + source mtime + source size (see PEP 552)
+PYC_HEADER = struct.Struct("<III")
+
+
+def get_bundle_dir(workspace_root):
+    """
+    :param <str:workspace_root> The root directory of the Juniper workspace
+    :return <str:dir> The directory library bundles are saved to
+    """
+    return os.path.join(workspace_root, "Cached\\Bundles")
+
+
+def get_bundle_path(workspace_root, host, content_hash):
+    """
+    :param <str:workspace_root> The root directory of the Juniper workspace
+    :param <str:host> The name of the host (Ie, "max")
+    :param <str:content_hash> The content hash of the library directories
+    :return <str:path> The path to the library bundle
+    """
+    cache_tag = sys.implementation.cache_tag or "python"
+    return os.path.join(get_bundle_dir(workspace_root), f"libs_{host.lower()}_{cache_tag}_{content_hash[:16]}.zip")
+
+
+def get_manifest_path(bundle_path):
+    """
+    :param <str:bundle_path> The path to a library bundle
+    :return <str:path> The path to the manifest recording the current bundle for the same host and interpreter
+    """
+    return os.path.join(os.path.dirname(bundle_path), os.path.basename(bundle_path).rsplit("_", 1)[0] + ".json")
+
+
+def read_manifest(manifest_path):
+    """
+    :param <str:manifest_path> The path to a bundle manifest (see `get_manifest_path`)
+    :return <dict:manifest> The manifest data - empty if it does not exist or failed to load
+    """
+    try:
+        with open(manifest_path, "r") as f:
+            return json.load(f)
+    except Exception:
+        return {}
+
+
+def get_library_dirs(workspace_root, host):
+    """
+    Gets the library directories which are bundled for a host
+    :param <str:workspace_root> The root directory of the Juniper workspace
+    :param <str:host> The name of the host (Ie, "max")
+    :return <[(str, str)]:dirs> List of (archive directory, library directory)
+    """
+    output = [("core", os.path.join(workspace_root, "Source\\Libs\\Python"))]
+    if(host and host.lower() != "python"):
+        output.append(("host", os.path.join(workspace_root, "Source\\Hosts", host, "Source\\Libs\\Python")))
+
+    modules_dir = os.path.join(workspace_root, "Source\\Modules")
+    try:
+        module_names = sorted(x.name for x in os.scandir(modules_dir) if x.is_dir())
+    except OSError:
+        module_names = []
+    for module_name in module_names:
+        output.append((f"modules/{module_name}", os.path.join(modules_dir, module_name, "Source\\Libs\\Python")))
+
+    return [x for x in output if os.path.isdir(x[1])]
+
+
+def get_library_files(library_dirs):
+    """
+    Lists every python file in the library directories
+    :param <[(str, str)]:library_dirs> List of (archive directory, library directory)
+    :return <[(str, str, int, int)]:files> Sorted list of (archive name, file path, size, mtime in nanoseconds)
+    """
+    output = []
+    for archive_dir, library_dir in library_dirs:
+        stack = [(library_dir, archive_dir)]
+        while(stack):
+            directory, archive_path = stack.pop()
+            try:
+                entries = list(os.scandir(directory))
+            except OSError:
+                continue
+
+            for entry in entries:
+                try:
+                    if(entry.is_dir()):
+                        if(entry.name not in PRUNED_DIRECTORIES):
+                            stack.append((entry.path, f"{archive_path}/{entry.name}"))
+                    elif(entry.name.endswith(".py")):
+                        # the stat result of a scandir entry comes from the directory listing on Windows
+                        stat = entry.stat()
+                        output.append((f"{archive_path}/{entry.name}", entry.path, stat.st_size, stat.st_mtime_ns))
+                except OSError:
+                    continue
+
+    return sorted(output)
+
+
+def get_library_fingerprint(workspace_root, library_dirs):
+    """
+    Gets a cheap signal for changes to the library directories - checked before a bundle is used
+    This is the mtime of the deploy stamp, each library directory and the packages directly within it - so only one
+    directory listing per library directory is needed
+    :param <str:workspace_root> The root directory of the Juniper workspace
+    :param <[(str, str)]:library_dirs> List of (archive directory, library directory)
+    :return <dict:fingerprint> Dict of path -> mtime in nanoseconds (None if the path does not exist)
+    """
+    output = {}
+    stamp_path = os.path.join(workspace_root, DEPLOY_STAMP)
+    try:
+        output[stamp_path] = os.stat(stamp_path).st_mtime_ns
+    except OSError:
+        output[stamp_path] = None
+
+    for _, library_dir in library_dirs:
+        try:
+            output[library_dir] = os.stat(library_dir).st_mtime_ns
+            for entry in os.scandir(library_dir):
+                if(entry.is_dir() and entry.name not in PRUNED_DIRECTORIES):
+                    output[entry.path] = entry.stat().st_mtime_ns
+        except OSError:
+            output[library_dir] = None
+
+    return output
+
+
+def get_content_hash(library_files):
+    """
+    :param <[(str, str, int, int)]:library_files> The library files (see `get_library_files`)
+    :return <str:hash> The content hash of the library files for the current interpreter
+    """
+    output = hashlib.sha1(f"{BUNDLE_VERSION}:{importlib.util.MAGIC_NUMBER.hex()}".encode("utf-8"))
+    for archive_name, _, size, mtime in library_files:
+        output.update(f"|{archive_name}:{size}:{mtime}".encode("utf-8"))
+    return output.hexdigest()
+
+
+def get_date_time(mtime_ns):
+    """
+    :param <int:mtime_ns> The mtime of a file in nanoseconds
+    :return <tuple:date_time> The mtime as a zip date time - rounded down to the 2 second resolution of zip files
+    """
+    local_time = time.localtime(max(mtime_ns // 1000000000, 315532800))  # 1980-01-01 is the earliest zip date
+    return (
+        max(local_time.tm_year, 1980), local_time.tm_mon, local_time.tm_mday,
+        local_time.tm_hour, local_time.tm_min, local_time.tm_sec - local_time.tm_sec % 2
+    )
+
+
+class LibraryBundle(object):
+    def __init__(self, bundle_path, library_dirs):
+        """
+        A built library bundle
+        :param <str:bundle_path> The path to the bundle
+        :param <[(str, str)]:library_dirs> List of (archive directory, library directory) within the bundle
+        """
+        self.path = bundle_path
+        self.library_dirs = [(x, os.path.normpath(y)) for x, y in library_dirs]
+
+    def __repr__(self):
+        return f"LibraryBundle(\"{self.path}\")"
+
+    @classmethod
+    def find(cls, workspace_root, host, build=True):
+        """
+        Finds the bundle for the library directories - the bundle recorded in the manifest is used without hashing
+        the library directories if their fingerprint still matches (see `get_library_fingerprint`). The library
+        directories are hashed on a background thread instead (see `validate`)
+        :param <str:workspace_root> The root directory of the Juniper workspace
+        :param <str:host> The name of the host (Ie, "max")
+        :param [<bool:build>] If True the bundle is validated / built in the background
+        :return <LibraryBundle:bundle> The bundle - None if no bundle has been built yet or it is out of date
+        """
+        library_dirs = get_library_dirs(workspace_root, host)
+        output = None
+
+        manifest_path = get_manifest_path(get_bundle_path(workspace_root, host, ""))
+        manifest = read_manifest(manifest_path)
+        try:
+            bundle_path = os.path.join(os.path.dirname(manifest_path), manifest["bundle"])
+            if(
+                manifest.get("version") == BUNDLE_VERSION and
+                [tuple(x) for x in manifest.get("library_dirs", [])] == library_dirs and
+                manifest.get("fingerprint") == get_library_fingerprint(workspace_root, library_dirs) and
+                os.path.isfile(bundle_path)
+            ):
+                output = cls(bundle_path, library_dirs)
+        except Exception:
+            pass
+
+        if(build):
+            threading.Thread(
+                target=cls.validate,
+                args=(workspace_root, host, library_dirs, output.path if output is not None else None),
+                name="JuniperLibraryBundle",
+                daemon=True
+            ).start()
+        return output
+
+    @classmethod
+    def validate(cls, workspace_root, host, library_dirs, current_path=None):
+        """
+        Hashes the library directories - building a new bundle if the current bundle is out of date
+        :param <str:workspace_root> The root directory of the Juniper workspace
+        :param <str:host> The name of the host (Ie, "max")
+        :param <[(str, str)]:library_dirs> List of (archive directory, library directory) to bundle
+        :param [<str:current_path>] The path to the bundle in use - None if the loose tree is used
+        :return <LibraryBundle:bundle> The bundle for the current state of the library directories - None if it failed to build
+        """
+        # fingerprinted before the files are listed - so any change while hashing invalidates the manifest
+        fingerprint = get_library_fingerprint(workspace_root, library_dirs)
+        library_files = get_library_files(library_dirs)
+        bundle_path = get_bundle_path(workspace_root, host, get_content_hash(library_files))
+        if(os.path.isfile(bundle_path)):
+            if(bundle_path != current_path or read_manifest(get_manifest_path(bundle_path)).get("fingerprint") != fingerprint):
+                cls.write_manifest(bundle_path, library_dirs, fingerprint)
+            return cls(bundle_path, library_dirs)
+        return cls.build(bundle_path, library_dirs, fingerprint, library_files=library_files)
+
+    @classmethod
+    def write_manifest(cls, bundle_path, library_dirs, fingerprint):
+        """
+        Records a bundle as the current bundle for its host and interpreter - and removes any expired bundles
+        :param <str:bundle_path> The path to the bundle
+        :param <[(str, str)]:library_dirs> List of (archive directory, library directory) within the bundle
+        :param <dict:fingerprint> The fingerprint of the library directories the bundle was built from
+        """
+        manifest_path = get_manifest_path(bundle_path)
+        superseded = cls.clean(bundle_path, read_manifest(manifest_path).get("superseded", {}))
+        temp_path = f"{manifest_path}.{os.getpid()}.tmp"
+        try:
+            with open(temp_path, "w") as f:
+                json.dump({
+                    "version": BUNDLE_VERSION,
+                    "bundle": os.path.basename(bundle_path),
+                    "library_dirs": library_dirs,
+                    "fingerprint": fingerprint,
+                    "superseded": superseded
+                }, f)
+            os.replace(temp_path, manifest_path)
+        except Exception:
+            try:
+                os.remove(temp_path)
+            except OSError:
+                pass
+
+    @classmethod
+    def build(cls, bundle_path, library_dirs, fingerprint, library_files=None):
+        """
+        Builds a bundle - written to a temp file first so another host never reads a partial bundle.
+        The bundle is recorded in the manifest and any expired bundles for the same host are removed (see `clean`)
+        :param <str:bundle_path> The path to save the bundle to
+        :param <[(str, str)]:library_dirs> List of (archive directory, library directory) to bundle
+        :param <dict:fingerprint> The fingerprint of the library directories - taken before the files are listed
+            (see `get_library_fingerprint`)
+        :param [<[(str, str, int, int)]:library_files>] The library files - if None the library directories are listed
+        :return <LibraryBundle:bundle> The bundle - None if it failed to build
+        """
+        if(library_files is None):
+            library_files = get_library_files(library_dirs)
+
+        temp_path = f"{bundle_path}.{os.getpid()}.tmp"
+        try:
+            if(not os.path.isdir(os.path.dirname(bundle_path))):
+                os.makedirs(os.path.dirname(bundle_path))
+
+            # stored uncompressed - so modules are read straight from the archive without inflating them
+            with zipfile.ZipFile(temp_path, "w", compression=zipfile.ZIP_STORED) as archive:
+                archive.writestr("bundle.json", json.dumps({
+                    "version": BUNDLE_VERSION,
+                    "library_dirs": library_dirs,
+                    "files": len(library_files)
+                }))
+                for archive_name, file_path, _, mtime in library_files:
+                    cls.__write_module(archive, bundle_path, archive_name, file_path, mtime)
+            os.replace(temp_path, bundle_path)
+        except Exception:
+            try:
+                os.remove(temp_path)
+            except OSError:
+                pass
+            return None
+
+        cls.write_manifest(bundle_path, library_dirs, fingerprint)
+        return cls(bundle_path, library_dirs)
+
+    @staticmethod
+    def __write_module(archive, bundle_path, archive_name, file_path, mtime):
+        """
+        Writes a python file and its bytecode to the bundle
+        The bytecode stores the mtime `zipimport` reads for the source entry - so the bytecode is used without recompiling
+        :param <ZipFile:archive> The archive being written
+        :param <str:bundle_path> The path the bundle is saved to
+        :param <str:archive_name> The name of the python file in the archive
+        :param <str:file_path> The path to the python file
+        :param <int:mtime> The mtime of the python file in nanoseconds
+        """
+        with open(file_path, "rb") as f:
+            source = f.read()
+        date_time = get_date_time(mtime)
+        archive.writestr(zipfile.ZipInfo(archive_name, date_time), source)  # source is kept for tracebacks
+
+        try:
+            code = compile(source, os.path.join(bundle_path, *archive_name.split("/")), "exec", dont_inherit=True)
+        except SyntaxError:
+            return  # left to `zipimport` to raise when the module is imported
+
+        source_mtime = int(time.mktime(date_time + (0, 0, -1)))
+        archive.writestr(
+            zipfile.ZipInfo(f"{archive_name}c", date_time),
+            importlib.util.MAGIC_NUMBER + PYC_HEADER.pack(0, source_mtime & 0xFFFFFFFF, len(source) & 0xFFFFFFFF) +
+            marshal.dumps(code)
+        )
+
+    @staticmethod
+    def clean(bundle_path, superseded=None):
+        """
+        Removes the other bundles for the same host and interpreter which were superseded over `BUNDLE_GRACE_SECONDS` ago
+        A running host may still import from any previous bundle - so newly superseded bundles are only recorded
+        :param <str:bundle_path> The path to the current bundle
+        :param [<dict:superseded>] Dict of bundle name -> time it was first recorded as superseded (from the manifest)
+        :return <dict:superseded> The superseded bundles which were kept
+        """
+        superseded = superseded or {}
+        output = {}
+        prefix = os.path.basename(bundle_path).rsplit("_", 1)[0] + "_"
+        bundle_dir = os.path.dirname(bundle_path)
+        current_time = time.time()
+        try:
+            names = os.listdir(bundle_dir)
+        except OSError:
+            return output
+
+        for i in names:
+            if(not i.startswith(prefix) or not i.endswith(".zip") or i == os.path.basename(bundle_path)):
+                continue
+            superseded_time = superseded.get(i, current_time)
+            if(current_time - superseded_time > BUNDLE_GRACE_SECONDS):
+                try:
+                    os.remove(os.path.join(bundle_dir, i))
+                    continue
+                except OSError:
+                    pass
+            output[i] = superseded_time
+        return output
+
+    # ---------------------------------------------------------------------
+
+    def to_archive_path(self, path):
+        """
+        :param <str:path> The path to a library file / directory in the workspace
+        :return <str:path> The path within the bundle (Ie, "<bundle>.zip\\core\\juniper") - None if it is not bundled
+        """
+        path = os.path.normpath(path)
+        for archive_dir, library_dir in self.library_dirs:
+            if(os.path.normcase(path) == os.path.normcase(library_dir)):
+                return os.path.join(self.path, *archive_dir.split("/"))
+            if(os.path.normcase(path).startswith(os.path.normcase(library_dir) + os.sep)):
+                return os.path.join(self.path, *archive_dir.split("/"), path[len(library_dir) + 1:])
+        return None
+
+    def to_source_path(self, path):
+        """
+        Modules loaded from bytecode have their `__file__` set to the ".pyc" - which is mapped to its source file
+        :param <str:path> The path to a file / directory within the bundle
+        :return <str:path> The path to the file / directory in the workspace - None if it is not in the bundle
+        """
+        path = os.path.normpath(path)
+        if(path.endswith(".pyc")):
+            path = path[:-1]
+        for archive_dir, library_dir in self.library_dirs:
+            archive_path = os.path.join(self.path, *archive_dir.split("/"))
+            if(os.path.normcase(path) == os.path.normcase(archive_path)):
+                return library_dir
+            if(os.path.normcase(path).startswith(os.path.normcase(archive_path) + os.sep)):
+                return os.path.join(library_dir, path[len(archive_path) + 1:])
+        return None
@@ -1,17 +1,129 @@
 """
 :desc Validates all external PIP packages are installed
+
+The updater keeps the state of every installed requirement (the line in `requirements.txt` and the top level
+site-packages entries it installed). On each launch the current requirements are diffed against this state so only
+new / changed requirements are installed and removed requirements are uninstalled.
+Each requirement is installed into its own staging directory in parallel, then merged into site-packages.
+Staging directories are unique to each run - so hosts launched at the same time never remove each others installs.
+
+Wheels are kept in a wheelhouse under "Cached\\Wheels" (per Python ABI - pure python wheels are shared) so any host
+installing a requirement which has already been built installs it offline with `--no-index`.
 """
 import concurrent.futures
 import functools
-import hashlib
 import json
 import os
 import pathlib
+import re
 import shutil
 import subprocess
+import sysconfig
+import tempfile
 from subprocess import PIPE, run
 
 
+STATE_VERSION = 1
+
+# Setuptools can't be guarenteed to have been installed in all the host contexts
+# so it is always required - and installed before any other requirement
+BASE_REQUIREMENTS = ["setuptools"]
+
+
+def parse_requirements(file_path):
+    """
+    Reads the requirements from a `requirements.txt` file
+    :param <str:file_path> The path to the requirements file
+    :return <[str]:requirements> The requirement lines (Ie, ["numpy", "pythonnet==3.0.0a2; python_version >= \"3.9\""])
+    """
+    output = []
+    with open(file_path, "r") as f:
+        for line in f.readlines():
+            line = line.split(" #", 1)[0].strip()
+            if(line and not line.startswith("#") and line not in output):
+                output.append(line)
+    return output
+
+
+def get_requirement_name(requirement):
+    """
+    :param <str:requirement> A requirement line (Ie, "PySide2==5.15.2")
+    :return <str:name> The normalized name of the package (Ie, "pyside2")
+    """
+    match = re.match(r"\s*([A-Za-z0-9][A-Za-z0-9._-]*)", requirement)
+    return re.sub(r"[-_.]+", "-", match.group(1)).lower() if match else requirement
+
+
+def is_replaced_entry(directory):
+    """
+    :param <str:directory> A top level directory installed to site-packages
+    :return <bool:replaced> True if the directory belongs to a single distribution so is replaced as a whole when merged -
+        False for shared directories (Ie, "bin" or namespace packages) which are merged file by file
+    """
+    return (
+        directory.endswith((".dist-info", ".egg-info", ".data", ".libs")) or
+        os.path.isfile(os.path.join(directory, "__init__.py"))
+    )
+
+
+def remove_trash(directory):
+    """
+    Removes the previous versions of replaced directories which could not be removed when they were merged
+    (Ie, a file in them was still in use)
+    :param <str:directory> The directory entries were merged into
+    """
+    try:
+        entries = list(os.scandir(directory))
+    except OSError:
+        return
+    for entry in entries:
+        if(re.search(r"\.\d+\.old$", entry.name)):
+            remove_path(entry.path)
+
+
+def remove_path(path):
+    """
+    Removes a file / directory
+    :param <str:path> The path to remove
+    """
+    if(os.path.isdir(path) and not os.path.islink(path)):
+        shutil.rmtree(path, ignore_errors=True)
+    elif(os.path.lexists(path)):
+        os.remove(path)
+
+
+def merge_directory(source_dir, destination_dir):
+    """
+    Moves all entries from a staging directory into a destination directory
+    Files and single distribution directories are moved with `os.replace` so an entry is never partially copied
+    Note: This raises an OSError if an entry is in use (Ie, a ".pyd" loaded by another host) - a replaced directory
+    is restored if its new version could not be moved into place
+    :param <str:source_dir> The staging directory
+    :param <str:destination_dir> The directory to merge into
+    """
+    if(not os.path.isdir(destination_dir)):
+        os.makedirs(destination_dir)
+
+    for entry in os.scandir(source_dir):
+        destination_path = os.path.join(destination_dir, entry.name)
+        if(entry.is_dir() and not is_replaced_entry(entry.path) and os.path.isdir(destination_path)):
+            merge_directory(entry.path, destination_path)
+        elif(entry.is_dir() and os.path.isdir(destination_path)):
+            # swap the directories - the previous version is only removed once the new one is in place
+            trash_path = f"{destination_path}.{os.getpid()}.old"
+            os.replace(destination_path, trash_path)
+            try:
+                os.replace(entry.path, destination_path)
+            except OSError:
+                os.replace(trash_path, destination_path)
+                raise
+            remove_path(trash_path)
+        else:
+            if(os.path.isdir(destination_path)):
+                remove_path(destination_path)
+            os.replace(entry.path, destination_path)
+
+
 class Updater(object):
     def __init__(self, juniper_engine):
         """
@@ -22,47 +134,75 @@ class Updater(object):
     def run(self, force=False):
         """
         Installs the pip packages in "Config\\Python\\requirements.txt" for the current host Python version (Major/Minor)
+        Only requirements which have changed since the last run are installed / removed
         Note: We must use `pathlib.Path("Some/Path").resolve()` as pip can fail to install on subst drives
-        :param <bool:force> If True then the updater is force ran
+        :param <bool:force> If True then all requirements are reinstalled
+        :return <dict:changes> Dict containing the "installed", "removed" and "failed" requirements
         """
-        cached_requirements_hash = self.cached_requirements_hash
-        current_requirements_hash = self.current_requirements_hash
         site_packages_dir = self.juniper_engine.site_packages_dir
-        if(
-            not cached_requirements_hash or
-            cached_requirements_hash != current_requirements_hash or
-            not os.path.isdir(site_packages_dir) or
-            not len(os.listdir(site_packages_dir)) or
-            force
-        ):
-            python_path_resolved = pathlib.Path(self.juniper_engine.python_path).resolve()
-            requirements_txt_path_resolved = pathlib.Path(self.python_requirements_file_path).resolve()
-            pip_whl_path = pathlib.Path(self.pip_whl_path).resolve()
-
-            # Setuptools can't be guarenteed to have been installed in all the host contexts
-            # so install this first
-            cmd = f""""{python_path_resolved}" "{pip_whl_path}/pip" install setuptools -t {site_packages_dir}""".replace("\\", "/")
-            _ = run(cmd, stdout=PIPE, stderr=PIPE, universal_newlines=True)
-
-            # Package names
-            package_names = []
-            package_commands = []
-            with open(requirements_txt_path_resolved, "r") as f:
-                for line in f.readlines():
-                    if(line.strip() and not line.startswith("#")):
-                        package_names.append("TODO! Package names not provided - move to JSON")
-                        package_commands.append(line.strip().split("==")[0])
-
-
-            # TODO~ Juniper Engine: Updater - We need a way to prompt the user of an error on pip install
-            # Threaded pip install
-            with concurrent.futures.ThreadPoolExecutor(max_workers=len(package_names)) as executor:
-                futures = []
-                for package_name, package_commands in zip(package_names, package_commands):
-                    futures.append(executor.submit(self.install_pip_packages, package_name, [package_commands]))
+        installed = {} if force or not os.path.isdir(site_packages_dir) else self.installed_requirements
+        required = BASE_REQUIREMENTS + [x for x in parse_requirements(self.python_requirements_file_path) if x not in BASE_REQUIREMENTS]
+
+        # a requirement is reinstalled if any of the entries it installed are missing (Ie, deleted by hand)
+        to_install = [
+            x for x in required
+            if x not in installed or not all(os.path.lexists(os.path.join(site_packages_dir, y)) for y in installed[x])
+        ]
+        to_remove = [x for x in installed if x not in required]
+        output = {"installed": [], "removed": [], "failed": []}
+        if(not to_install and not to_remove):
+            return output
+
+        # Install each requirement into its own staging directory
+        # TODO~ Juniper Engine: Updater - We need a way to prompt the user of an error on pip install
+        staging_dir = self.create_staging_dir()
+        staged = {}
+        base_requirements = [x for x in to_install if x in BASE_REQUIREMENTS]
+        other_requirements = [x for x in to_install if x not in BASE_REQUIREMENTS]
+        for requirements in (base_requirements, other_requirements):
+            if(not requirements):
+                continue
+            with concurrent.futures.ThreadPoolExecutor(max_workers=min(len(requirements), os.cpu_count() or 4)) as executor:
+                futures = {}
+                for requirement in requirements:
+                    requirement_staging_dir = os.path.join(staging_dir, str(required.index(requirement)))
+                    futures[executor.submit(self.install_requirement, requirement, requirement_staging_dir)] = requirement
 
                 for future in concurrent.futures.as_completed(futures):
-                    results = future.result()
+                    requirement = futures[future]
+                    if(future.result()):
+                        staged[requirement] = os.path.join(staging_dir, str(required.index(requirement)))
+                    else:
+                        output["failed"].append(requirement)
+
+        # Merge the staged requirements (in requirements order - so later requirements take precedence)
+        # a requirement which fails to merge (Ie, its files are in use by another host) is retried on the next launch
+        try:
+            for requirement in [x for x in required if x in staged]:
+                try:
+                    entries = sorted(os.listdir(staged[requirement]))
+                    merge_directory(staged[requirement], site_packages_dir)
+                except OSError:
+                    output["failed"].append(requirement)
+                    continue
+                installed[requirement] = entries
+                output["installed"].append(requirement)
+            remove_path(staging_dir)
+            remove_trash(site_packages_dir)
+
+            # Remove entries which are no longer owned by any requirement
+            # requirements which failed to upgrade keep their previous version
+            failed_names = {get_requirement_name(x) for x in output["failed"]}
+            to_remove = [x for x in to_remove if get_requirement_name(x) not in failed_names]
+            owned_entries = {y for x, entries in installed.items() if x not in to_remove for y in entries}
+            for requirement in to_remove:
+                for entry in installed.pop(requirement):
+                    if(entry not in owned_entries):
+                        try:
+                            remove_path(os.path.join(site_packages_dir, entry))
+                        except OSError:
+                            pass
+                output["removed"].append(requirement)
 
             # Copy the Python3.dll to the shiboken2 directory in site packages
             # this will fix the issues with launching PySide2 within certain applications
@@ -73,9 +213,14 @@ class Updater(object):
                 "python3.dll"
             )
             if(os.path.isfile(dll_path) and os.path.isdir(shiboken_site_packages_dir)):
-                shutil.copyfile(dll_path, os.path.join(shiboken_site_packages_dir, "python3.dll"))
-
-            self.update_requirements_hash()
+                try:
+                    shutil.copyfile(dll_path, os.path.join(shiboken_site_packages_dir, "python3.dll"))
+                except OSError:
+                    pass
+        finally:
+            # the state is always written for the requirements which were merged
+            self.update_installed_requirements(installed)
+        return output
 
     @property
     @functools.lru_cache()
@@ -88,10 +233,28 @@ class Updater(object):
     @property
     def python_requirements_cache(self):
         """
-        :return <str:path> The path to the requirements hash json file
+        :return <str:path> The path to the installed requirements json file
         """
-        return os.path.join(self.juniper_engine.workspace_root, "Cached\\PyCache\\requirements_hashes.json")
-    
+        return os.path.join(self.juniper_engine.workspace_root, "Cached\\PyCache\\requirements_state.json")
+
+    @property
+    def python_key(self):
+        """
+        :return <str:key> The key for the current Python version (Ie, "Python3.7")
+        """
+        return f"Python{self.juniper_engine.python_version_major}.{self.juniper_engine.python_version_minor}"
+
+    def create_staging_dir(self):
+        """
+        Creates a new directory requirements are installed to before being merged into site-packages
+        This is unique to the current run and on the same drive as site-packages so entries can be moved rather than copied
+        :return <str:dir> The staging directory
+        """
+        staging_root = os.path.dirname(self.juniper_engine.site_packages_dir)
+        if(not os.path.isdir(staging_root)):
+            os.makedirs(staging_root, exist_ok=True)
+        return tempfile.mkdtemp(prefix=f"staging.{os.getpid()}.", dir=staging_root)
+
     @property
     def pip_whl_path(self):
         """
@@ -105,78 +268,129 @@ class Updater(object):
         :return <dict:cache> The current cached data for the requirements.txt
         """
         if(os.path.isfile(self.python_requirements_cache)):
-            with open(self.python_requirements_cache, "r") as f:
-                return json.load(f)
-        return {}
+            try:
+                with open(self.python_requirements_cache, "r") as f:
+                    json_data = json.load(f)
+                if(json_data.get("version") == STATE_VERSION):
+                    return json_data
+            except Exception:
+                pass
+        return {"version": STATE_VERSION}
 
-    def __get_file_hash(self, file_path):
+    @property
+    def installed_requirements(self):
         """
-        Generates a hash for a file
-        :param <str_file_path The file to get a hash for
-        :return <str:hash> The hash of the input file
+        :return <dict:requirements> Dict of requirement -> [top level site-packages entries] for the current Python version
         """
-        BLOCK_SIZE = 65536
-        file_hash = hashlib.sha256()
-        with open(file_path, 'rb') as f:
-            fb = f.read(BLOCK_SIZE)
-            while len(fb) > 0:
-                file_hash.update(fb)
-                fb = f.read(BLOCK_SIZE)
-        return str(file_hash.hexdigest())
+        return dict(self.requirements_cache.get(self.python_key, {}))
 
-    @property
-    def current_requirements_hash(self):
+    def update_installed_requirements(self, installed_requirements):
         """
-        :return <str:hash> The unique has for the current requirements.txt file
+        Updates the state of the installed requirements for the current Python version
+        Written to a temp file first so a host launched at the same time never reads a partial file
+        :param <dict:installed_requirements> Dict of requirement -> [top level site-packages entries]
         """
-        return self.__get_file_hash(self.python_requirements_file_path)
+        json_data = self.requirements_cache
+        json_data[self.python_key] = installed_requirements
 
-    @property
-    def cached_requirements_hash(self):
+        temp_path = f"{self.python_requirements_cache}.{os.getpid()}.tmp"
+        if(not os.path.isdir(os.path.dirname(temp_path))):
+            os.makedirs(os.path.dirname(temp_path))
+        with open(temp_path, "w") as f:
+            json.dump(json_data, f, indent=4)
+        os.replace(temp_path, self.python_requirements_cache)
+
+    def install_requirement(self, requirement, staging_dir):
         """
-        :return <str:hash> The unique hash for the most recently installed requirements.txt file
+        Installs a requirement (and its dependencies) into a staging directory
+        The requirement is installed offline from the wheelhouse when all of its wheels have already been built -
+        otherwise its wheels are downloaded / built into the wheelhouse first
+        :param <str:requirement> The requirement (Ie, "numpy==1.21.0")
+        :param <str:staging_dir> The directory to install to - must not exist
+        :return <bool:success> True if pip succeeded - else False
         """
-        python_key = f"Python{self.juniper_engine.python_version_major}.{self.juniper_engine.python_version_minor}"
-        requirements_cache = self.requirements_cache
-        if(python_key in requirements_cache):
-            return requirements_cache[python_key]
-        return None
+        install_args = ["install", requirement, "-t", staging_dir, "--no-index"] + self.find_links_args
+        try:
+            os.makedirs(staging_dir)
+            if(self.has_wheels and self.run_pip(install_args)):
+                return True
 
-    def update_requirements_hash(self):
+            remove_path(staging_dir)
+            os.makedirs(staging_dir)
+            wheel_dir = f"{staging_dir}.wheels"
+            if(not self.run_pip(["wheel", requirement, "-w", wheel_dir] + self.find_links_args)):
+                return False
+            self.add_wheels(wheel_dir)
+            return self.run_pip(install_args)
+        except Exception:
+            return False
+
+    def run_pip(self, args):
         """
-        Updates the `requirements_cache.json` file in the cached folder with the current
-        cache of the requirements.txt file
+        Runs pip for the current host Python
+        :param <[str]:args> The pip arguments - passed as a list as requirements may contain quotes (Ie, environment markers)
+        :return <bool:success> True if pip succeeded - else False
         """
-        json_data = self.requirements_cache
+        python_path_resolved = pathlib.Path(self.juniper_engine.python_path).resolve()
+        pip_whl_path = pathlib.Path(self.pip_whl_path).resolve()
+        result = run(
+            [str(python_path_resolved), f"{pip_whl_path}/pip"] + args + ["--no-cache-dir"],
+            stdout=PIPE,
+            stderr=PIPE,
+            universal_newlines=True,
+            creationflags=getattr(subprocess, "CREATE_NO_WINDOW", 0)
+        )
+        return result.returncode == 0
+
+    # ---------------------------------------------------------------------
+
+    @property
+    def abi_tag(self):
+        """
+        :return <str:tag> The ABI tag for the current host Python (Ie, "cp37-win_amd64")
+        """
+        platform = sysconfig.get_platform().replace("-", "_").replace(".", "_")
+        return f"cp{self.juniper_engine.python_version_major}{self.juniper_engine.python_version_minor}-{platform}"
 
-        python_key = f"Python{self.juniper_engine.python_version_major}.{self.juniper_engine.python_version_minor}"
-        json_data[python_key] = self.current_requirements_hash
+    @property
+    def wheelhouse_dir(self):
+        """
+        :return <str:dir> The directory wheels built for the current Python ABI are kept in
+        """
+        return os.path.join(self.juniper_engine.workspace_root, "Cached\\Wheels", self.abi_tag)
 
-        with open(self.python_requirements_cache, "w") as f:
-            json.dump(json_data, f)
+    @property
+    def universal_wheelhouse_dir(self):
+        """
+        :return <str:dir> The directory pure python wheels are kept in - these are shared by all Python versions
+        """
+        return os.path.join(self.juniper_engine.workspace_root, "Cached\\Wheels\\any")
 
-    def install_pip_packages(self, package_name, package_commands):
+    @property
+    def find_links_args(self):
+        """
+        :return <[str]:args> The pip arguments to resolve packages from the wheelhouse
         """
-        This will install a pip package from an array of input commands
+        return ["--find-links", self.wheelhouse_dir, "--find-links", self.universal_wheelhouse_dir]
 
-        Args:
-            package_name (str): The name of the package to install
-            package_commands (list): A list of commands to install the package
+    @property
+    def has_wheels(self):
         """
-        output = {
-            "package_name": package_name,
-            "package_commands": package_commands,
-            "full_command": None,
-            "success": True
-        }
-        pip_whl_path = self.pip_whl_path
-        site_packages_dir = self.juniper_engine.site_packages_dir
-        try:
-            for command in package_commands:
-                full_command = f"""{self.juniper_engine.python_path} "{pip_whl_path}/pip" install "{command}" -t "{site_packages_dir}" --no-cache-dir"""
-                output["full_command"] = full_command
-                run(full_command, stdout=PIPE, stderr=PIPE, universal_newlines=True, creationflags=subprocess.CREATE_NO_WINDOW)
-        except Exception as e:
-            output["success"] = False
+        :return <bool:has_wheels> True if any wheels have been built for the current Python ABI - else False
+        """
+        return os.path.isdir(self.wheelhouse_dir) or os.path.isdir(self.universal_wheelhouse_dir)
 
-        return output
+    def add_wheels(self, wheel_dir):
+        """
+        Moves built / downloaded wheels into the wheelhouse
+        Each wheel is moved with `os.replace` so a host installing at the same time never reads a partial wheel
+        :param <str:wheel_dir> The directory containing the wheels
+        """
+        for wheel_name in os.listdir(wheel_dir):
+            if(not wheel_name.endswith(".whl")):
+                continue
+            wheelhouse_dir = self.universal_wheelhouse_dir if wheel_name.endswith("-none-any.whl") else self.wheelhouse_dir
+            if(not os.path.isdir(wheelhouse_dir)):
+                os.makedirs(wheelhouse_dir, exist_ok=True)
+            os.replace(os.path.join(wheel_dir, wheel_name), os.path.join(wheelhouse_dir, wheel_name))
+        remove_path(wheel_dir)
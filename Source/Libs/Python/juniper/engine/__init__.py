@@ -1,23 +1,24 @@
 import functools
-import glob
 import importlib
 import importlib.util
 import json
 import os
 import sys
-from datetime import datetime
 from importlib.machinery import SourceFileLoader
 
 
 class JuniperEngine(object):
+    # the number of times per second `on_tick` is called - None uses the tick schedulers default rate
+    tick_rate = None
+
+    # True if the host console can be written to from the log writer thread (see `juniper.engine.logging.pipeline`)
+    thread_safe_console = False
 
     def __init__(self, bootstrap=False):
         """
         Base singleton class used for the Juniper engine.
         """
         # tick
-        self.delta_seconds = 0
-        self.time_cf = datetime.now()
         self.called_post_startup = False
         if(bootstrap):
             if("juniper:install=true" in sys.argv):
@@ -71,26 +72,31 @@ class JuniperEngine(object):
         run the startup process for Juniper in the current program context
         """
         sys.argv.remove("juniper:startup=true")
+        profiler = self.startup_profiler
+
         # 1) Initialize core juniper libraries
-        sys.path.insert(0, os.path.join(self.workspace_root, "Source\\Libs\\Python"))
+        with profiler.phase("sys_path"):
+            sys.path.insert(0, self.get_library_dir(os.path.join(self.workspace_root, "Source\\Libs\\Python")))
 
-        if(self.program_context != "python"):
-            sys.path.append(os.path.join(self.workspace_root, "Source\\Hosts", self.program_context, "Source\\Libs\\Python"))
+            if(self.program_context != "python"):
+                sys.path.append(self.get_library_dir(
+                    os.path.join(self.workspace_root, "Source\\Hosts", self.program_context, "Source\\Libs\\Python")
+                ))
 
-        site_packages_dir = os.path.join(
-            self.workspace_root,
-            f"Cached\\PyCache\\Python{self.python_version_major}.{self.python_version_minor}\\site-packages"
-        )
-        sys.path.append(site_packages_dir)
+            site_packages_dir = os.path.join(
+                self.workspace_root,
+                f"Cached\\PyCache\\Python{self.python_version_major}.{self.python_version_minor}\\site-packages"
+            )
+            sys.path.append(site_packages_dir)
 
-        # Initialize PyWin32 at runtime - rather than running the post-install script
-        # this avoids having to install any files to the "C:/Windows/System32" directory
-        if(importlib.util.find_spec("win32")):
-            # additional paths (same as in `pywin32.pth`)
-            sys.path.append(os.path.join(site_packages_dir, "win32"))
-            sys.path.append(os.path.join(site_packages_dir, "win32\\lib"))
-            sys.path.append(os.path.join(site_packages_dir, "Pythonwin"))
-            import pywin32_bootstrap
+            # Initialize PyWin32 at runtime - rather than running the post-install script
+            # this avoids having to install any files to the "C:/Windows/System32" directory
+            if(importlib.util.find_spec("win32")):
+                # additional paths (same as in `pywin32.pth`)
+                sys.path.append(os.path.join(site_packages_dir, "win32"))
+                sys.path.append(os.path.join(site_packages_dir, "win32\\lib"))
+                sys.path.append(os.path.join(site_packages_dir, "Pythonwin"))
+                import pywin32_bootstrap
 
         # 2) Refresh imports
         # We must reload the base module here as when we're in standalone Python mode
@@ -100,26 +106,32 @@ class JuniperEngine(object):
         import juniper
         importlib.reload(juniper)
 
+        # 3) Restore the discovery state from the last launch - if nothing has changed since
+        import juniper.engine.snapshot
+        with profiler.phase("snapshot_load"):
+            snapshot = juniper.engine.snapshot.DiscoverySnapshot.load(self.snapshot_path, self.plugin_search_directories)
+            if(snapshot is not None):
+                snapshot.restore()
+
         # 3a) Initialize modules
-        # module libraries should be within a stub `juniper` directory
-        # as they are considered an extension of juniper - not standalone.
-        import juniper.engine.types.module
-        modules = []
-        module_paths = [x for x in glob.glob(self.workspace_root + "\\Source\\Modules\\**\\__module__.py", recursive=True)]
-        for module_path in module_paths:
-            module_class = juniper.engine.types.module.ModuleManager().get_module_class(module_path)
-            if(module_class is not None):
-                module_instance = module_class()
-                modules.append(module_instance)
-                juniper.__path__.append(os.path.join(module_instance.root, "Source\\Libs\\Python\\juniper"))
+        with profiler.phase("module_discovery"):
+            import juniper.engine.types.module
+            import juniper.engine.scanner
+            scanner = juniper.engine.scanner.WorkspaceScanner()
+            scanner.scan(os.path.join(self.workspace_root, "Source"))
+            # Modules are registered from a static scan of their `__module__.py` - the module class itself
+            # is only imported once one of its lifecycle hooks is called
+            self.workspace_modules
 
         # 3b) Initialize plugins / plugin modules
-        for i in self.plugins:
-            sys.path.append(os.path.join(i.root, "Source\\Libs\\Python"))
-            python_module = i.python_module
-            for module in i.modules:
-                if(python_module):
-                    python_module.__path__.append(os.path.join(module.root, "Source\\Libs\\Python", i.name))
+        with profiler.phase("plugin_discovery"):
+            for i in self.plugins:
+                i.modules  # registers the plugin module descriptors
+
+        # 3c) Add all module / plugin library paths
+        with profiler.phase("library_paths"):
+            library_paths = snapshot.get("library_paths") if snapshot is not None else self.get_library_paths()
+            self.__add_library_paths(library_paths)
 
         # 4) Initialize globals
         import juniper_globals
@@ -129,50 +141,51 @@ class JuniperEngine(object):
         juniper_globals.set("log", self.log)
 
         # Link internal libraries before startup
-        if(self.__class__.__name__ != JuniperEngine.__name__):
-            for host_module_name in self.get_host_module_names():
-                module = importlib.import_module(host_module_name)
-                lib_dirs = []
-                if(not hasattr(module, "__path__")):
-                    module.__path__ = []
-
-                lib_dirs.append(os.path.join(
-                    self.workspace_root,
-                    f"Source\\Hosts\\{self.__class__.__name__}\\Source\\Libs\\Python\\{host_module_name}"
-                ))
-                for i in self.plugins:
-                    lib_dirs.append(os.path.join(i.root, f"Source\\Libs\\Python\\{host_module_name}"))
-                for i in self.modules:
-                    lib_dirs.append(os.path.join(i.root, f"Source\\Libs\\Python\\{host_module_name}"))
-                for i in lib_dirs:
-                    if(os.path.isdir(i)):
-                        module.__path__.append(i)
+        with profiler.phase("host_libraries"):
+            host_library_paths = snapshot.get("host_library_paths") if snapshot is not None else self.get_host_library_paths()
+            self.__extend_package_paths(host_library_paths)
+
+        # Resolve Juniper library imports from a single module map - rather than searching every library root
+        with profiler.phase("module_finder"):
+            if("juniper:module_finder=false" not in sys.argv):
+                import juniper.engine.finder
+                juniper.engine.finder.JuniperModuleFinder().install(
+                    self.get_library_roots(library_paths=library_paths, host_library_paths=host_library_paths),
+                    cache_path=juniper.engine.finder.get_module_map_path(self.workspace_root, self.program_context)
+                )
 
         # Juniper override system
-        import juniper.engine.override
-        juniper.engine.override.JuniperImportHook()
+        with profiler.phase("import_hook"):
+            import juniper.engine.override
+            juniper.engine.override.JuniperImportHook(index=snapshot.get("override_index") if snapshot is not None else None)
+
+        # Build the callback table before any callbacks are broadcast
+        with profiler.phase("script_discovery"):
+            if(snapshot is not None):
+                snapshot.restore_callbacks()
+            else:
+                self.discover_scripts()
+                juniper.engine.snapshot.DiscoverySnapshot.capture(self.snapshot_path, self)
 
         # Run pre-startup
-        self.on_pre_startup()
-        for i in self.plugins:
-            i.on_pre_startup()
-        for i in self.modules:
-            i.on_pre_startup()
+        with profiler.phase(f"on_pre_startup:{self.name}"):
+            self.on_pre_startup()
+        self.startup_graph.run("on_pre_startup", profiler=profiler)
         self.broadcast("pre_startup")
 
         # Run startup
-        self.on_startup()
-        for i in self.plugins:
-            i.on_startup()
-        for i in self.modules:
-            i.on_startup()
+        with profiler.phase(f"on_startup:{self.name}"):
+            self.on_startup()
+        self.startup_graph.run("on_startup", profiler=profiler)
         self.broadcast("startup")
 
         if(self.program_context == "python"):
             self.__post_startup__()
 
         # 6) Start tick
-        self.initialize_tick()
+        with profiler.phase("tick_init"):
+            self.subscribe_tick_hooks()
+            self.initialize_tick()
 
     def __bootstrap__(self):
         """
@@ -185,7 +198,10 @@ class JuniperEngine(object):
         updater_source_path = os.path.join(self.workspace_root, "Source\\libs\\python\\juniper\\bootstrap\\updater.py")
         updater_module = SourceFileLoader("juniper.bootstrap.updater", updater_source_path).load_module()
         updater = updater_module.Updater(self)
-        updater.run()
+        profiler = self.startup_profiler
+        profiler.start()
+        with profiler.phase("updater"):
+            updater.run()
 
         # 3) Run startup
         self.__startup__()
@@ -202,52 +218,102 @@ class JuniperEngine(object):
                 sys.argv.remove(i)
 
         self.on_shutdown()
+        self.startup_profiler.finish()  # save partial sessions if startup never completed
+
+        # write any suppressed / queued log records before the host closes
+        import juniper.engine.logging.pipeline
+        import juniper.engine.logging.throttle
+        juniper.engine.logging.throttle.LogThrottle().flush()
+        juniper.engine.logging.pipeline.LogPipeline().flush(timeout=2.0)
         juniper_globals.set("juniper_engine", None)
 
     def __post_startup__(self):
-        self.on_post_startup()
-        for i in self.plugins:
-            i.on_post_startup()
-        for i in self.modules:
-            i.on_post_startup()
+        profiler = self.startup_profiler
+        with profiler.phase(f"on_post_startup:{self.name}"):
+            self.on_post_startup()
+        self.startup_graph.run("on_post_startup", profiler=profiler)
         self.broadcast("post_startup")
 
+        # startup is complete once the post startup callbacks have ran (the first tick in most hosts)
+        profiler.finish()
+
+        # after a warm start the callback table was restored without reading any scripts - so re-synchronize it
+        # and update the snapshot if any script headers were changed
+        import juniper.engine.callbacks
+        import juniper.engine.types.script
+        callback_registry = juniper.engine.callbacks.CallbackRegistry()
+        restored_callbacks = callback_registry.restored_entries
+        if(restored_callbacks is not None):
+            callback_registry.restored_entries = None
+            if(not juniper.engine.types.script.ScriptManager().discovered):
+                self.discover_scripts()
+            if(sorted(callback_registry.export(), key=lambda x: x[2]) != sorted(restored_callbacks, key=lambda x: x[2])):
+                import juniper.engine.snapshot
+                juniper.engine.snapshot.DiscoverySnapshot.capture(self.snapshot_path, self)
+
     # -------------------------------------------------------------------
 
     def __tick__(self):
         """
         Runs the tick for Juniper
         """
-        if(not self.called_post_startup):
-            self.__post_startup__()
-            self.called_post_startup = True
-
-        self.time_pf = self.time_cf
-        self.time_cf = datetime.now()
+        import juniper.engine.tick
+        try:
+            if(not self.called_post_startup):
+                self.called_post_startup = True  # a failing post startup is not re-ran every tick
+                self.__post_startup__()
+        finally:
+            # plugin / module / engine `on_tick` hooks are ran (and timed) by the scheduler at their own rates
+            # the single shot timer is re-armed by the scheduler - so it must always run
+            juniper.engine.tick.TickScheduler().tick()
 
-        _delta = (self.time_cf - self.time_pf)
-        self.delta_seconds = _delta.seconds + _delta.microseconds / 1E6
+    @property
+    def delta_seconds(self):
+        """
+        :return <float:seconds> The number of seconds since the running `on_tick` hook was last called
+            Each hook runs at its own rate - so this is tracked per hook by the tick scheduler
+        """
+        import juniper.engine.tick
+        return juniper.engine.tick.TickScheduler().delta_seconds
 
+    def subscribe_tick_hooks(self):
+        """
+        Subscribes the `on_tick` hooks of all plugins, modules and the engine to the tick scheduler
+        Hooks which are not overridden are skipped
+        """
+        import juniper.engine.tick
+        import juniper.engine.types.plugin
+        scheduler = juniper.engine.tick.TickScheduler()
         for i in self.plugins:
-            i.on_tick()
+            if(type(i).on_tick is not juniper.engine.types.plugin.Plugin.on_tick):
+                scheduler.subscribe(i.on_tick, rate=i.tick_rate, name=i.name)
         for i in self.modules:
-            i.on_tick()
-        self.on_tick()
+            if(i.overrides("on_tick")):
+                scheduler.subscribe(i.on_tick, rate=i.tick_rate, name=i.name)
+        if(type(self).on_tick is not JuniperEngine.on_tick):
+            scheduler.subscribe(self.on_tick, rate=self.tick_rate, name=self.name)
+
+        # log popups queued from other threads are created from the tick
+        import juniper.engine.logging.pipeline
+        juniper.engine.logging.pipeline.LogPipeline().subscribe_tick()
 
     def initialize_tick(self):
         """
         Binds the tick command to the host application
         Note: By default we use a Qt based QTimer - this may not work in all hosts
-        for those hosts this method should be overriden
+        for those hosts this method should be overriden (and should call `TickScheduler().attach()`)
+        The timer is single shot - it is re-armed by the tick scheduler for the next due subscriber
         """
         if("juniper:tick=false" not in sys.argv):
             from qtpy import QtCore
+            import juniper.engine.tick
             import juniper.runtime.widgets
             app = juniper.runtime.widgets.get_application()
             if(app):
                 timer = QtCore.QTimer()
+                timer.setSingleShot(True)
                 timer.timeout.connect(self.__tick__)
-                timer.start(0)
+                juniper.engine.tick.TickScheduler().attach(timer)
                 self.__timer = timer
 
     # -------------------------------------------------------------------
@@ -302,6 +368,114 @@ class JuniperEngine(object):
         """
         return []
 
+    def get_library_paths(self):
+        """
+        Gets the library directories for all discovered modules and plugins
+        Module libraries should be within a stub `juniper` directory as they are considered an extension of
+        juniper - not standalone. Plugin modules extend the plugins own python package.
+        :return <dict:paths> Dict containing the `sys_path` additions and the `package_paths` extensions
+            (list of (package name, [directories]) - in the order they are added)
+        """
+        package_paths = [("juniper", [os.path.join(x.root, "Source\\Libs\\Python\\juniper") for x in self.workspace_modules])]
+        for i in self.plugins:
+            package_paths.append((i.name, [os.path.join(x.root, "Source\\Libs\\Python", i.name) for x in i.modules]))
+
+        return {
+            "sys_path": [os.path.join(x.root, "Source\\Libs\\Python") for x in self.plugins],
+            "package_paths": package_paths
+        }
+
+    def get_host_library_paths(self):
+        """
+        Gets the library directories which extend the inbuilt modules of the current host
+        :return <[(str, [str])]:paths> List of (host module name, [directories])
+        """
+        output = []
+        if(self.__class__.__name__ != JuniperEngine.__name__):
+            for host_module_name in self.get_host_module_names():
+                lib_dirs = [os.path.join(
+                    self.workspace_root,
+                    f"Source\\Hosts\\{self.__class__.__name__}\\Source\\Libs\\Python\\{host_module_name}"
+                )]
+                for i in self.plugins:
+                    lib_dirs.append(os.path.join(i.root, f"Source\\Libs\\Python\\{host_module_name}"))
+                for i in self.modules:
+                    lib_dirs.append(os.path.join(i.root, f"Source\\Libs\\Python\\{host_module_name}"))
+                output.append((host_module_name, [x for x in lib_dirs if os.path.isdir(x)]))
+        return output
+
+    def __add_library_paths(self, library_paths):
+        """
+        Adds module / plugin library paths to `sys.path` and extends their packages
+        :param <dict:library_paths> The library paths (see `get_library_paths`)
+        """
+        package_paths = library_paths["package_paths"]
+        self.__extend_package_paths(package_paths[:1])  # juniper - before any plugin packages are imported
+        sys.path.extend([self.get_library_dir(x) for x in library_paths["sys_path"]])
+        self.__extend_package_paths(package_paths[1:], ignore_errors=True)
+
+    def __extend_package_paths(self, package_paths, ignore_errors=False):
+        """
+        Imports packages and extends their `__path__`
+        :param <[(str, [str])]:package_paths> List of (package name, [directories])
+        :param [<bool:ignore_errors>] If True then packages which fail to import are skipped
+        """
+        for package_name, directories in package_paths:
+            try:
+                package = importlib.import_module(package_name)
+            except Exception:
+                if(not ignore_errors):
+                    raise
+                continue
+            if(not hasattr(package, "__path__")):
+                package.__path__ = []
+            package.__path__.extend([self.get_library_dir(x) for x in directories])
+
+    def get_library_roots(self, library_paths=None, host_library_paths=None):
+        """
+        Gets all python library directories added during startup - in the same order they are searched on import
+        :param [<dict:library_paths>] The module / plugin library paths - if None these are resolved
+        :param [<[(str, [str])]:host_library_paths>] The host library paths - if None these are resolved
+        :return <[(str, str)]:roots> List of (directory, package name) - where the package name is "" for
+            directories on `sys.path`. Directories in the library bundle are left to `zipimport` so are not included.
+        """
+        output = [(os.path.join(self.workspace_root, "Source\\Libs\\Python"), "")]
+        if(self.program_context != "python"):
+            output.append((os.path.join(self.workspace_root, "Source\\Hosts", self.program_context, "Source\\Libs\\Python"), ""))
+
+        if(library_paths is None):
+            library_paths = self.get_library_paths()
+        if(host_library_paths is None):
+            host_library_paths = self.get_host_library_paths()
+
+        package_paths = list(library_paths["package_paths"])
+        output += [(x, "juniper") for x in package_paths[0][1]]
+        output += [(x, "") for x in library_paths["sys_path"]]
+        for package_name, directories in package_paths[1:] + list(host_library_paths):
+            output += [(x, package_name) for x in directories]
+
+        if(self.library_bundle is not None):
+            output = [x for x in output if self.library_bundle.to_archive_path(x[0]) is None]
+        return output
+
+    @property
+    def library_bundle(self):
+        """
+        :return <LibraryBundle:bundle> The library bundle the engine was bootstrapped with - None if the loose
+            library directories are used (see `juniper.bootstrap.bundle`)
+        """
+        juniper_globals = sys.modules.get("juniper_globals")
+        return juniper_globals.get("library_bundle") if juniper_globals is not None else None
+
+    def get_library_dir(self, directory):
+        """
+        :param <str:directory> A library directory in the workspace
+        :return <str:dir> The directory within the library bundle - or the directory itself if it is not bundled
+        """
+        if(self.library_bundle is not None):
+            return self.library_bundle.to_archive_path(directory) or directory
+        return directory
+
     # -------------------------------------------------------------------
 
     def create_bootstrap_file(self, destination_path):
@@ -351,6 +525,23 @@ class JuniperEngine(object):
         :return <[Plugin]:plugins> Returns all registered plugins
         """
         import juniper.engine.types.plugin
+        import juniper.engine.scanner
+        scanner = juniper.engine.scanner.WorkspaceScanner()
+
+        # find all jplugin files in known directories
+        plugin_manager = juniper.engine.types.plugin.PluginManager()
+        for search_dir in self.plugin_search_directories:
+            for i in scanner.scan(search_dir).jplugins:
+                plugin_manager.load_plugin(i)
+
+        return plugin_manager.get_plugins(self.program_context)
+
+    @property
+    @functools.lru_cache()
+    def plugin_search_directories(self):
+        """
+        :return <[str]:dirs> All directories which are searched for plugins
+        """
         search_directories = [os.path.join(self.workspace_root, "Plugins")]
 
         # scan additional search directories (as stored in "/Cached/UserConfig/user_settings.json")
@@ -363,49 +554,124 @@ class JuniperEngine(object):
             except Exception:
                 pass
 
-        # find all jplugin files in known directories
-        output = []
-        for search_dir in search_directories:
-            for i in glob.glob(search_dir + "\\**\\*.jplugin", recursive=True):
-                plugin = juniper.engine.types.plugin.Plugin(i)
-                if(plugin):
-                    output.append(plugin)
+        return search_directories
 
+    @property
+    def startup_profiler(self):
+        """
+        :return <StartupProfiler:profiler> The profiler which records the startup phases for the current session
+        """
+        # stored in the globals (rather than on the engine) so it persists between each `JuniperEngine()` call
+        import juniper_globals
+        output = juniper_globals.get("startup_profiler")
+        if(output is None):
+            # loaded by path as the profiler is started before the juniper libraries are on `sys.path`
+            profiling_source_path = os.path.join(self.workspace_root, "Source\\Libs\\Python\\juniper\\engine\\profiling.py")
+            profiling_module = SourceFileLoader("juniper_engine_profiling", profiling_source_path).load_module()
+            output = profiling_module.StartupProfiler(
+                profiling_module.get_history_path(self.workspace_root, self.program_context)
+            )
+            juniper_globals.set("startup_profiler", output)
         return output
 
+    @property
+    @functools.lru_cache()
+    def startup_graph(self):
+        """
+        :return <StartupGraph:graph> The dependency graph used to run the plugin / module startup hooks
+        """
+        import juniper.engine.startup
+        return juniper.engine.startup.StartupGraph(self.plugins + self.modules)
+
+    @property
+    @functools.lru_cache()
+    def workspace_modules(self):
+        """
+        :return <[ModuleDescriptor]:modules> All modules in the workspace "Source\\Modules" directory which are
+            enabled in the current host (Ie, excluding plugin modules)
+        """
+        import juniper.engine.types.module
+        import juniper.engine.scanner
+        output = []
+        module_paths = juniper.engine.scanner.WorkspaceScanner().find(
+            os.path.join(self.workspace_root, "Source\\Modules")
+        ).module_descriptors
+        for module_path in module_paths:
+            module = juniper.engine.types.module.ModuleManager().get_descriptor(module_path)
+            if(module is not None and module.is_enabled_in_host(self.program_context)):
+                output.append(module)
+        return output
+
+    @property
+    def snapshot_path(self):
+        """
+        :return <str:path> The path to the warm start discovery snapshot for the current host
+        """
+        import juniper.engine.snapshot
+        return juniper.engine.snapshot.get_snapshot_path(self.workspace_root, self.program_context)
+
     @property
     @functools.lru_cache()
     def modules(self):
         """
-        :return <[Module]:modules> Returns all registered modules
+        :return <[ModuleDescriptor]:modules> Returns all registered modules which are enabled in the current host
         """
         import juniper.engine.types.module
-        return [x for x in juniper.engine.types.module.ModuleManager()]
+        return [x for x in juniper.engine.types.module.ModuleManager() if x.is_enabled_in_host(self.program_context)]
 
     # -------------------------------------------------------------------
 
     def broadcast(self, callback_name):
         """
         Broadcasts a callback by its name
+        Note: Startup callbacks are only broadcast to scripts - not tools
         :param <str:callback_name> The name of the callback to broadcast
         """
-        target_scripts = []
-
-        check_scripts = True
-        check_tools = callback_name not in ("pre_startup", "startup", "post_startup")
+        import juniper.engine.callbacks
+        callback_registry = juniper.engine.callbacks.CallbackRegistry()
+        if(not callback_registry.discovered):
+            self.discover_scripts()
 
-        if(check_scripts):
-            for i in self.scripts:
-                if(i and i.is_bound_to_callback(callback_name)):
-                    target_scripts.append(i)
-        if(check_tools):
-            for i in self.tools:
-                if(i and i.is_bound_to_callback(callback_name)):
-                    target_scripts.append(i)
+        target_scripts = callback_registry.get(
+            callback_name,
+            include_tools=callback_name not in juniper.engine.callbacks.STARTUP_CALLBACKS
+        )
 
+        profiler = self.startup_profiler
         for i in target_scripts:
             print(f"Running: {i.path}")
-            i.run()
+            with profiler.phase(f"broadcast:{callback_name}:{i.name}"):
+                i.run()
+
+    def discover_scripts(self):
+        """
+        Discovers all scripts and tools in the current context and synchronizes the callback table
+        Only scripts which have been added, removed or changed since the last discovery are updated
+        """
+        import juniper.engine.callbacks
+        import juniper.engine.types.script
+        scripts = self.scripts
+        tools = self.tools
+        juniper.engine.types.script.ScriptManager().sync_index(scripts, tools)
+        juniper.engine.callbacks.CallbackRegistry().sync(scripts + tools)
+
+    def refresh(self):
+        """
+        Refreshes all scripts and tools from disk - picking up any added / removed / edited files
+        """
+        import juniper.engine.catalog
+        import juniper.engine.manifest
+        import juniper.engine.scanner
+        import juniper.engine.types.plugin
+        juniper.engine.scanner.WorkspaceScanner().clear()
+        juniper.engine.manifest.ManifestCache().invalidate()
+        juniper.engine.types.plugin.PluginManager().invalidate()
+        juniper.engine.catalog.ScriptCatalog().invalidate()
+        importlib.invalidate_caches()  # picks up any added / removed library modules
+        self.discover_scripts()
+
+        import juniper.engine.snapshot
+        juniper.engine.snapshot.DiscoverySnapshot.capture(self.snapshot_path, self)
 
     # -------------------------------------------------------------------
 
@@ -424,7 +690,8 @@ class JuniperEngine(object):
             globals_["__package__"] = os.path.dirname(file_path)
             globals_["__name__"] = "__main__"
             juniper_globals.set("__juniper_exec_file_path__", file_path)
-            exec(open(file_path).read(), globals_)
+            import juniper.engine.bytecode
+            juniper.engine.bytecode.BytecodeCache().exec_file(file_path, globals_)
             return True
         return False
 
@@ -437,14 +704,10 @@ class JuniperEngine(object):
 
         # host implementation scripts
         import juniper.engine.types.script
+        import juniper.engine.scanner
         if(self.program_context != "python"):
-            host_root = os.path.join(
-                self.workspace_root,
-                "Source\\Hosts",
-                self.program_context,
-                "Source\\Scripts"
-            )
-            for i in glob.iglob(host_root + "\\**\\*.*"):
+            host_root = os.path.join(self.workspace_root, "Source\\Hosts", self.program_context)
+            for i in juniper.engine.scanner.WorkspaceScanner().find(host_root).scripts:
                 script = juniper.engine.types.script.Script(i)
                 if(script):
                     output.append(script)
@@ -452,16 +715,13 @@ class JuniperEngine(object):
         # Note: No core scripts. The base Juniper workspace should not rely on scripts during startup.
 
         for plugin in self.plugins:
-            for i in glob.iglob(plugin.root + "\\Source\\Scripts\\**\\*.*", recursive=True):
-                script = juniper.engine.types.script.Script(i)
-                if(script and script.get("type") == "script"):
-                    output.append(script)
+            output += plugin.scripts
 
         for module in self.modules:
-            for i in glob.iglob(module.root + "\\Source\\Scripts\\**\\*.*", recursive=True):
-                script = juniper.engine.types.script.Script(i)
-                if(script and script.get("type") == "script"):
-                    output.append(script)
+            output += module.scripts
+
+        import juniper.engine.catalog
+        juniper.engine.catalog.ScriptCatalog().save()
 
         return output
 
@@ -470,46 +730,57 @@ class JuniperEngine(object):
         """
         :return <[Script]:tools> All available tools in the current context
         """
-        import juniper.engine.types.script
         output = []
 
         # Note: No core / host tools. The base implementations should be empty.
 
         for plugin in self.plugins:
-            for i in glob.iglob(plugin.root + "\\Source\\Tools\\**\\*.*", recursive=True):
-                script = juniper.engine.types.script.Script(i)
-                if(script and script.get("type") == "tool"):
-                    output.append(script)
+            output += plugin.tools
 
         for module in self.modules:
-            for i in glob.iglob(module.root + "\\Source\\Tools\\**\\*.*", recursive=True):
-                script = juniper.engine.types.script.Script(i)
-                if(script and script.get("type") == "tool"):
-                    output.append(script)
+            output += module.tools
+
+        import juniper.engine.catalog
+        juniper.engine.catalog.ScriptCatalog().save()
 
         return output
 
     def find_tool(self, tool_name):
         """
         Finds a tool by its name
+        If the tool is not found then any roots which have changed on disk are re-scanned and the lookup is retried
         :param <str:name> The name of the tool
         :return <Script:tool> The tool if found - else None
         """
-        for i in self.tools:
-            if(i.name == tool_name):
-                return i
-        return None
+        return self.__find_discovered(tool_name, "tool")
 
     def find_script(self, script_name):
         """
         Finds a script by its name
+        If the script is not found then any roots which have changed on disk are re-scanned and the lookup is retried
         :param <str:name> The name of the script
         :return <Script:tool> The script if found - else None
         """
-        for i in self.scripts:
-            if(i.name == script_name):
-                return i
-        return None
+        return self.__find_discovered(script_name, "script")
+
+    def __find_discovered(self, name, type_):
+        """
+        Finds a discovered script / tool by its name - picking up files added since the last discovery on a miss
+        :param <str:name> The name of the script / tool
+        :param <str:type_> The type to find ("script" or "tool")
+        :return <Script:script> The script / tool if found - else None
+        """
+        import juniper.engine.scanner
+        import juniper.engine.types.script
+        script_manager = juniper.engine.types.script.ScriptManager()
+        if(not script_manager.discovered):
+            self.discover_scripts()
+
+        output = script_manager.find(name, type_=type_)
+        if(output is None and juniper.engine.scanner.WorkspaceScanner().rescan_changed()):
+            self.discover_scripts()
+            output = script_manager.find(name, type_=type_)
+        return output
 
     # -------------------------------------------------------------------
 
@@ -618,6 +889,11 @@ class JuniperEngine(object):
                         return root
                 except Exception:
                     pass
+
+        # the workspace the bootstrap ran from - `__file__` is within the zip when loaded from the library bundle
+        juniper_globals = sys.modules.get("juniper_globals")
+        if(juniper_globals is not None and juniper_globals.get("workspace_root")):
+            return juniper_globals.get("workspace_root")
         return os.path.abspath(os.path.join(os.path.dirname(__file__), "..\\..\\..\\..\\.."))
 
     @property
@@ -0,0 +1,149 @@
+"""
+Bytecode cache for scripts, tools and module descriptors which are executed outside of the import system
+
+Code objects are kept in memory for the session and persisted under "Cached\\Bytecode\\<cache tag>" (Ie, "cpython-37")
+so repeated tool runs - and startup scripts in following sessions - skip parsing and compiling the source file.
+Each cache file stores the `importlib` magic number and the mtime / size of the source it was compiled from,
+any mismatch causes the source to be recompiled.
+
+Note: Sources are decoded with the locale encoding (Ie, cp1252 on Windows) - the same as `exec(open(path).read())`
+which scripts and tools were previously ran with. Module descriptors are loaded by `CachedSourceFileLoader`
+which decodes them the same as any other import (utf-8 / PEP 263)
+"""
+import hashlib
+import importlib.util
+import marshal
+import os
+import struct
+import sys
+from importlib.machinery import SourceFileLoader
+
+import juniper.engine.paths
+import juniper.runtime.types.framework.singleton
+
+
+# magic number + source mtime (ns) + source size
+HEADER = struct.Struct("<4sQQ")
+
+# changes the name of every cache file - so bytecode written by an older version of the cache is never read
+BYTECODE_VERSION = 2
+
+
+def get_cache_dir():
+    """
+    :return <str:dir> The directory the bytecode cache files are stored in for the current interpreter
+    """
+    return os.path.join(juniper.engine.paths.root(), "Cached\\Bytecode", sys.implementation.cache_tag or "python")
+
+
+class BytecodeCache(object, metaclass=juniper.runtime.types.framework.singleton.Singleton):
+    def __init__(self):
+        """
+        Manager class for compiled code objects keyed by source path and mtime
+        """
+        self.__code = {}  # key -> (mtime, size, code)
+        self.enabled = "juniper:bytecode_cache=false" not in sys.argv
+
+    def __key(self, file_path):
+        return os.path.normpath(file_path).lower()
+
+    def cache_path(self, file_path):
+        """
+        :param <str:file_path> The path to the source file
+        :return <str:path> The path to the persisted bytecode for the source file
+        """
+        path_hash = hashlib.sha1(f"{BYTECODE_VERSION}:{self.__key(file_path)}".encode("utf-8")).hexdigest()[:16]
+        file_name = os.path.splitext(os.path.basename(file_path))[0]
+        return os.path.join(get_cache_dir(), f"{file_name}.{path_hash}.pyc")
+
+    def get_code(self, file_path, locale_encoding=True):
+        """
+        Gets the code object for a source file - compiling it only if the source has changed
+        :param <str:file_path> The path to the source file
+        :param [<bool:locale_encoding>] If True the source is decoded with the locale encoding (as `open().read()`)
+            otherwise it is decoded as an import would (utf-8 / PEP 263 encoding declaration)
+        :return <code:code> The compiled code object
+        """
+        stat = os.stat(file_path)
+        key = self.__key(file_path)
+
+        cached = self.__code.get(key)
+        if(cached is not None and cached[0] == stat.st_mtime_ns and cached[1] == stat.st_size):
+            return cached[2]
+
+        code = None
+        if(self.enabled):
+            code = self.__read(file_path, stat)
+        if(code is None):
+            with open(file_path, "r" if locale_encoding else "rb") as f:
+                source = f.read()
+            code = compile(source, file_path, "exec", dont_inherit=True)
+            if(self.enabled):
+                self.__write(file_path, stat, code)
+
+        self.__code[key] = (stat.st_mtime_ns, stat.st_size, code)
+        return code
+
+    def exec_file(self, file_path, globals_):
+        """
+        Executes a source file using its cached code object
+        :param <str:file_path> The path to the source file
+        :param <dict:globals_> The globals to execute the code with
+        """
+        exec(self.get_code(file_path), globals_)
+
+    def clear(self):
+        """
+        Clears all code objects held in memory (persisted bytecode is re-validated on next access)
+        """
+        self.__code = {}
+
+    # ---------------------------------------------------------------------
+
+    def __read(self, file_path, stat):
+        """
+        Reads the persisted bytecode for a source file
+        :param <str:file_path> The path to the source file
+        :param <os.stat_result:stat> The stat result of the source file
+        :return <code:code> The code object - None if there is no valid bytecode for the current source
+        """
+        try:
+            with open(self.cache_path(file_path), "rb") as f:
+                data = f.read()
+            magic, mtime, size = HEADER.unpack_from(data)
+            if(magic == importlib.util.MAGIC_NUMBER and mtime == stat.st_mtime_ns and size == stat.st_size):
+                return marshal.loads(data[HEADER.size:])
+        except Exception:
+            pass
+        return None
+
+    def __write(self, file_path, stat, code):
+        """
+        Persists the bytecode for a source file - written to a temp file first so a partially written
+        file is never read by another host
+        :param <str:file_path> The path to the source file
+        :param <os.stat_result:stat> The stat result of the source file
+        :param <code:code> The compiled code object
+        """
+        cache_path = self.cache_path(file_path)
+        temp_path = f"{cache_path}.{os.getpid()}.tmp"
+        try:
+            if(not os.path.isdir(os.path.dirname(cache_path))):
+                os.makedirs(os.path.dirname(cache_path))
+            with open(temp_path, "wb") as f:
+                f.write(HEADER.pack(importlib.util.MAGIC_NUMBER, stat.st_mtime_ns, stat.st_size))
+                f.write(marshal.dumps(code))
+            os.replace(temp_path, cache_path)
+        except Exception:
+            try:
+                os.remove(temp_path)
+            except OSError:
+                pass
+
+
+class CachedSourceFileLoader(SourceFileLoader):
+    """
+    `SourceFileLoader` which gets its code object from the `BytecodeCache`
+    """
+    def get_code(self, fullname):
+        return BytecodeCache().get_code(self.get_filename(fullname), locale_encoding=False)
@@ -0,0 +1,174 @@
+"""
+Callback dispatch table for scripts bound to engine callbacks (Ie, ":callbacks [startup]")
+"""
+import bisect
+
+import juniper.runtime.types.framework.singleton
+
+
+# callbacks which are only ever broadcast to scripts - never tools
+STARTUP_CALLBACKS = ("pre_startup", "startup", "post_startup")
+
+
+class CallbackRegistry(object, metaclass=juniper.runtime.types.framework.singleton.Singleton):
+    def __init__(self):
+        """
+        Maps each callback name to the ordered scripts / tools bound to it
+        The table is built once at discovery and updated incrementally as scripts change
+        """
+        self.__callbacks = {}  # callback name -> ([(order, script)], [(order, tool)])
+        self.__dispatch = {}  # callback name -> ((scripts), (scripts + tools))
+        self.__bound = {}  # script -> (order, (callback names))
+        self.__next_order = 0
+        self.discovered = False
+        self.restored_entries = None  # the entries the table was restored from (until it is re-synchronized)
+
+    def __iter__(self):
+        """
+        :yield <str:callback_name> The names of all callbacks with at least one bound script
+        """
+        for i in self.__callbacks:
+            yield i
+
+    def get(self, callback_name, include_tools=True):
+        """
+        Gets all scripts bound to a callback - scripts first, then tools, each in discovery order
+        :param <str:callback_name> The name of the callback
+        :param [<bool:include_tools>] Should tools bound to the callback be included?
+        :return <[Script]:scripts> The bound scripts
+        """
+        dispatch = self.__dispatch.get(callback_name)
+        if(dispatch is None):
+            return ()
+        return dispatch[1] if include_tools else dispatch[0]
+
+    def __update_dispatch(self, callback_name):
+        """
+        Rebuilds the flattened dispatch entry for a callback
+        :param <str:callback_name> The name of the callback
+        """
+        bound = self.__callbacks.get(callback_name)
+        if(not bound or (not bound[0] and not bound[1])):
+            self.__callbacks.pop(callback_name, None)
+            self.__dispatch.pop(callback_name, None)
+        else:
+            scripts = tuple(x[1] for x in bound[0])
+            self.__dispatch[callback_name] = (scripts, scripts + tuple(x[1] for x in bound[1]))
+
+    # ---------------------------------------------------------------------
+
+    def register(self, script, order=None):
+        """
+        Registers a script to all callbacks it is bound to
+        :param <Script:script> The script to register
+        :param [<int:order>] The discovery order of the script - if None then it is added last
+        """
+        if(script in self.__bound):
+            self.unregister(script)
+
+        if(order is None):
+            order = self.__next_order
+        self.__next_order = max(self.__next_order, order + 1)
+
+        callback_names = tuple(script.callbacks)
+        self.__bound[script] = (order, callback_names)
+
+        list_index = 1 if script.type == "tool" else 0
+        for callback_name in callback_names:
+            if(callback_name not in self.__callbacks):
+                self.__callbacks[callback_name] = ([], [])
+            bound = self.__callbacks[callback_name][list_index]
+            if(not bound or bound[-1][0] < order):
+                bound.append((order, script))
+            else:
+                bound.insert(bisect.bisect_right([x[0] for x in bound], order), (order, script))
+            self.__update_dispatch(callback_name)
+
+    def unregister(self, script):
+        """
+        Removes a script from all callbacks it is bound to
+        :param <Script:script> The script to remove
+        """
+        if(script not in self.__bound):
+            return
+
+        order, callback_names = self.__bound.pop(script)
+        for callback_name in callback_names:
+            bound = self.__callbacks.get(callback_name)
+            if(bound):
+                for i in bound:
+                    for j in range(len(i)):
+                        if(i[j][1] is script):
+                            i.pop(j)
+                            break
+            self.__update_dispatch(callback_name)
+
+    def update(self, script):
+        """
+        Updates the callbacks a script is bound to (Ie, if the scripts metadata has changed)
+        :param <Script:script> The script to update
+        """
+        if(script in self.__bound):
+            order, callback_names = self.__bound[script]
+            if(callback_names != tuple(script.callbacks)):
+                self.register(script, order=order)
+        else:
+            self.register(script)
+
+    def sync(self, scripts):
+        """
+        Incrementally synchronizes the table with a list of discovered scripts
+        Scripts which are no longer present are removed and new / changed scripts are (re)registered
+        :param <[Script]:scripts> All discovered scripts / tools in discovery order
+        """
+        scripts = list(dict.fromkeys(scripts))
+        current = set(scripts)
+        for i in [x for x in self.__bound if x not in current]:
+            self.unregister(i)
+
+        for order, script in enumerate(scripts):
+            if(script in self.__bound):
+                bound_order, callback_names = self.__bound[script]
+                if(bound_order == order and callback_names == tuple(script.callbacks)):
+                    continue
+            self.register(script, order=order)
+
+        self.__next_order = len(scripts)
+        self.discovered = True
+
+    def export(self):
+        """
+        :return <[[str, str, int, [str]]]:entries> The table as json serializable data - a list of
+            (script path, script type, discovery order, callback names) for every bound script
+        """
+        return [[x.path, x.type, order, list(callback_names)] for x, (order, callback_names) in self.__bound.items()]
+
+    def restore(self, entries):
+        """
+        Restores the table from previously exported data (Ie, from the warm start snapshot)
+        Scripts are not read from disk - so the table should be re-synchronized once startup has completed
+        :param <[[str, str, int, [str]]]:entries> The exported entries (see `export`)
+        """
+        import juniper.engine.types.script
+        self.clear()
+        for script_path, script_type, order, callback_names in sorted(entries, key=lambda x: x[2]):
+            script = juniper.engine.types.script.Script(script_path)
+            self.__bound[script] = (order, tuple(callback_names))
+            for callback_name in callback_names:
+                self.__callbacks.setdefault(callback_name, ([], []))[1 if script_type == "tool" else 0].append((order, script))
+            self.__next_order = max(self.__next_order, order + 1)
+
+        for callback_name in list(self.__callbacks):
+            self.__update_dispatch(callback_name)
+        self.discovered = True
+        self.restored_entries = entries
+
+    def clear(self):
+        """
+        Clears the callback table
+        """
+        self.__callbacks = {}
+        self.__dispatch = {}
+        self.__bound = {}
+        self.__next_order = 0
+        self.discovered = False
@@ -0,0 +1,293 @@
+"""
+Persistent catalog of script / tool metadata
+
+Entries are stored per plugin root under "Cached\\Catalog" and are only re-read from disk when
+the mtime or size of a script changes. Changes to the `.jplugin` files in a root invalidate all
+entries for that root (as these control the integration type / category of the contained scripts).
+"""
+import hashlib
+import json
+import os
+import sys
+
+import juniper.engine
+import juniper.engine.manifest
+import juniper.engine.types.script
+import juniper.runtime.types.framework.singleton
+import juniper.utilities.string
+
+
+CATALOG_VERSION = 1
+
+
+def get_script_root(script_path):
+    """
+    Gets the root directory of the plugin which owns a script by splitting at the "Source" directory
+    (all scripts should be within the source directory - which is one deep from any root)
+    :param <str:script_path> The path to the script
+    :return <str:root> The root directory
+    """
+    return script_path.lower().split("source")[0]
+
+
+def intern_entry(entry, intern_metadata=True):
+    """
+    Interns the commonly repeated strings in a catalog entry (categories / hosts / metadata keys)
+    so entries for large numbers of scripts share the same string objects
+    :param <dict:entry> The catalog entry
+    :param [<bool:intern_metadata>] Should the metadata keys be interned? (Only required for entries loaded from disk)
+    :return <dict:entry> The input entry
+    """
+    for key in ("category", "parent_category", "integration_type"):
+        entry[key] = sys.intern(entry[key])
+    for key in ("supported_hosts", "unsupported_hosts"):
+        entry[key] = tuple(sys.intern(x) for x in entry[key])
+    if(intern_metadata):
+        entry["metadata"] = {sys.intern(k): v for k, v in entry["metadata"].items()}
+    return entry
+
+
+def parse_list(value):
+    """
+    Parses a metadata list string (Ie, "[max, unreal]") into a list of lowercase entries
+    :param <str:value> The metadata value to parse
+    :return <[str]:values> The parsed list
+    """
+    output = []
+    if(value):
+        for i in value.lstrip("[").rstrip("]").split(","):
+            i = i.replace(" ", "").lower()
+            if(i):
+                output.append(i)
+    return output
+
+
+class ScriptCatalog(object, metaclass=juniper.runtime.types.framework.singleton.Singleton):
+    def __init__(self):
+        """
+        Manager class for the persistent script catalog
+        """
+        self.__roots = {}
+        self.__validated = set()
+        self.__dirty_roots = set()
+
+    @property
+    def catalog_dir(self):
+        """
+        :return <str:dir> The directory the catalog files are stored in
+        """
+        return os.path.join(juniper.engine.JuniperEngine().workspace_root, "Cached\\Catalog")
+
+    def catalog_path(self, root):
+        """
+        Gets the path to the catalog file for a given plugin root
+        :param <str:root> The plugin root directory
+        :return <str:path> The path to the catalog json file
+        """
+        root_hash = hashlib.sha1(root.encode("utf-8")).hexdigest()[:16]
+        return os.path.join(self.catalog_dir, f"{root_hash}.json")
+
+    # ---------------------------------------------------------------------
+
+    def __get_root_fingerprint(self, root):
+        """
+        Gets the fingerprint for a plugin root - this is the name / mtime of all `.jplugin` files in the root
+        :param <str:root> The plugin root directory
+        :return <[[str, int]]:fingerprint> The fingerprint
+        """
+        output = []
+        if(os.path.isdir(root)):
+            for i in sorted(os.listdir(root)):
+                if(i.endswith(".jplugin")):
+                    output.append([i.lower(), os.stat(os.path.join(root, i)).st_mtime_ns])
+        return output
+
+    def __get_root_info(self, root):
+        """
+        Gets the cached data for a plugin root - loading it from disk (or creating it) on first access
+        If the `.jplugin` files for the root have changed then all cached entries are discarded
+        :param <str:root> The plugin root directory
+        :return <dict:root_info> The root data
+        """
+        if(root in self.__roots):
+            return self.__roots[root]
+
+        fingerprint = self.__get_root_fingerprint(root)
+
+        root_info = None
+        catalog_path = self.catalog_path(root)
+        if(os.path.isfile(catalog_path)):
+            try:
+                with open(catalog_path, "r") as f:
+                    json_data = json.load(f)
+                if(
+                    json_data.get("version") == CATALOG_VERSION and
+                    json_data.get("root") == root and
+                    json_data.get("fingerprint") == fingerprint
+                ):
+                    root_info = json_data
+                    for entry in root_info["entries"].values():
+                        intern_entry(entry)
+            except Exception:
+                pass
+
+        if(not root_info):
+            root_info = {
+                "version": CATALOG_VERSION,
+                "root": root,
+                "fingerprint": fingerprint,
+                "entries": {}
+            }
+            self.__dirty_roots.add(root)
+
+        root_info.update(self.__get_root_integration(root, fingerprint))
+        self.__roots[root] = root_info
+        return root_info
+
+    def __get_root_integration(self, root, fingerprint):
+        """
+        Gets the integration type and parent category for all scripts in a plugin root
+        :param <str:root> The plugin root directory
+        :param <[[str, int]]:fingerprint> The root fingerprint (contains the names of the jplugin files)
+        :return <dict:data> Dict containing the `integration_type` and `parent_category`
+        """
+        integration_type = "integrated"
+        parent_category = "Juniper"
+
+        if(fingerprint):
+            for jplugin_name, _ in fingerprint:
+                manifest = juniper.engine.manifest.ManifestCache().get(os.path.join(root, jplugin_name))
+                if(manifest.integration_type):
+                    integration_type = manifest.integration_type
+                    break
+
+            if(integration_type != "integrated"):
+                # The parent plugin will be either the separate submenu, or standalone menu name
+                parent_module_name = juniper.utilities.string.snake_to_name(fingerprint[0][0].split(".")[0]).rstrip()
+                if(integration_type == "separate"):
+                    # The "_" prefix is used to denote this is a separate section
+                    parent_category += "|_" + parent_module_name
+                elif(integration_type == "standalone"):
+                    parent_category = parent_module_name
+
+        return {"integration_type": integration_type, "parent_category": parent_category}
+
+    def __build_entry(self, script_path, root_info, stat):
+        """
+        Builds the catalog entry for a script
+        :param <str:script_path> The path to the script
+        :param <dict:root_info> The data for the owning plugin root
+        :param <os.stat_result:stat> The current stat result of the script
+        :return <dict:entry> The catalog entry
+        """
+        metadata = juniper.engine.types.script.read_metadata(script_path, stat=stat)
+
+        category = root_info["parent_category"]
+        is_core = metadata.get("category", "").lower() == "core"
+        if("category" in metadata and not is_core):
+            category += "|" + metadata["category"]
+
+        # metadata keys are already interned by the parser, and the dict is shared with the metadata cache
+        return intern_entry({
+            "mtime": stat.st_mtime_ns,
+            "size": stat.st_size,
+            "metadata": metadata,
+            "supported_hosts": parse_list(metadata.get("supported_hosts")),
+            "unsupported_hosts": parse_list(metadata.get("unsupported_hosts")),
+            "category": category,
+            "parent_category": root_info["parent_category"],
+            "integration_type": root_info["integration_type"]
+        }, intern_metadata=False)
+
+    # ---------------------------------------------------------------------
+
+    def get_entry(self, script_path):
+        """
+        Gets the catalog entry for a script. Each script is validated against the file on disk once per session.
+        :param <str:script_path> The path to the script
+        :return <dict:entry> The catalog entry - None if the file does not exist
+        """
+        script_path = sys.intern(script_path.lower())
+        root = get_script_root(script_path)
+        root_info = self.__get_root_info(root)
+        entries = root_info["entries"]
+
+        if(script_path in self.__validated):
+            return entries.get(script_path)
+
+        self.__validated.add(script_path)
+        try:
+            stat = os.stat(script_path)
+        except OSError:
+            if(entries.pop(script_path, None) is not None):
+                self.__dirty_roots.add(root)
+            return None
+
+        entry = entries.get(script_path)
+        if(not entry or entry["mtime"] != stat.st_mtime_ns or entry["size"] != stat.st_size):
+            entry = self.__build_entry(script_path, root_info, stat)
+            entries[script_path] = entry
+            self.__dirty_roots.add(root)
+
+        return entry
+
+    def invalidate(self, script_path=None):
+        """
+        Invalidates the session validation for a script so it is checked against the file on disk on next access
+        :param [<str:script_path>] The path to the script - if None then all scripts are invalidated
+        """
+        if(script_path is None):
+            self.__validated.clear()
+            self.__roots = {root: info for root, info in self.__roots.items() if root in self.__dirty_roots}
+        else:
+            self.__validated.discard(script_path.lower())
+
+    def invalidate_root(self, root):
+        """
+        Discards all catalog entries for a plugin root
+        :param <str:root> The plugin root directory
+        """
+        root = root.lower().rstrip("\\") + "\\"
+        self.__roots.pop(root, None)
+        self.__dirty_roots.discard(root)
+        self.__validated = set(x for x in self.__validated if not x.startswith(root))
+        try:
+            os.remove(self.catalog_path(root))
+        except OSError:
+            pass
+
+    def save(self):
+        """
+        Writes all modified plugin roots to disk
+        Each catalog is written to a temp file first so a host launched at the same time never reads a partial file
+        """
+        if(not self.__dirty_roots):
+            return
+
+        try:
+            os.makedirs(self.catalog_dir, exist_ok=True)
+        except OSError:
+            self.__dirty_roots = set()  # Ie, a read only workspace - the catalog is rebuilt on the next launch
+            return
+
+        for root in self.__dirty_roots:
+            root_info = self.__roots.get(root)
+            if(root_info):
+                catalog_path = self.catalog_path(root)
+                temp_path = f"{catalog_path}.{os.getpid()}.tmp"
+                try:
+                    with open(temp_path, "w") as f:
+                        json.dump({
+                            "version": root_info["version"],
+                            "root": root_info["root"],
+                            "fingerprint": root_info["fingerprint"],
+                            "entries": root_info["entries"]
+                        }, f)
+                    os.replace(temp_path, catalog_path)
+                except Exception:
+                    try:
+                        os.remove(temp_path)
+                    except OSError:
+                        pass
+
+        self.__dirty_roots = set()
@@ -1,10 +1,9 @@
-import traceback
-
 import juniper
+import juniper.runtime.types.misc.log
 
 
 def _decorator_print_traceback(func, *args, context="Log"):
-    tb = traceback.extract_stack()[-3]
+    tb = juniper.runtime.types.misc.log.FrameReference.capture(2)
     print(f"Juniper ({context.upper()}):")
     print(f"  File \"{tb[0]}\", line {tb[1]}, method {func.__name__}")
     for i in args:
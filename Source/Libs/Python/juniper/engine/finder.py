@@ -0,0 +1,283 @@
+"""
+Path indexed module finder for Juniper libraries
+
+Juniper adds a library directory to `sys.path` (or a package `__path__`) for the workspace, the host and every
+plugin / module - so each import would otherwise be checked against all of these directories in turn.
+The finder scans these library roots once, mapping every module name to its file, and resolves imports of
+Juniper library modules with a single dict lookup. Any module which is not in the map (Ie, third party or
+standard library modules) falls through to the default import machinery.
+
+The lookup order is the same as importing from `sys.path` - the finder is placed after the builtin / frozen importers,
+a top level name is only resolved if no `sys.path` entry before its library root (Ie, the standard library or
+site-packages) provides it, and a submodule is only resolved if its directory is on the search path of its parent package.
+
+The map is persisted under "Cached\\Imports\\module_map_<host>.json" along with the mtime of every scanned directory,
+so following sessions only need to stat each directory rather than list them. Adding / removing files changes the
+directory mtime - so a stale map is always rebuilt.
+"""
+import importlib.machinery
+import importlib.util
+import json
+import os
+import sys
+
+import juniper.runtime.types.framework.singleton
+
+
+MODULE_MAP_VERSION = 1
+
+# directories which are never packages
+PRUNED_DIRECTORIES = {"__pycache__", ".git", ".vscode"}
+
+
+def get_module_map_path(workspace_root, host):
+    """
+    :param <str:workspace_root> The root directory of the Juniper workspace
+    :param <str:host> The name of the host (Ie, "max")
+    :return <str:path> The path to the persisted module map for the host
+    """
+    return os.path.join(workspace_root, f"Cached\\Imports\\module_map_{host.lower()}.json")
+
+
+class JuniperModuleFinder(object, metaclass=juniper.runtime.types.framework.singleton.Singleton):
+    def __init__(self):
+        """
+        Meta path finder which resolves Juniper library modules from a prebuilt module name -> file map
+        """
+        self.roots = []  # [(directory, package name)] - in import precedence order
+        self.modules = {}  # module name -> [file path, is package] - None if the name is resolved by another loader
+        self.fingerprint = {}  # directory -> mtime
+        self.cache_path = None
+        self.loaded_from_cache = False
+        self.__sys_path = None  # the `sys.path` the normalized paths were built from
+        self.__normalized_sys_path = []
+        self.__normalized_paths = {}  # package search path -> set of normalized directories
+
+    def __repr__(self):
+        return f"JuniperModuleFinder({len(self.modules)} modules)"
+
+    @property
+    def installed(self):
+        """
+        :return <bool:installed> True if the finder is in `sys.meta_path` - else False
+        """
+        return self in sys.meta_path
+
+    def install(self, roots, cache_path=None):
+        """
+        Builds the module map (or loads it from the cache) and adds the finder to `sys.meta_path`
+        :param <[(str, str)]:roots> The library roots in import precedence order - each is a tuple of
+            (directory, package name) where the package name is "" for `sys.path` entries
+            (Ie, ("<plugin>\\Source\\Libs\\Python", "") or ("<module>\\Source\\Libs\\Python\\juniper", "juniper"))
+        :param [<str:cache_path>] The path the module map is persisted to - if None the map is not persisted
+        """
+        self.roots = [[os.path.normpath(x), y] for x, y in roots]
+        self.cache_path = cache_path
+
+        self.loaded_from_cache = self.__load()
+        if(not self.loaded_from_cache):
+            self.rebuild()
+
+        if(not self.installed):
+            # builtin / frozen modules are found before any `sys.path` entry - so must take precedence
+            index = len(sys.meta_path)
+            for i, finder in enumerate(sys.meta_path):
+                if(finder is importlib.machinery.PathFinder):
+                    index = i
+                    break
+            sys.meta_path.insert(index, self)
+
+    def uninstall(self):
+        """
+        Removes the finder from `sys.meta_path`
+        """
+        if(self.installed):
+            sys.meta_path.remove(self)
+
+    def rebuild(self):
+        """
+        Re-scans all library roots and saves the module map
+        :return <int:count> The number of modules in the map
+        """
+        self.modules = {}
+        self.fingerprint = {}
+        for directory, package_name in self.roots:
+            self.__scan(directory, package_name)
+        self.__save()
+        return len(self.modules)
+
+    # ---------------------------------------------------------------------
+
+    def __record_directory(self, directory):
+        """
+        Lists a directory - recording its mtime in the fingerprint
+        :param <str:directory> The directory to list
+        :return <[os.DirEntry]:entries> The entries in the directory - empty if it does not exist
+        """
+        try:
+            self.fingerprint[directory] = os.stat(directory).st_mtime_ns
+            return list(os.scandir(directory))
+        except OSError:
+            self.fingerprint[directory] = None
+            return []
+
+    def __scan(self, directory, package_name):
+        """
+        Adds all modules within a library directory to the map - names which are already mapped are not replaced
+        :param <str:directory> The directory to scan
+        :param <str:package_name> The name of the package the directory belongs to - "" for top level modules
+        """
+        prefix = f"{package_name}." if package_name else ""
+        packages = []
+        files = []
+
+        # packages take precedence over modules, then extension modules over source files (same as `FileFinder`)
+        for entry in sorted(self.__record_directory(directory), key=lambda x: x.name):
+            try:
+                is_dir = entry.is_dir()
+            except OSError:
+                continue
+
+            if(not is_dir):
+                files.append(entry)
+            elif(entry.name not in PRUNED_DIRECTORIES and entry.name.isidentifier()):
+                init_path = os.path.join(entry.path, "__init__.py")
+                name = prefix + entry.name
+                if(name not in self.modules and os.path.isfile(init_path)):
+                    self.modules[name] = [init_path, True]
+                    packages.append((entry.path, name))
+
+        for entry in files:
+            if(entry.name.endswith(tuple(importlib.machinery.EXTENSION_SUFFIXES))):
+                # extension modules are left to the default machinery - but still shadow later roots
+                self.modules.setdefault(prefix + entry.name.split(".", 1)[0], None)
+
+        for entry in files:
+            module_name, extension = os.path.splitext(entry.name)
+            if(extension in importlib.machinery.SOURCE_SUFFIXES):
+                self.modules.setdefault(prefix + module_name, [entry.path, False])
+
+        for package_directory, name in packages:
+            self.__scan(package_directory, name)
+
+    def __load(self):
+        """
+        Loads the persisted module map - if it matches the current library roots and none of the
+        scanned directories have changed
+        :return <bool:success> True if the map was loaded - else False
+        """
+        if(not self.cache_path or not os.path.isfile(self.cache_path)):
+            return False
+
+        try:
+            with open(self.cache_path, "r") as f:
+                json_data = json.load(f)
+        except Exception:
+            return False
+
+        if(json_data.get("version") != MODULE_MAP_VERSION or json_data.get("roots") != self.roots):
+            return False
+
+        fingerprint = json_data.get("fingerprint", {})
+        if(not self.__is_current(fingerprint)):
+            return False
+
+        self.fingerprint = fingerprint
+        self.modules = json_data.get("modules", {})
+        return True
+
+    def __is_current(self, fingerprint):
+        """
+        :param <dict:fingerprint> Dict of directory -> mtime
+        :return <bool:current> True if none of the directories have changed - else False
+        """
+        for directory, mtime in fingerprint.items():
+            try:
+                current_mtime = os.stat(directory).st_mtime_ns
+            except OSError:
+                current_mtime = None
+            if(current_mtime != mtime):
+                return False
+        return True
+
+    def __save(self):
+        """
+        Persists the module map to the cache path
+        """
+        if(not self.cache_path):
+            return
+        try:
+            if(not os.path.isdir(os.path.dirname(self.cache_path))):
+                os.makedirs(os.path.dirname(self.cache_path))
+            with open(self.cache_path, "w") as f:
+                json.dump({
+                    "version": MODULE_MAP_VERSION,
+                    "roots": self.roots,
+                    "fingerprint": self.fingerprint,
+                    "modules": self.modules
+                }, f)
+        except Exception:
+            pass
+
+    # ---------------------------------------------------------------------
+
+    def find_spec(self, full_name, path=None, target=None):
+        """
+        Delegate called to find the spec for a module given its name
+        :param <str:full_name> The name of the module to find
+        :param [<[str]:path>] The search path of the parent package
+        :param [<Module:target>] The module being reloaded (if any)
+        :return <ModuleSpec:spec> The spec for the module - None if the module is not in the map
+        """
+        entry = self.modules.get(full_name)
+        if(entry is None):
+            return None
+
+        file_path, is_package = entry
+        directory = os.path.dirname(os.path.dirname(file_path) if is_package else file_path)
+        if(path is None):
+            if(self.__is_shadowed(full_name, directory)):
+                return None
+        elif(os.path.normcase(directory) not in self.__get_normalized_path(path)):
+            return None  # the parent package was not loaded from the library roots
+
+        return importlib.util.spec_from_file_location(
+            full_name,
+            file_path,
+            submodule_search_locations=[os.path.dirname(file_path)] if is_package else None
+        )
+
+    def __get_normalized_path(self, path):
+        """
+        :param <[str]:path> The search path of a package
+        :return <set:directories> The normalized directories of the search path
+        """
+        key = tuple(path)
+        output = self.__normalized_paths.get(key)
+        if(output is None):
+            output = self.__normalized_paths[key] = {os.path.normcase(os.path.normpath(x)) for x in key}
+        return output
+
+    def __is_shadowed(self, full_name, directory):
+        """
+        Checks if a top level module is provided by a `sys.path` entry before its library root
+        :param <str:full_name> The name of the module
+        :param <str:directory> The library root the module is in
+        :return <bool:shadowed> True if the module should be left to the default import machinery - else False
+        """
+        if(self.__sys_path != sys.path):
+            self.__sys_path = list(sys.path)
+            self.__normalized_sys_path = [os.path.normcase(os.path.normpath(x)) if x else x for x in sys.path]
+
+        directory = os.path.normcase(directory)
+        if(directory not in self.__normalized_sys_path):
+            return False
+        index = self.__normalized_sys_path.index(directory)
+        return index > 0 and importlib.machinery.PathFinder.find_spec(full_name, self.__sys_path[:index]) is not None
+
+    def invalidate_caches(self):
+        """
+        Called by `importlib.invalidate_caches` - re-scans the library roots if any directory has changed
+        """
+        if(self.roots and not self.__is_current(self.fingerprint)):
+            self.rebuild()
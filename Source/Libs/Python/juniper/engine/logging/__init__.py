@@ -1,5 +1,6 @@
 import juniper.runtime.types.misc.log
-import juniper.engine.logging.log_manager
+import juniper.engine.logging.pipeline
+import juniper.engine.logging.throttle
 
 
 class _LogEntry(object):
@@ -128,6 +129,7 @@ class Log(object):
                     log_func=i.log_func
                 )
                 log_counts[i.log_type] += 1
+            juniper.engine.logging.throttle.LogThrottle().flush()  # summaries for the batch are written before its release text
 
             if(log_counts["Error"] > 0):
                 output_text = error_text or (f"""{log_counts["Error"]} Errors reported""")
@@ -161,15 +163,33 @@ class Log(object):
         log_func=None,
         persistent=False
     ):
+        # the location is resolved here as the record is written from the log writer thread
+        if(traceback and not traceback_stack):
+            traceback_stack = juniper.runtime.types.misc.log.FrameReference.capture(2)  # the caller of `error` / `warning`
+
         if(not self.holding):
-            log_func(log_text, context=context, traceback=traceback, traceback_stack=traceback_stack)
+            # repeated records are collapsed into a "(N more occurrences)" summary - see `juniper.engine.logging.throttle`
+            if(not juniper.engine.logging.throttle.LogThrottle().allow(
+                context or self.plugin,
+                log_type,
+                log_text,
+                silent=silent,
+                persistent=persistent,
+                log_func=log_func
+            )):
+                return
+
+            log_pipeline = juniper.engine.logging.pipeline.LogPipeline()
+            log_pipeline.write(juniper.engine.logging.pipeline.LogRecord(
+                log_type,
+                log_text,
+                context or self.plugin,
+                traceback=traceback,
+                traceback_stack=traceback_stack,
+                log_func=log_func
+            ))
             if(not silent):
-                juniper.engine.logging.log_manager.LogManager().add_log_entry(
-                    log_text,
-                    log_type,
-                    context or self.plugin,
-                    persistent=persistent
-                )
+                log_pipeline.notify(log_text, log_type, context or self.plugin, persistent=persistent)
         else:
             log_entry = _LogEntry(
                 log_text=log_text,
@@ -1,6 +1,6 @@
 import juniper.runtime.types.framework.singleton
 import juniper.runtime.widgets as qt_utils
-from juniper.engine.logging.widgets import q_log_entry, q_log_holder
+from juniper.engine.logging.widgets import q_log_holder
 
 
 class LogManager(object, metaclass=juniper.runtime.types.framework.singleton.Singleton):
@@ -29,16 +29,22 @@ class LogManager(object, metaclass=juniper.runtime.types.framework.singleton.Sin
         :param <str:info_type> The type of log this is, current options include ["Info", "Success", "Error", "Warning"]
         :param [<str:owning_module>] The name of the owning module (Ie, "Juniper"). Can be overriden for individual tools.
         :param [<bool:persistent>] Does this log persist until manually closed? Or is it swept up in the log holfer update loop?
+        :return <QLogEntry:entry> The log entry widget - entry widgets are reused by the log holder once closed
+            None if the entry was queued behind persistent entries
         """
-        log_entry = q_log_entry.QLogEntry(
+        return self.log_holder_widget.add_entry(
             info_string,
             info_type,
             owning_module,
             persistent=persistent
         )
-        self.log_holder_widget.addWidget(log_entry)
-        self.log_holder_widget.refresh_position()
-        return log_entry
+
+    def add_overflow(self, count):
+        """
+        Counts log entries which were dropped without being shown - displayed as "+N more" on the log holder
+        :param <int:count> The number of entries
+        """
+        self.log_holder_widget.add_overflow(count)
 
     '''def __update_log_holder(self):
         """Updates the log holder widget to be in the bottom right of the main window"""
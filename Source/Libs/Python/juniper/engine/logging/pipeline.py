@@ -0,0 +1,435 @@
+"""
+Asynchronous logging pipeline
+
+Log calls only build a `LogRecord` and put it on a bounded queue - formatting and writing the record to the
+rotating JSONL file under "Cached\\Logs" is done on a background thread.
+When the queue is full new records are dropped (and counted) rather than blocking the caller.
+
+Most host consoles (Ie, the Max listener) are not thread safe - so by default console output is still written on
+the thread which is logging. Hosts with a thread safe console set `JuniperEngine.thread_safe_console` (or pass
+"juniper:async_console=true") to also move console output to the background thread.
+
+UI notifications (log entry popups) are always created on the main thread - they are queued and created from the
+Juniper tick, only the most recent `MAX_PENDING_NOTIFICATIONS` are kept while the main thread is busy.
+Other threads only ever add to the queue, the tick subscriber is registered from the main thread.
+
+The pipeline can be made synchronous with "juniper:async_log=false" (Ie, for hosts which do not allow writing
+to the console from another thread)
+"""
+import atexit
+import collections
+import json
+import os
+import queue
+import sys
+import threading
+import time
+
+import juniper
+import juniper.engine.logging.ring_buffer
+import juniper.engine.paths
+import juniper.runtime.types.framework.singleton
+import juniper.runtime.types.misc.log
+
+
+# maximum number of records waiting to be written
+MAX_QUEUE_SIZE = 10000
+
+# maximum number of records written per batch
+MAX_BATCH_SIZE = 512
+
+# maximum number of UI notifications waiting for the main thread
+MAX_PENDING_NOTIFICATIONS = 20
+
+# size (bytes) a log file is rotated at and the number of rotated files to keep
+MAX_LOG_FILE_BYTES = 5 * 1024 * 1024
+LOG_FILE_BACKUP_COUNT = 3
+
+# log files older than this are removed when the pipeline starts
+LOG_RETENTION_DAYS = 7
+
+
+def get_log_dir():
+    """
+    :return <str:dir> The directory log files are written to
+    """
+    return os.path.join(juniper.engine.paths.root(), "Cached\\Logs")
+
+
+class LogRecord(object):
+    __slots__ = ("time", "log_type", "text", "context", "traceback", "traceback_stack", "log_func", "thread")
+
+    def __init__(self, log_type, text, context, traceback=False, traceback_stack=None, log_func=None):
+        """
+        A single structured log record
+        :param <str:log_type> The type of log (Ie, "Error")
+        :param <str:text> The log text
+        :param <str:context> The context the record was logged from (Ie, the owning plugin)
+        :param [<bool:traceback>] Should the location of the log call be written?
+        :param [<FrameSummary:traceback_stack>] The location of the log call
+        :param [<func:log_func>] The `log_class` method used to write the record to the console
+        """
+        self.time = time.time()
+        self.log_type = log_type
+        self.text = text
+        self.context = context
+        self.traceback = traceback
+        self.traceback_stack = traceback_stack
+        self.log_func = log_func
+        self.thread = threading.current_thread().name
+
+    def to_dict(self):
+        """
+        :return <dict:data> The record as json serializable data
+        """
+        output = {
+            "time": self.time,
+            "type": self.log_type,
+            "context": self.context,
+            "text": str(self.text),
+            "thread": self.thread
+        }
+        if(self.traceback_stack is not None):
+            output["file"] = self.traceback_stack[0]
+            output["line"] = self.traceback_stack[1]
+        return output
+
+
+# -------------------------------------------------------------------------
+
+class ConsoleSink(object):
+    """
+    Writes records to the console (`sys.stdout`) using the `log_class` formatting
+    """
+    def write(self, records):
+        for i in records:
+            if(i.log_func is not None):
+                i.log_func(i.text, context=i.context, traceback=i.traceback, traceback_stack=i.traceback_stack)
+
+    def flush(self):
+        try:
+            sys.stdout.flush()
+        except Exception:
+            pass
+
+    def close(self):
+        self.flush()
+
+
+class RotatingJsonlSink(object):
+    def __init__(self, file_path, max_bytes=MAX_LOG_FILE_BYTES, backup_count=LOG_FILE_BACKUP_COUNT):
+        """
+        Writes records as json lines to a file - which is rotated once it exceeds `max_bytes`
+        (Ie, "max.jsonl" -> "max.1.jsonl" -> "max.2.jsonl")
+        :param <str:file_path> The path to the log file
+        :param [<int:max_bytes>] The size the file is rotated at
+        :param [<int:backup_count>] The number of rotated files to keep
+        """
+        self.file_path = file_path
+        self.max_bytes = max_bytes
+        self.backup_count = backup_count
+        self.__file = None
+
+    def __rotated_path(self, index):
+        file_name, extension = os.path.splitext(self.file_path)
+        return f"{file_name}.{index}{extension}"
+
+    def __open(self):
+        if(not os.path.isdir(os.path.dirname(self.file_path))):
+            os.makedirs(os.path.dirname(self.file_path))
+        self.__file = open(self.file_path, "a", encoding="utf-8")
+
+    def rotate(self):
+        """
+        Rotates the log file
+        """
+        self.close()
+        for i in range(self.backup_count - 1, 0, -1):
+            if(os.path.isfile(self.__rotated_path(i))):
+                os.replace(self.__rotated_path(i), self.__rotated_path(i + 1))
+        if(os.path.isfile(self.file_path)):
+            if(self.backup_count):
+                os.replace(self.file_path, self.__rotated_path(1))
+            else:
+                os.remove(self.file_path)
+
+    def write(self, records):
+        if(self.__file is None):
+            self.__open()
+        self.__file.write("".join([json.dumps(x.to_dict()) + "\n" for x in records]))
+        if(self.__file.tell() > self.max_bytes):
+            self.rotate()
+
+    def flush(self):
+        if(self.__file is not None):
+            self.__file.flush()
+
+    def close(self):
+        if(self.__file is not None):
+            self.__file.close()
+            self.__file = None
+
+
+# -------------------------------------------------------------------------
+
+class LogWriter(object):
+    def __init__(self, sinks, max_queue_size=MAX_QUEUE_SIZE, asynchronous=True, synchronous_sinks=None):
+        """
+        Writes log records to a set of sinks from a background thread
+        :param <[object]:sinks> The sinks to write to - each implements `write(records)`, `flush()` and `close()`
+        :param [<int:max_queue_size>] The maximum number of records waiting to be written
+        :param [<bool:asynchronous>] If False records are written on the calling thread
+        :param [<[object]:synchronous_sinks>] Sinks which are always written on the calling thread (Ie, the console)
+        """
+        self.sinks = sinks
+        self.synchronous_sinks = synchronous_sinks or []
+        self.asynchronous = asynchronous
+        self.dropped = 0
+        self.__queue = queue.Queue(maxsize=max_queue_size)
+        self.__thread = None
+        self.__lock = threading.Lock()
+        self.__dropped_lock = threading.Lock()  # records may be dropped by any producer thread
+
+    def write(self, record):
+        """
+        Adds a record to the queue
+        :param <LogRecord:record> The record to write
+        :return <bool:queued> True if the record was queued - False if it was dropped as the queue is full
+        """
+        if(self.synchronous_sinks):
+            self.__write_batch([record], self.synchronous_sinks)
+
+        if(not self.asynchronous):
+            with self.__lock:
+                self.__write_batch([record], self.sinks)
+            return True
+
+        if(self.__thread is None):
+            self.start()
+        try:
+            self.__queue.put_nowait(record)
+            return True
+        except queue.Full:
+            with self.__dropped_lock:
+                self.dropped += 1
+            return False
+
+    def start(self):
+        """
+        Starts the writer thread
+        """
+        with self.__lock:
+            if(self.__thread is None):
+                self.__thread = threading.Thread(target=self.__run, name="JuniperLogWriter", daemon=True)
+                self.__thread.start()
+
+    def flush(self, timeout=None):
+        """
+        Waits until all queued records have been written
+        :param [<float:timeout>] The maximum number of seconds to wait - if None this waits until the queue is empty
+        :return <bool:flushed> True if all records were written - else False
+        """
+        if(self.__thread is not None):
+            end_time = None if timeout is None else time.perf_counter() + timeout
+            with self.__queue.all_tasks_done:
+                while(self.__queue.unfinished_tasks):
+                    remaining = None if end_time is None else end_time - time.perf_counter()
+                    if(remaining is not None and remaining <= 0):
+                        return False
+                    self.__queue.all_tasks_done.wait(remaining)
+
+        for i in self.synchronous_sinks + self.sinks:
+            i.flush()
+        return True
+
+    def close(self, timeout=2.0):
+        """
+        Writes all remaining records and closes the sinks
+        :param [<float:timeout>] The maximum number of seconds to wait for queued records
+        """
+        self.flush(timeout=timeout)
+        for i in self.synchronous_sinks + self.sinks:
+            try:
+                i.close()
+            except Exception:
+                pass
+
+    # ---------------------------------------------------------------------
+
+    def __run(self):
+        """
+        Writer thread - writes queued records in batches
+        """
+        while(True):
+            batch = [self.__queue.get()]
+            while(len(batch) < MAX_BATCH_SIZE):
+                try:
+                    batch.append(self.__queue.get_nowait())
+                except queue.Empty:
+                    break
+            num_queued = len(batch)
+
+            with self.__dropped_lock:
+                dropped, self.dropped = self.dropped, 0
+            if(dropped):
+                batch.append(LogRecord(
+                    "Warning",
+                    f"{dropped} log records were dropped (the log queue was full)",
+                    "Juniper",
+                    log_func=juniper.runtime.types.misc.log.log.warning
+                ))
+
+            try:
+                self.__write_batch(batch, self.sinks)
+            finally:
+                for _ in range(num_queued):
+                    self.__queue.task_done()
+
+    def __write_batch(self, records, sinks):
+        """
+        Writes a batch of records to every sink - a failing sink never stops the others
+        :param <[LogRecord]:records> The records to write
+        :param <[object]:sinks> The sinks to write to
+        """
+        for i in sinks:
+            try:
+                i.write(records)
+            except Exception:
+                pass
+
+
+class LogPipeline(object, metaclass=juniper.runtime.types.framework.singleton.Singleton):
+    def __init__(self):
+        """
+        Manager class for the Juniper logging pipeline - the console / file writer and the UI notifications
+        """
+        self.log_file_path = os.path.join(get_log_dir(), f"{self.host}_{os.getpid()}.jsonl")
+        if(self.thread_safe_console):
+            sinks, synchronous_sinks = [ConsoleSink(), RotatingJsonlSink(self.log_file_path)], []
+        else:
+            sinks, synchronous_sinks = [RotatingJsonlSink(self.log_file_path)], [ConsoleSink()]
+        self.writer = LogWriter(
+            sinks,
+            asynchronous="juniper:async_log=false" not in sys.argv,
+            synchronous_sinks=synchronous_sinks
+        )
+        self.__notifications = collections.deque(maxlen=MAX_PENDING_NOTIFICATIONS)
+        self.__notifications_lock = threading.Lock()
+        self.dropped_notifications = 0
+        self.__notification_subscription = None
+        atexit.register(self.writer.close)
+        threading.Thread(target=self.remove_old_logs, name="JuniperLogCleanup", daemon=True).start()
+
+    @property
+    def host(self):
+        """
+        :return <str:host> The name of the current host - "python" if juniper has not been initialized
+        """
+        return str(getattr(juniper, "program_context", None) or "python").lower()
+
+    @property
+    def thread_safe_console(self):
+        """
+        :return <bool:thread_safe> True if console output can be written from the log writer thread - else False
+        """
+        if("juniper:async_console=true" in sys.argv):
+            return True
+        juniper_globals = sys.modules.get("juniper_globals")
+        engine = juniper_globals.get("juniper_engine") if juniper_globals is not None else None
+        return bool(getattr(engine, "thread_safe_console", False))
+
+    def write(self, record):
+        """
+        Writes a log record to the console / log file - and keeps it in the in-memory log buffer
+        :param <LogRecord:record> The record to write
+        """
+        juniper.engine.logging.ring_buffer.LogBuffer().add(record)
+        self.writer.write(record)
+
+    def flush(self, timeout=None):
+        """
+        Waits until all queued records have been written
+        :param [<float:timeout>] The maximum number of seconds to wait
+        """
+        return self.writer.flush(timeout=timeout)
+
+    def remove_old_logs(self):
+        """
+        Removes log files which have not been written to in `LOG_RETENTION_DAYS`
+        """
+        log_dir = os.path.dirname(self.log_file_path)
+        min_mtime = time.time() - LOG_RETENTION_DAYS * 86400
+        try:
+            entries = list(os.scandir(log_dir))
+        except OSError:
+            return
+        for i in entries:
+            try:
+                if(i.name.endswith(".jsonl") and i.stat().st_mtime < min_mtime):
+                    os.remove(i.path)
+            except OSError:
+                pass
+
+    # ---------------------------------------------------------------------
+
+    def subscribe_tick(self):
+        """
+        Subscribes `flush_notifications` to the Juniper tick - must be called from the main thread
+        (this is called by the engine when the tick is initialized)
+        """
+        if(self.__notification_subscription is None):
+            import juniper.engine.tick
+            self.__notification_subscription = juniper.engine.tick.TickScheduler().subscribe(
+                self.flush_notifications,
+                rate=10,
+                name="LogPipeline.flush_notifications"
+            )
+
+    def notify(self, log_text, log_type, context, persistent=False):
+        """
+        Shows a log entry popup - on the main thread
+        When the Juniper tick is running the popup is created on the next tick, so a busy main thread (Ie, a tool
+        logging per asset) only creates popups for the most recent entries once it is free
+        Calls from other threads only queue the notification - Qt objects (Ie, the tick timer) are never touched
+        :param <str:log_text> The log text
+        :param <str:log_type> The type of log (Ie, "Error")
+        :param <str:context> The name of the owning plugin / module
+        :param [<bool:persistent>] Does the popup persist until it is manually closed?
+        """
+        with self.__notifications_lock:
+            if(len(self.__notifications) == MAX_PENDING_NOTIFICATIONS):
+                self.dropped_notifications += 1  # the oldest notification is pushed out of the deque
+            self.__notifications.append((log_text, log_type, context, persistent))
+
+        if(threading.current_thread() is not threading.main_thread()):
+            return
+
+        import juniper.engine.tick
+        tick_scheduler = juniper.engine.tick.TickScheduler()
+        if(tick_scheduler.active):
+            self.subscribe_tick()
+            tick_scheduler.notify_activity()
+        else:
+            self.flush_notifications()
+
+    def flush_notifications(self):
+        """
+        Creates the popups for all pending notifications - must be called from the main thread
+        Notifications which were dropped while the main thread was busy are counted on the log holder
+        :return <bool:activity> True if any popups were created - else False
+        """
+        if(not self.__notifications):
+            return False
+
+        with self.__notifications_lock:
+            notifications = list(self.__notifications)
+            self.__notifications.clear()
+            dropped, self.dropped_notifications = self.dropped_notifications, 0
+
+        import juniper.engine.logging.log_manager
+        log_manager = juniper.engine.logging.log_manager.LogManager()
+        if(dropped):
+            log_manager.add_overflow(dropped)
+        for log_text, log_type, context, persistent in notifications:
+            log_manager.add_log_entry(log_text, log_type, context, persistent=persistent)
+        return True
@@ -0,0 +1,125 @@
+"""
+In-memory ring buffer of the most recent log records
+
+Every record written to the logging pipeline is also kept in a preallocated ring buffer of `LOG_BUFFER_SIZE` slots,
+so records which have scrolled out of the host console (or were held and released) can still be queried.
+Only the location of the log call is stored (not the frame itself) and the text is truncated to `MAX_TEXT_LENGTH`
+characters - so the buffer runs in constant memory and can be left on in production sessions.
+
+Records can be queried from another process through the command server (see `juniper.interface.command_server.query_log`)
+
+The buffer can be disabled with "juniper:log_buffer=false"
+"""
+import sys
+import threading
+
+import juniper.runtime.types.framework.singleton
+
+
+# number of records kept in the buffer
+LOG_BUFFER_SIZE = 10000
+
+# maximum number of characters of log text kept for a record
+MAX_TEXT_LENGTH = 2048
+
+
+class LogBuffer(object, metaclass=juniper.runtime.types.framework.singleton.Singleton):
+    def __init__(self, capacity=LOG_BUFFER_SIZE):
+        """
+        Manager class for the in-memory log ring buffer
+        :param [<int:capacity>] The number of records kept in the buffer
+        """
+        self.enabled = "juniper:log_buffer=false" not in sys.argv
+        self.capacity = capacity
+        self.__records = [None] * capacity  # (index, time, log type, context, text, file name, line number, function name)
+        self.__count = 0  # total number of records added - the next record is written to `count % capacity`
+        self.__lock = threading.Lock()
+
+    def __len__(self):
+        return min(self.__count, self.capacity)
+
+    def add(self, record):
+        """
+        Adds a record to the buffer - overwriting the oldest record once the buffer is full
+        :param <LogRecord:record> The record to add
+        """
+        if(not self.enabled):
+            return
+
+        # only the location is kept - holding the frame would keep all of its locals alive
+        filename, lineno, name = (None, None, None)
+        if(record.traceback_stack is not None):
+            filename, lineno, name = record.traceback_stack[0], record.traceback_stack[1], record.traceback_stack[2]
+        text = str(record.text)
+        if(len(text) > MAX_TEXT_LENGTH):
+            text = text[:MAX_TEXT_LENGTH]
+
+        with self.__lock:
+            self.__records[self.__count % self.capacity] = (
+                self.__count, record.time, record.log_type, record.context, text, filename, lineno, name
+            )
+            self.__count += 1
+
+    def clear(self):
+        """
+        Removes all records from the buffer
+        """
+        with self.__lock:
+            self.__records = [None] * self.capacity
+            self.__count = 0
+
+    def query(self, levels=None, context=None, start_time=None, end_time=None, search=None, after=None, limit=None):
+        """
+        Gets the records matching a set of filters
+        :param [<[str]:levels>] The log types to include (Ie, ["Error", "Warning"]) - a single log type can also be passed
+        :param [<str:context>] Only include records logged from this context (Ie, the name of a plugin)
+        :param [<float:start_time>] Only include records logged at or after this time (seconds since the epoch)
+        :param [<float:end_time>] Only include records logged at or before this time (seconds since the epoch)
+        :param [<str:search>] Only include records containing this text (case insensitive)
+        :param [<int:after>] Only include records with an index greater than this (Ie, to poll for new records)
+        :param [<int:limit>] The maximum number of records to return - the most recent records are kept
+        :return <[dict]:records> The matching records as json serializable data - oldest first
+        """
+        with self.__lock:
+            if(self.__count <= self.capacity):
+                records = self.__records[:self.__count]
+            else:
+                start = self.__count % self.capacity
+                records = self.__records[start:] + self.__records[:start]
+
+        if(isinstance(levels, str)):
+            levels = [levels]
+        if(levels is not None):
+            levels = {x.lower() for x in levels}
+        if(search is not None):
+            search = search.lower()
+
+        output = []
+        for index, time_, log_type, context_, text, filename, lineno, name in reversed(records):
+            if(limit is not None and len(output) >= limit):
+                break
+            if(after is not None and index <= after):
+                break  # records are in index order - so all remaining records are older
+            if(start_time is not None and time_ < start_time):
+                continue
+            if(end_time is not None and time_ > end_time):
+                continue
+            if(levels is not None and str(log_type).lower() not in levels):
+                continue
+            if(context is not None and context_ != context):
+                continue
+            if(search is not None and search not in text.lower()):
+                continue
+            output.append({
+                "index": index,
+                "time": time_,
+                "type": log_type,
+                "context": context_,
+                "text": text,
+                "file": filename,
+                "line": lineno,
+                "function": name
+            })
+
+        output.reverse()
+        return output
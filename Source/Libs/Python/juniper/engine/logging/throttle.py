@@ -0,0 +1,155 @@
+"""
+De-duplication / rate limiting for log records
+
+Records are keyed by (context, log type, text template) - where the template is the log text with all numbers
+and quoted strings replaced (Ie, `Failed to export "chair_01" (lod 2)` -> `Failed to export # (lod #)`).
+Each key has a token bucket which allows a burst of `LOG_BURST` records, refilled at `LOG_RATE` records per second.
+Records over the limit are suppressed and collapsed into a single "(N more occurrences)" record for each key,
+which is written every `FLUSH_INTERVAL` seconds (from the Juniper tick or the next log call).
+
+Rate limiting can be disabled with "juniper:log_rate_limit=false"
+"""
+import re
+import sys
+import threading
+import time
+
+import juniper.engine.logging.pipeline
+import juniper.runtime.types.framework.singleton
+
+
+# number of records with the same key written before records are suppressed
+LOG_BURST = 5
+
+# number of records per second with the same key written once the burst has been used
+LOG_RATE = 1.0
+
+# seconds between writing the suppressed record summaries
+FLUSH_INTERVAL = 2.0
+
+TEMPLATE_PATTERN = re.compile(r"\"[^\"]*\"|'[^']*'|\d+")
+
+
+def get_template(log_text):
+    """
+    :param <str:log_text> The log text
+    :return <str:template> The log text with all numbers and quoted strings replaced with "#"
+    """
+    return TEMPLATE_PATTERN.sub("#", str(log_text))
+
+
+class _LogBucket(object):
+    __slots__ = ("tokens", "time", "suppressed", "log_text", "notify", "persistent", "log_func")
+
+    def __init__(self, tokens, time_):
+        """
+        The token bucket / suppressed records for a single log key
+        """
+        self.tokens = tokens
+        self.time = time_
+        self.suppressed = 0
+        self.log_text = None
+        self.notify = False
+        self.persistent = False
+        self.log_func = None
+
+
+class LogThrottle(object, metaclass=juniper.runtime.types.framework.singleton.Singleton):
+    def __init__(self):
+        """
+        Manager class which de-duplicates / rate limits log records
+        """
+        self.enabled = "juniper:log_rate_limit=false" not in sys.argv
+        self.burst = LOG_BURST
+        self.rate = LOG_RATE
+        self.__buckets = {}  # (context, log type, template) -> _LogBucket
+        self.__lock = threading.Lock()
+        self.__last_flush = time.perf_counter()
+        self.__subscription = None
+
+    def allow(self, context, log_type, log_text, silent=False, persistent=False, log_func=None):
+        """
+        Checks if a record should be written - records which are not allowed are counted towards the summary for their key
+        :param <str:context> The context of the record (Ie, the owning plugin)
+        :param <str:log_type> The type of log (Ie, "Error")
+        :param <str:log_text> The log text
+        :param [<bool:silent>] Is the record silent? (no popup)
+        :param [<bool:persistent>] Does the popup for the record persist until it is manually closed?
+        :param [<func:log_func>] The `log_class` method used to write the record to the console
+        :return <bool:allowed> True if the record should be written - else False
+        """
+        if(not self.enabled):
+            return True
+
+        now = time.perf_counter()
+        key = (context, log_type, get_template(log_text))
+        with self.__lock:
+            bucket = self.__buckets.get(key)
+            if(bucket is None):
+                bucket = self.__buckets[key] = _LogBucket(self.burst, now)
+            bucket.tokens = min(self.burst, bucket.tokens + (now - bucket.time) * self.rate)
+            bucket.time = now
+
+            if(bucket.tokens >= 1):
+                bucket.tokens -= 1
+                allowed = True
+            else:
+                bucket.suppressed += 1
+                bucket.log_text = log_text
+                bucket.notify = bucket.notify or not silent
+                bucket.persistent = bucket.persistent or persistent
+                bucket.log_func = log_func
+                allowed = False
+
+        if(not allowed):
+            self.__subscribe()
+        if(now - self.__last_flush >= FLUSH_INTERVAL):
+            self.flush()
+        return allowed
+
+    def flush(self):
+        """
+        Writes a summary record for every key with suppressed records
+        :return <bool:activity> True if any summaries were written - else False
+        """
+        now = time.perf_counter()
+        summaries = []
+        with self.__lock:
+            self.__last_flush = now
+            for key, bucket in list(self.__buckets.items()):
+                if(bucket.suppressed):
+                    summaries.append((key, bucket.suppressed, bucket.log_text, bucket.notify, bucket.persistent, bucket.log_func))
+                    bucket.suppressed = 0
+                    bucket.notify = False
+                    bucket.persistent = False
+                elif(bucket.tokens + (now - bucket.time) * self.rate >= self.burst):
+                    del self.__buckets[key]  # the bucket is full again - so is the same as a new bucket
+
+        log_pipeline = juniper.engine.logging.pipeline.LogPipeline()
+        for (context, log_type, _), count, log_text, notify, persistent, log_func in summaries:
+            summary_text = f"{log_text} ({count} more occurrence{'s' if count > 1 else ''})"
+            log_pipeline.write(juniper.engine.logging.pipeline.LogRecord(
+                log_type,
+                summary_text,
+                context,
+                log_func=log_func
+            ))
+            if(notify):
+                log_pipeline.notify(summary_text, log_type, context, persistent=persistent)
+
+        return bool(summaries)
+
+    def __subscribe(self):
+        """
+        Subscribes `flush` to the Juniper tick - so summaries are written when no further records are logged
+        Only subscribed from the main thread - other threads rely on the next flush from `allow`
+        """
+        if(self.__subscription is None and threading.current_thread() is threading.main_thread()):
+            import juniper.engine.tick
+            tick_scheduler = juniper.engine.tick.TickScheduler()
+            if(tick_scheduler.active):
+                self.__subscription = tick_scheduler.subscribe(
+                    self.flush,
+                    rate=1.0 / FLUSH_INTERVAL,
+                    name="LogThrottle.flush"
+                )
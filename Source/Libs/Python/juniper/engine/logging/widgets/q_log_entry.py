@@ -1,4 +1,5 @@
 import datetime
+import functools
 import os
 from qtpy import QtWidgets, QtCore, QtGui, uic
 
@@ -6,10 +7,23 @@ import juniper.engine.paths
 import juniper.utilities.string as string_utils
 
 
+@functools.lru_cache()
+def get_icon(info_type):
+    """
+    :param <str:info_type> The type of log (Ie, "Error")
+    :return <QIcon:icon> The icon for the log type
+    """
+    return QtGui.QIcon(os.path.join(juniper.engine.paths.root(), f"Resources\\Icons\\Standard\\{info_type}.png"))
+
+
 class QLogEntry(QtWidgets.QWidget):
+    # emitted with the entry when it is closed - so the log holder can reuse it
+    closed = QtCore.Signal(object)
+
     def __init__(self, info_string, info_type, owning_plugin, persistent=False):
         """
         A single log entry widget - added as a child to the log holder
+        Entries are reused by the log holder once closed (see `set_entry`)
         :param <str:info_string> The info / description string for this log entry
         :param <str:info_type> The type of log this is, current options include ["Info", "Success", "Error", "Warning"]. Icons are retrieved from this name.
         :param <str:owning_plugin> The name of the owning plugin (Ie, "Juniper"). Can be overriden for individual tools.
@@ -20,10 +34,6 @@ class QLogEntry(QtWidgets.QWidget):
         self.setFixedHeight(90)
         self.setSizePolicy(QtWidgets.QSizePolicy.Minimum, QtWidgets.QSizePolicy.Fixed)
 
-        #
-        self.persistent = persistent
-        self.creation_time = datetime.datetime.now()
-
         # layout
         self._layout = QtWidgets.QHBoxLayout()
         self._layout.addStretch()
@@ -42,28 +52,46 @@ class QLogEntry(QtWidgets.QWidget):
         """)
 
         # uic
-        self.uic_path = __file__.replace(".py", ".ui")
+        # resolved from the workspace - as ui files are not included in the library bundle
+        self.uic_path = os.path.join(
+            juniper.engine.paths.root(),
+            "Source\\Libs\\Python\\juniper\\engine\\logging\\widgets\\q_log_entry.ui"
+        )
         uic.loadUi(self.uic_path, baseinstance=self._frame)
         self.ui = self._frame
 
         self.ui.btn_close.clicked.connect(self.close)
         self.ui.btn_close.setFixedSize(30, 30)
+        self.ui.lbl_description.setSizePolicy(QtWidgets.QSizePolicy.Expanding, QtWidgets.QSizePolicy.Minimum)
+
+        btn_icon_size = 32
+        self.ui.btn_icon.setFixedSize(btn_icon_size, btn_icon_size)
+        self.ui.btn_icon.setIconSize(QtCore.QSize(btn_icon_size, btn_icon_size))
+
+        self.set_entry(info_string, info_type, owning_plugin, persistent=persistent)
+
+    def set_entry(self, info_string, info_type, owning_plugin, persistent=False):
+        """
+        Sets the contents of the entry
+        :param <str:info_string> The info / description string for this log entry
+        :param <str:info_type> The type of log this is, current options include ["Info", "Success", "Error", "Warning"]
+        :param <str:owning_plugin> The name of the owning plugin (Ie, "Juniper")
+        :param [<bool:persistent>] Does this log persist until manually closed?
+        """
+        self.persistent = persistent
+        self.creation_time = datetime.datetime.now()
 
         self.ui.lbl_title.setText(f"""<p><span style="font-size:14px"><strong>{info_type}</strong></span></p>""")
 
         info_string = string_utils.truncate(info_string, 125, do_ellipsis=True)
         self.ui.lbl_description.setText(f"""<span style="font-size:13px">{info_string}</span>""")
-        self.ui.lbl_description.setSizePolicy(QtWidgets.QSizePolicy.Expanding, QtWidgets.QSizePolicy.Minimum)
 
         self.ui.lbl_owner.setText(f"""<span style="font-size:11px; font-weight: lighter;">{owning_plugin}</span>""")
 
-        btn_icon_size = 32
-        icon = QtGui.QIcon(os.path.join(juniper.engine.paths.root(), f"Resources\\Icons\\Standard\\{info_type}.png"))
-        self.ui.btn_icon.setFixedSize(btn_icon_size, btn_icon_size)
-        self.ui.btn_icon.setIcon(icon)
-        self.ui.btn_icon.setIconSize(QtCore.QSize(btn_icon_size, btn_icon_size))
+        self.ui.btn_icon.setIcon(get_icon(info_type))
 
     def close(self):
-        """Closes this log widget"""
-        self.setParent(None)
-        self.deleteLater()
+        """Closes this log widget - it is hidden and handed back to the log holder"""
+        self.hide()
+        self.closed.emit(self)
+        return True
@@ -1,15 +1,28 @@
+import collections
 import ctypes
 from ctypes.wintypes import HWND, DWORD, RECT
 import datetime
 from qtpy import QtWidgets, QtCore
 
+import juniper.engine.tick
 import juniper.runtime.widgets as qt_utils
+from juniper.engine.logging.widgets import q_log_entry
+
+
+# maximum number of log entries displayed at once - older entries are reused for new ones
+MAX_VISIBLE_ENTRIES = 5
+
+# maximum number of entries waiting for a persistent entry to be closed - older queued entries are only counted
+MAX_QUEUED_ENTRIES = 100
 
 
 class QLogHolder(QtWidgets.QWidget):
     def __init__(self):
         """
         Container class / widget used for displaying / holding log entries
+        At most `MAX_VISIBLE_ENTRIES` entries are shown - closed entries are kept in a pool and reused, and any entries
+        which could not be shown are counted in an overflow label
+        If every visible entry is persistent then new entries are queued (and counted) until one is closed
         """
         super(QLogHolder, self).__init__(parent=qt_utils.get_main_window())
 
@@ -18,81 +31,206 @@ class QLogHolder(QtWidgets.QWidget):
         self.setSizePolicy(QtWidgets.QSizePolicy.Expanding, QtWidgets.QSizePolicy.Expanding)
         qt_utils.initialize_host_window_parenting(self)
 
-        self.children = []
+        self.children = []  # visible entries - oldest first
+        self.__pool = []  # hidden entries which can be reused
+        self.__queued = collections.deque(maxlen=MAX_QUEUED_ENTRIES)  # (add_entry args) waiting for space
+        self.__size_hint = None
+        self.overflow_count = 0
 
         #
         self._layout = QtWidgets.QVBoxLayout()
         self._layout.setAlignment(QtCore.Qt.AlignBottom)
         self.setLayout(self._layout)
 
+        self.lbl_overflow = QtWidgets.QLabel()
+        self.lbl_overflow.setAlignment(QtCore.Qt.AlignRight)
+        self.lbl_overflow.setStyleSheet("""
+            QLabel{
+                background-color:rgba(50, 50, 50, 255);
+                padding: 4px;
+            }
+        """)
+        self.lbl_overflow.hide()
+        self._layout.addWidget(self.lbl_overflow)
+
         # display timers
-        self.timer_check_interval_seconds = 2
+        self.timer_check_interval_seconds = 0.5
         self.max_log_display_time_seconds = 10
-        self.check_timer = QtCore.QTimer()
-        self.check_timer.timeout.connect(self.refresh)
-        self.check_timer.start(self.timer_check_interval_seconds * 1000)
 
-        # drag timer
-        # Note: This updates 20 times a second, it's not too expensive of a function
-        # but if we have issues here may be the first place to look
+        # the position follows the move / resize events of the main window
+        # hosts without a Qt main window (Ie, the window is only known by its HWND) fall back to polling it
         self.__have_cached_parent_hwnd_data = False
         self.timer_update_geometry_interval_seconds = 0.05
-        self.timer_update_geometry = QtCore.QTimer()
-        self.timer_update_geometry.timeout.connect(self.refresh_position)
-        self.timer_update_geometry.start(self.timer_update_geometry_interval_seconds * 1000)
+        self.main_window = qt_utils.get_main_window()
+        if(self.main_window is not None):
+            self.main_window.installEventFilter(self)
+
+        # when the Juniper tick is running both updates are coalesced onto the tick scheduler
+        # otherwise (Ie, the tick is disabled) they fall back to their own timers
+        self.timer_update_geometry = None
+        tick_scheduler = juniper.engine.tick.TickScheduler()
+        if(tick_scheduler.active):
+            self.check_timer = tick_scheduler.subscribe(
+                self.refresh,
+                rate=1.0 / self.timer_check_interval_seconds,
+                name="QLogHolder.refresh"
+            )
+            if(self.main_window is None):
+                self.timer_update_geometry = tick_scheduler.subscribe(
+                    self.poll_position,
+                    rate=1.0 / self.timer_update_geometry_interval_seconds,
+                    name="QLogHolder.poll_position"
+                )
+        else:
+            self.check_timer = QtCore.QTimer()
+            self.check_timer.timeout.connect(self.refresh)
+            self.check_timer.start(int(self.timer_check_interval_seconds * 1000))
 
-    def addWidget(self, widget):
+            if(self.main_window is None):
+                self.timer_update_geometry = QtCore.QTimer()
+                self.timer_update_geometry.timeout.connect(self.poll_position)
+                self.timer_update_geometry.start(int(self.timer_update_geometry_interval_seconds * 1000))
+
+    def eventFilter(self, watched, event):
         """
-        Adds a widget to the holder - this should only be log entries!
-        :param <QLogEntry:widget> The widget to add
+        Moves the holder with the main window
         """
-        self._layout.addWidget(widget)
-        if(widget not in self.children):
-            self.children.append(widget)
-        self.refresh()
+        if(self.children and event.type() in (
+            QtCore.QEvent.Move,
+            QtCore.QEvent.Resize,
+            QtCore.QEvent.WindowStateChange,
+            QtCore.QEvent.Show
+        )):
+            self.refresh_position(force=True)
+        return False
 
-    def sizeHint(self):
+    # ---------------------------------------------------------------------
+
+    def add_entry(self, info_string, info_type, owning_module="Juniper", persistent=False):
         """
-        Overrides sizeHint to take into account the contents
-        :return <QSize:size> The size hint
+        Shows a log entry - reusing a pooled entry widget where possible
+        If the maximum number of entries are already shown the oldest non persistent entry is replaced - if all of the
+        shown entries are persistent then the entry is queued until one of them is closed
+        :param <str:info_string> The info / description string for this log entry
+        :param <str:info_type> The type of log this is, current options include ["Info", "Success", "Error", "Warning"]
+        :param [<str:owning_module>] The name of the owning module (Ie, "Juniper")
+        :param [<bool:persistent>] Does this log persist until manually closed?
+        :return <QLogEntry:entry> The log entry widget - None if the entry was queued
         """
-        width = 0
-        height = 0
+        if(len(self.children) >= MAX_VISIBLE_ENTRIES):
+            replaced = next((x for x in self.children if not x.persistent), None)
+            self.overflow_count += 1
+            if(replaced is None):
+                self.__queued.append((info_string, info_type, owning_module, persistent))
+                self.__update()
+                return None
+            self.__release(replaced)
 
-        for i in reversed(self.children):
-            try:
-                width = max(i.sizeHint().width(), width)
-                height += i.sizeHint().height() + self._layout.spacing()
-            except Exception:
-                self.children.remove(i)
+        entry = self.__show(info_string, info_type, owning_module, persistent)
+        self.__update()
+        return entry
 
-        return QtCore.QSize(width, height)
+    def __show(self, info_string, info_type, owning_module, persistent):
+        """
+        Shows a log entry - reusing a pooled entry widget where possible
+        :return <QLogEntry:entry> The log entry widget
+        """
+        if(self.__pool):
+            entry = self.__pool.pop()
+            entry.set_entry(info_string, info_type, owning_module, persistent=persistent)
+        else:
+            entry = q_log_entry.QLogEntry(info_string, info_type, owning_module, persistent=persistent)
+            entry.closed.connect(self.__on_entry_closed)
+
+        self._layout.addWidget(entry)
+        entry.show()
+        self.children.append(entry)
+        return entry
+
+    def add_overflow(self, count):
+        """
+        Counts log entries which were never shown (Ie, dropped before reaching the holder)
+        :param <int:count> The number of entries
+        """
+        if(count):
+            self.overflow_count += count
+            self.__update()
+
+    def __on_entry_closed(self, entry):
+        if(entry in self.children):
+            self.__release(entry)
+            self.__update()
+
+    def __release(self, entry):
+        """
+        Removes a visible entry and returns it to the pool
+        :param <QLogEntry:entry> The entry to release
+        """
+        self.children.remove(entry)
+        self._layout.removeWidget(entry)
+        entry.hide()
+        self.__pool.append(entry)
+
+    def __update(self):
+        """
+        Updates the overflow label / size after the visible entries have changed
+        Queued entries are shown first if there is space for them
+        """
+        while(self.__queued and len(self.children) < MAX_VISIBLE_ENTRIES):
+            self.__show(*self.__queued.popleft())
+            self.overflow_count -= 1
+
+        if(not self.children):
+            self.overflow_count = 0  # the overflow count only applies to the current burst of entries
+        if(self.overflow_count):
+            self.lbl_overflow.setText(f"+{self.overflow_count} more")
+            self.lbl_overflow.show()
+        else:
+            self.lbl_overflow.hide()
+
+        self.__size_hint = None
+        self.setVisible(bool(self.children))
+        self.refresh_position(force=True)
+        juniper.engine.tick.TickScheduler().notify_activity()  # new entries need the holder updated at full rate
+
+    def sizeHint(self):
+        """
+        Overrides sizeHint to take into account the contents - cached until the visible entries change
+        :return <QSize:size> The size hint
+        """
+        if(self.__size_hint is None):
+            width = 0
+            height = 0
+            widgets = ([self.lbl_overflow] if self.overflow_count else []) + self.children
+            for i in widgets:
+                size_hint = i.sizeHint()
+                width = max(size_hint.width(), width)
+                height += size_hint.height() + self._layout.spacing()
+            self.__size_hint = QtCore.QSize(width, height)
+        return self.__size_hint
 
     def refresh(self):
         """
-        Updates the log holder and contents
+        Closes all expired log entries
+        :return <bool:activity> True if any entries were closed - else False
         """
-        # check for outdated widgets
         current_time = datetime.datetime.now()
-        num_deleted = 0
-        for i in self.children:
-            if(not i.persistent):
-                if((current_time - i.creation_time).total_seconds() > self.max_log_display_time_seconds):
-                    num_deleted += 1
-                    try:
-                        i.close()
-                    except Exception:  # for the "Internal C++ Object already deleted" exception, which is handled after this loop
-                        pass
-                    else:  # if we remove 1 then wait until next loop, to ensure we aren't closing everything in one big batch
-                        break
-
-        # remove invalid entries
-        for i in reversed(self.children):
-            if(not i):
-                self.children.pop(i)
-
-        # update position with window
-        self.refresh_position(force=True)
+        expired = [
+            x for x in self.children
+            if not x.persistent and (current_time - x.creation_time).total_seconds() > self.max_log_display_time_seconds
+        ]
+        for i in expired:
+            self.__release(i)
+        if(expired):
+            self.__update()
+        return bool(expired)
+
+    def poll_position(self):
+        """
+        Updates the position while entries are visible - for hosts without a Qt main window
+        """
+        if(self.children):
+            self.refresh_position()
 
     def refresh_position(self, force=False):
         """
@@ -118,13 +256,12 @@ class QLogHolder(QtWidgets.QWidget):
         if(not force and self.__prev_rect_bottom_right == (rect.right, rect.bottom)):
             return
 
-        log_width_height = (self.sizeHint().width(), self.sizeHint().height())
-
+        size_hint = self.sizeHint()
         padding = 8
         self.setGeometry(
-            bottom_right[0] - log_width_height[0] - padding,
-            bottom_right[1] - log_width_height[1] - padding,
-            log_width_height[0],
-            log_width_height[1]
+            bottom_right[0] - size_hint.width() - padding,
+            bottom_right[1] - size_hint.height() - padding,
+            size_hint.width(),
+            size_hint.height()
         )
         self.__prev_rect_bottom_right = bottom_right
@@ -0,0 +1,206 @@
+"""
+Parsed `.jplugin` manifests
+
+Each `.jplugin` is loaded and validated once and the resulting manifest is shared by the plugin and all of the
+scripts / tools within its root. Manifests are re-validated against the file mtime / size after `invalidate`
+is called (Ie, on `JuniperEngine().refresh()`).
+"""
+import json
+import os
+
+import juniper
+import juniper.runtime.types.framework.singleton
+
+
+INTEGRATION_TYPES = ("integrated", "separate", "standalone")
+
+# key -> (expected types, default value)
+MANIFEST_KEYS = {
+    "integration_type": ((str,), None),
+    "description": ((str,), ""),
+    "enabled": ((bool,), True),
+    "internal": ((bool,), False),
+    "force_single_menu": ((bool,), False),
+    "supported_hosts": ((list,), []),
+    "unsupported_hosts": ((list,), []),
+    "dependencies": ((list,), []),
+    "thread_safe": ((bool,), False),
+    "tick_rate": ((int, float), None),
+}
+
+
+class PluginManifest(object):
+    def __init__(self, jplugin_path, stat=None):
+        """
+        A parsed and validated `.jplugin` file
+        :param <str:jplugin_path> The path to the `.jplugin`
+        :param [<os.stat_result:stat>] The stat result of the file - if None it is read
+        """
+        self.path = jplugin_path
+        self.errors = []
+        self.data = {}
+
+        try:
+            stat = stat or os.stat(jplugin_path)
+            self.mtime = stat.st_mtime_ns
+            self.size = stat.st_size
+        except OSError:
+            self.mtime = None
+            self.size = None
+            self.errors.append("File does not exist")
+            return
+
+        try:
+            with open(jplugin_path, "r") as f:
+                data = json.load(f)
+        except Exception as e:
+            self.errors.append(f"Failed to parse: {e}")
+            return
+
+        if(not isinstance(data, dict)):
+            self.errors.append("Manifest must be a json object")
+            return
+
+        self.data = self.__validate(data)
+
+    def __repr__(self):
+        return f"PluginManifest(\"{self.path}\")"
+
+    def __validate(self, data):
+        """
+        Validates the known manifest keys - any invalid values are removed (so their default is used)
+        :param <dict:data> The loaded json data
+        :return <dict:data> The validated data
+        """
+        for key, (types, _) in MANIFEST_KEYS.items():
+            if(key in data and data[key] is not None):
+                value = data[key]
+                if(not isinstance(value, types) or (bool in types) != isinstance(value, bool)):
+                    self.errors.append(f"Invalid value for \"{key}\": {value!r}")
+                    data.pop(key)
+                elif(key == "integration_type" and value not in INTEGRATION_TYPES):
+                    self.errors.append(f"Unknown integration type: {value!r}")
+                    data.pop(key)
+        return data
+
+    @property
+    def valid(self):
+        """
+        :return <bool:valid> True if the manifest loaded without errors - else False
+        """
+        return not self.errors
+
+    def to_dict(self):
+        """
+        :return <dict:data> The manifest as json serializable data
+        """
+        return {"data": self.data, "errors": self.errors, "mtime": self.mtime, "size": self.size}
+
+    @classmethod
+    def from_dict(cls, jplugin_path, data):
+        """
+        Creates a manifest from previously parsed data (Ie, from the warm start snapshot) without reading the file
+        :param <str:jplugin_path> The path to the `.jplugin`
+        :param <dict:data> The manifest data (see `to_dict`)
+        :return <PluginManifest:manifest> The manifest
+        """
+        output = cls.__new__(cls)
+        output.path = jplugin_path
+        output.data = data["data"]
+        output.errors = data["errors"]
+        output.mtime = data["mtime"]
+        output.size = data["size"]
+        return output
+
+    def is_current(self, stat):
+        """
+        :param <os.stat_result:stat> The current stat result for the `.jplugin`
+        :return <bool:current> True if the manifest matches the file on disk - else False
+        """
+        return self.mtime == stat.st_mtime_ns and self.size == stat.st_size
+
+    def get(self, key, default=None):
+        """
+        Gets a value from the manifest - falling back to the default for known keys
+        :param <str:key> The key to get
+        :param [<object:default>] The value returned if the key is not set (and is not a known key)
+        :return <object:value> The value
+        """
+        if(key in self.data):
+            return self.data[key]
+        if(key in MANIFEST_KEYS and default is None):
+            return MANIFEST_KEYS[key][1]
+        return default
+
+    # ---------------------------------------------------------------------
+
+    @property
+    def integration_type(self):
+        """
+        :return <str:type> The integration type of the plugin - None if not set
+        """
+        return self.data.get("integration_type")
+
+    @property
+    def enabled(self):
+        return self.get("enabled")
+
+    @property
+    def internal(self):
+        return self.get("internal")
+
+
+class ManifestCache(object, metaclass=juniper.runtime.types.framework.singleton.Singleton):
+    def __init__(self):
+        """
+        Manager class which holds a single parsed manifest per `.jplugin`
+        """
+        self.__manifests = {}
+        self.__validated = set()
+
+    def get(self, jplugin_path):
+        """
+        Gets the manifest for a `.jplugin` - each manifest is checked against the file on disk once per session
+        :param <str:jplugin_path> The path to the `.jplugin`
+        :return <PluginManifest:manifest> The manifest
+        """
+        key = os.path.normpath(jplugin_path).lower()
+        manifest = self.__manifests.get(key)
+        if(manifest is not None and key in self.__validated):
+            return manifest
+
+        self.__validated.add(key)
+        try:
+            stat = os.stat(jplugin_path)
+        except OSError:
+            stat = None
+
+        if(manifest is None or stat is None or not manifest.is_current(stat)):
+            manifest = PluginManifest(jplugin_path, stat=stat)
+            self.__manifests[key] = manifest
+            if(manifest.errors):
+                log = getattr(juniper, "log", None)  # manifests may be loaded before the log is initialized
+                if(log is not None):
+                    log.warning(f"Invalid plugin manifest {jplugin_path}: {'; '.join(manifest.errors)}", traceback=False, silent=True)
+
+        return manifest
+
+    def restore(self, manifest):
+        """
+        Adds a previously parsed manifest (Ie, from the warm start snapshot) - this is treated as validated
+        for the current session
+        :param <PluginManifest:manifest> The manifest
+        """
+        key = os.path.normpath(manifest.path).lower()
+        self.__manifests[key] = manifest
+        self.__validated.add(key)
+
+    def invalidate(self, jplugin_path=None):
+        """
+        Marks manifests to be checked against the file on disk on next access
+        :param [<str:jplugin_path>] The path to the `.jplugin` - if None all manifests are invalidated
+        """
+        if(jplugin_path is None):
+            self.__validated.clear()
+        else:
+            self.__validated.discard(os.path.normpath(jplugin_path).lower())
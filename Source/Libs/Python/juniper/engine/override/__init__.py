@@ -1,27 +1,140 @@
-import importlib
-import inspect
+"""
+Host override system for Juniper libraries
+
+A host may override any Juniper library module by mirroring its path in the host directory
+(Ie, "Source\\Libs\\Python\\juniper\\runtime\\types\\math\\vector.py" ->
+"Source\\Hosts\\Max\\Source\\Libs\\Python\\juniper\\runtime\\types\\math\\vector.py").
+
+The host directory is indexed once when the import hook is created - imports of modules without an override
+are ignored by the hook entirely, so no additional filesystem work is done for them.
+Modules imported from the library bundle are matched against the index by the workspace file they were bundled from.
+"""
+import importlib.abc
+import importlib.util
 import os
 import sys
-from importlib.machinery import SourceFileLoader
 
 import juniper
 import juniper.engine.paths
 
 
+def get_module_name(relative_path):
+    """
+    Gets the name a python file is imported as from its path relative to the workspace root
+    :param <str:relative_path> The relative path (Ie, "Source\\Libs\\Python\\juniper\\engine\\paths.py")
+    :return <str:name> The module name (Ie, "juniper.engine.paths") - None if the file is not in a library directory
+    """
+    components = os.path.normpath(relative_path).replace("/", "\\").split("\\")
+    for i in range(len(components) - 1, 1, -1):
+        if(components[i - 1].lower() == "python" and components[i - 2].lower() == "libs"):
+            components = components[i:]
+            break
+    else:
+        return None
+
+    components[-1] = os.path.splitext(components[-1])[0]
+    if(components[-1] == "__init__"):
+        components.pop()
+    return ".".join(components) or None
+
+
+def get_source_path(path):
+    """
+    :param <str:path> The path to a library file - which may be within the library bundle
+    :return <str:path> The path to the file in the workspace
+    """
+    import juniper_globals
+    library_bundle = juniper_globals.get("library_bundle")
+    if(library_bundle is not None):
+        return library_bundle.to_source_path(path) or path
+    return path
+
+
+def get_import_hook():
+    """
+    :return <JuniperImportHook:hook> The import hook installed in `sys.meta_path` - None if it is not installed
+    """
+    for i in sys.meta_path:
+        if(isinstance(i, JuniperImportHook)):
+            return i
+    return None
+
+
+class JuniperOverrideLoader(importlib.abc.Loader):
+    def __init__(self, loader, override_path):
+        """
+        Wraps the loader of a Juniper library module which has a host override
+        :param <Loader:loader> The original loader for the module
+        :param <str:override_path> The path to the host override file
+        """
+        self.loader = loader
+        self.override_path = override_path
+
+    def __getattr__(self, name):
+        # delegate everything else (Ie, `get_source` for tracebacks) to the original loader
+        return getattr(self.loader, name)
+
+    def create_module(self, spec):
+        return self.loader.create_module(spec)
+
+    def exec_module(self, module):
+        """
+        Executes the original module, then loads the host override and implements it to the module
+        for this and future imports
+        :param <Module:module> The module to execute
+        """
+        self.loader.exec_module(module)
+
+        module_name = module.__name__
+        override_module_name = f"{module_name}.override"
+        override_spec = importlib.util.spec_from_file_location(override_module_name, self.override_path)
+        override_module = importlib.util.module_from_spec(override_spec)
+        sys.modules[override_module_name] = override_module
+        override_spec.loader.exec_module(override_module)
+
+        # this will override the module saved to sys.modules
+        # meaning all imports from now on will get this one
+        # the override module however will keep its reference to the parent module
+        # Note: This probably won't work if we run `importlib.reload` on the module after this point!
+        sys.modules[module_name] = override_module
+
+        # add all attributes which are missing from the original module to this new one
+        for k, v in list(vars(module).items()):
+            if(not hasattr(override_module, k)):
+                setattr(override_module, k, v)
+
+
 class JuniperImportHook(object):
-    def __init__(self):
+    def __init__(self, host=None, workspace_root=None, install=True, index=None):
         """
-        Class added to `sys.meta_path` to hook post-import logic for juniper libraries
+        Class added to `sys.meta_path` to apply host overrides to juniper libraries
+        :param [<str:host>] The name of the host - defaults to the current host context
+        :param [<str:workspace_root>] The root directory of the workspace - defaults to the current workspace
+        :param [<bool:install>] Should the hook be added to `sys.meta_path`?
+        :param [<dict:index>] A previously built override index (see `get_index`) - if None the host directory is walked
         """
-        sys.meta_path.insert(0, self)
-        self.checked_modules = set()
+        self.host = host or juniper.program_context
+        self.workspace_root = workspace_root or juniper.engine.paths.root()
+        self.overrides = {}  # lowercase base file path -> override file path
+        self.override_names = set()
+        self.directories = {}  # directory -> mtime of every walked directory
+        self.__resolving = set()
+
+        if(index is not None):
+            self.overrides = dict(index["overrides"])
+            self.override_names = set(index["names"])
+            self.directories = dict(index["directories"])
+        else:
+            self.build_override_index()
+        if(install):
+            sys.meta_path.insert(0, self)
 
     @property
     def current_host(self):
         """
         :return <str:name> The name of the current host context
         """
-        return juniper.program_context
+        return self.host
 
     @property
     def current_host_root(self):
@@ -29,66 +142,92 @@ class JuniperImportHook(object):
         :return <str:dir> The root directory of the current host implementation
         """
         if(self.current_host):
-            return os.path.join(juniper.engine.paths.root(), "Source\\Hosts", self.current_host)
+            return os.path.join(self.workspace_root, "Source\\Hosts", self.current_host)
         return None
 
-    def find_module(self, full_name, path=None):
+    def __key(self, file_path):
+        return os.path.normpath(file_path).lower()
+
+    def build_override_index(self):
         """
-        Delegate called to find a module given its name
-        :param <str:full_name> The name of the module to find
-        :param [<str:path>] The path to the file
+        Walks the current host directory and indexes every python file which mirrors a file in the workspace
+        :return <int:count> The number of indexed overrides
         """
-        # TODO! Juniper Engine: Only run this for Juniper library modules
-        if(not full_name.startswith("juniper")):
-            return None
-
-        if(full_name in self.checked_modules):
-            return None
+        self.overrides = {}
+        self.override_names = set()
+        self.directories = {}
 
-        self.checked_modules.add(full_name)
-        return self
+        import juniper.engine.scanner  # imported here as `juniper.engine.scanner` depends on `juniper.runtime`
+        host_root = self.current_host_root
+        if(not host_root or not os.path.isdir(host_root)):
+            return 0
 
-    def post_import(self, module, module_name):
-        """
-        Ran after a successful import of a Juniper based module
-        This function will search for overrides - given the current host context
-        and implement them to the module for this and future imports
-        :param <Module:module> The imported module
-        :param <str:module_name> The name of the module
-        """
-        module_overrides = self.find_file_overrides(module.__file__, check_core=False)
-        if(not module_overrides):
-            return None
+        stack = [host_root]
+        while(stack):
+            directory = stack.pop()
+            try:
+                self.directories[directory] = os.stat(directory).st_mtime_ns
+                entries = list(os.scandir(directory))
+            except OSError:
+                continue
 
-        override_module_name = f"{module_name}.override"
-        override_loader = SourceFileLoader(override_module_name, module_overrides[0])
-        override_module = override_loader.load_module(override_module_name)
+            for entry in entries:
+                name = entry.name.lower()
+                try:
+                    is_dir = entry.is_dir()
+                except OSError:
+                    continue
 
-        # this will override the module saved to sys.modules
-        # meaning all imports from now on will get this one
-        # the override module however will keep its reference to the parent module
-        # Note: This probably won't work if we run `importlib.reload` on the module after this point!
-        sys.modules[module_name] = override_module
+                if(is_dir):
+                    if(name not in juniper.engine.scanner.PRUNED_DIRECTORIES):
+                        stack.append(entry.path)
+                elif(name.endswith(".py")):
+                    relative_path = os.path.relpath(entry.path, host_root)
+                    module_name = get_module_name(relative_path)
+                    if(module_name and module_name.startswith("juniper")):
+                        base_path = os.path.join(self.workspace_root, relative_path)
+                        self.overrides[self.__key(base_path)] = entry.path
+                        self.override_names.add(module_name)
 
-        # add all attributes which are missing from the original module to this new one
-        for k, v in inspect.getmembers(module):
-            if(not hasattr(override_module, k)):
-                setattr(override_module, k, v)
+        return len(self.overrides)
 
-        # TODO! Juniper Engine: For `__init__.py` files the path will be updated to the override directory
-        # this should keep the original path
-        # ..
+    def get_index(self):
+        """
+        :return <dict:index> The override index as json serializable data
+        """
+        return {"overrides": self.overrides, "names": sorted(self.override_names), "directories": self.directories}
 
-    def load_module(self, full_name):
+    def find_spec(self, full_name, path=None, target=None):
         """
-        Core logic for loading a module
-        :param <str:full_name> The name of the module
+        Delegate called to find the spec for a module given its name
+        Only modules with an indexed host override are handled - all others are left to the default finders
+        :param <str:full_name> The name of the module to find
+        :param [<[str]:path>] The search path of the parent package
+        :param [<Module:target>] The module being reloaded (if any)
+        :return <ModuleSpec:spec> The spec with the override loader - None if the module has no override
         """
-        importlib.import_module(full_name)
-        module = sys.modules[full_name]
-        self.checked_modules.remove(full_name)
-        self.post_import(module, full_name)
-        return module
+        if(full_name not in self.override_names or full_name in self.__resolving):
+            return None
+
+        self.__resolving.add(full_name)
+        try:
+            spec = None
+            for finder in sys.meta_path:
+                if(finder is self or not hasattr(finder, "find_spec")):
+                    continue
+                spec = finder.find_spec(full_name, path, target)
+                if(spec is not None):
+                    break
+        finally:
+            self.__resolving.discard(full_name)
+
+        if(spec is None or not spec.origin or spec.loader is None):
+            return spec
+
+        override_path = self.overrides.get(self.__key(get_source_path(spec.origin)))
+        if(override_path is not None):
+            spec.loader = JuniperOverrideLoader(spec.loader, override_path)
+        return spec
 
     # ---------------------------------------------------------------------------
 
@@ -112,12 +251,8 @@ class JuniperImportHook(object):
 
         # check for host override
         if(check_host):
-            file_with_override_in_host = file_path.replace(
-                juniper.engine.paths.root(),
-                f"{juniper.engine.paths.root()}\\Source\\Hosts\\{self.current_host}"
-            )
-
-            if(file_with_override_in_host != file_path and os.path.isfile(file_with_override_in_host)):
+            file_with_override_in_host = self.overrides.get(self.__key(file_path))
+            if(file_with_override_in_host is not None):
                 output.append(file_with_override_in_host)
 
         return output
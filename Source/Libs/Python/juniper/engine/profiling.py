@@ -0,0 +1,175 @@
+"""
+Startup profiler used to record where time-to-interactive is spent in each host
+
+Each startup phase (updater, discovery, plugin / module hooks, broadcast scripts..) is timed with `time.perf_counter`
+and the session is appended to a rolling history stored under "Cached\\Profiling\\startup_<host>.json".
+This file should not rely on any other juniper modules - as it is loaded before the juniper libraries are on `sys.path`
+"""
+import contextlib
+import json
+import os
+import statistics
+import time
+from datetime import datetime
+
+
+# number of sessions kept in the history for each host
+HISTORY_SIZE = 20
+
+
+def get_history_path(workspace_root, host):
+    """
+    :param <str:workspace_root> The root directory of the Juniper workspace
+    :param <str:host> The name of the host (Ie, "max")
+    :return <str:path> The path to the startup history file for the host
+    """
+    return os.path.join(workspace_root, f"Cached\\Profiling\\startup_{host.lower()}.json")
+
+
+def load_history(history_path):
+    """
+    Loads the startup history for a host
+    :param <str:history_path> The path to the history file
+    :return <[dict]:sessions> All recorded sessions - oldest first
+    """
+    if(os.path.isfile(history_path)):
+        try:
+            with open(history_path, "r") as f:
+                return json.load(f).get("sessions", [])
+        except Exception:
+            pass
+    return []
+
+
+class StartupProfiler(object):
+    def __init__(self, history_path, history_size=HISTORY_SIZE):
+        """
+        Records the wall time of each startup phase for the current session
+        :param <str:history_path> The path to the history file the session is saved to
+        :param [<int:history_size>] The number of sessions to keep in the history
+        """
+        self.history_path = history_path
+        self.history_size = history_size
+        self.phases = []  # [(name, seconds)] - appended from the startup thread pool so only ever append
+        self.active = False
+        self.__start_time = None
+
+    def start(self):
+        """
+        Starts recording a new session
+        """
+        self.phases = []
+        self.active = True
+        self.__start_time = time.perf_counter()
+
+    @contextlib.contextmanager
+    def phase(self, name):
+        """
+        Context manager which records the wall time of a phase - nothing is recorded if the profiler is inactive
+        :param <str:name> The name of the phase (Ie, "module_discovery" or "on_startup:JuniperInterface")
+        """
+        if(not self.active):
+            yield
+            return
+        start_time = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.phases.append((name, time.perf_counter() - start_time))
+
+    def finish(self):
+        """
+        Stops recording and appends the session to the history
+        :return <dict:session> The recorded session - None if the profiler was not active
+        """
+        if(not self.active):
+            return None
+        self.active = False
+
+        session = {
+            "date": datetime.now().isoformat(timespec="seconds"),
+            "total": time.perf_counter() - self.__start_time,
+            "phases": [list(x) for x in self.phases]
+        }
+
+        history = load_history(self.history_path)
+        history.append(session)
+        try:
+            if(not os.path.isdir(os.path.dirname(self.history_path))):
+                os.makedirs(os.path.dirname(self.history_path))
+            with open(self.history_path, "w") as f:
+                json.dump({"sessions": history[-self.history_size:]}, f)
+        except Exception:
+            pass
+
+        return session
+
+
+# ---------------------------------------------------------------------
+
+
+def get_slowest_phases(session, count=10):
+    """
+    :param <dict:session> A recorded session
+    :param [<int:count>] The maximum number of phases to return
+    :return <[(str, float)]:phases> The slowest phases in the session - slowest first
+    """
+    return sorted((tuple(x) for x in session["phases"]), key=lambda x: x[1], reverse=True)[:count]
+
+
+def find_regressions(history, sessions=5, threshold=0.25, min_delta=0.005):
+    """
+    Compares the latest session against the median of the previous sessions
+    :param <[dict]:history> All recorded sessions - oldest first
+    :param [<int:sessions>] The number of previous sessions to compare against
+    :param [<float:threshold>] The relative increase a phase must exceed to be a regression (0.25 = 25%)
+    :param [<float:min_delta>] The minimum absolute increase in seconds for a phase to be a regression
+    :return <[(str, float, float)]:regressions> (phase name, baseline seconds, latest seconds) - largest increase first
+    """
+    if(len(history) < 2):
+        return []
+
+    latest = history[-1]
+    previous = history[-sessions - 1:-1]
+
+    baselines = {"total": [x["total"] for x in previous]}
+    for session in previous:
+        for name, duration in session["phases"]:
+            baselines.setdefault(name, []).append(duration)
+
+    output = []
+    for name, duration in [("total", latest["total"])] + [tuple(x) for x in latest["phases"]]:
+        if(name in baselines):
+            baseline = statistics.median(baselines[name])
+            if(duration - baseline > max(min_delta, baseline * threshold)):
+                output.append((name, baseline, duration))
+
+    return sorted(output, key=lambda x: x[2] - x[1], reverse=True)
+
+
+def print_report(history_path, count=10, sessions=5):
+    """
+    Prints the slowest phases of the latest session and any regressions against previous sessions
+    :param <str:history_path> The path to the history file
+    :param [<int:count>] The number of slow phases to print
+    :param [<int:sessions>] The number of previous sessions to compare against
+    :return <bool:success> True if a report was printed - False if no sessions have been recorded
+    """
+    history = load_history(history_path)
+    if(not history):
+        print(f"No startup sessions recorded in: {history_path}")
+        return False
+
+    latest = history[-1]
+    print(f"Startup {latest['date']}: {latest['total'] * 1000:.1f}ms ({len(history)} sessions recorded)")
+    print("Slowest phases:")
+    for name, duration in get_slowest_phases(latest, count=count):
+        print(f"  {duration * 1000:9.1f}ms  {name}")
+
+    regressions = find_regressions(history, sessions=sessions)
+    print(f"Regressions against the previous {min(sessions, len(history) - 1)} sessions:")
+    for name, baseline, duration in regressions:
+        print(f"  {name}: {baseline * 1000:.1f}ms -> {duration * 1000:.1f}ms (+{(duration - baseline) * 1000:.1f}ms)")
+    if(not regressions):
+        print("  None")
+    return True
@@ -0,0 +1,233 @@
+"""
+Single pass workspace scanner used during discovery
+
+Each search root is walked once with `os.scandir` and every file of interest (jplugins, module descriptors,
+scripts, tools and config / resource files) is sorted in that walk. Consumers then query the cached
+results for their own sub-root rather than re-globbing the same trees.
+"""
+import os
+
+import juniper.runtime.types.framework.singleton
+
+
+# directories which never contain discoverable files
+PRUNED_DIRECTORIES = {"__pycache__", ".git", ".vscode", "binaries", "cached"}
+
+
+class ScanResult(object):
+    def __init__(self, root):
+        """
+        Container for all files found when scanning a root directory
+        :param <str:root> The root directory that was scanned
+        """
+        self.root = root
+        self.jplugins = []
+        self.module_descriptors = []
+        self.scripts = []
+        self.tools = []
+        self.config = []
+        self.resources = []
+        self.directories = {}  # directory -> mtime of every walked directory (used to fingerprint the result)
+
+    def __repr__(self):
+        return f"ScanResult(\"{self.root}\")"
+
+    @property
+    def categories(self):
+        """
+        :return <[str]:names> The names of all file lists stored in a scan result
+        """
+        return ("jplugins", "module_descriptors", "scripts", "tools", "config", "resources")
+
+    def subset(self, root):
+        """
+        Gets a new scan result containing only the files within a sub directory of this result
+        :param <str:root> The sub directory
+        :return <ScanResult:result> The filtered scan result
+        """
+        output = ScanResult(root)
+        prefix = root.lower().rstrip("\\/") + os.sep
+        for category in self.categories:
+            setattr(output, category, [x for x in getattr(self, category) if x.lower().startswith(prefix)])
+        output.directories = {k: v for k, v in self.directories.items() if (k.lower() + os.sep).startswith(prefix)}
+        return output
+
+    def to_dict(self):
+        """
+        :return <dict:data> The scan result as json serializable data
+        """
+        output = {x: getattr(self, x) for x in self.categories}
+        output["root"] = self.root
+        output["directories"] = self.directories
+        return output
+
+    @classmethod
+    def from_dict(cls, data):
+        """
+        :param <dict:data> Scan result data (see `to_dict`)
+        :return <ScanResult:result> The scan result
+        """
+        output = cls(data["root"])
+        for category in output.categories:
+            setattr(output, category, data.get(category, []))
+        output.directories = data.get("directories", {})
+        return output
+
+    @property
+    def is_current(self):
+        """
+        :return <bool:current> True if none of the walked directories have changed since the scan - else False
+        """
+        for directory, mtime in self.directories.items():
+            try:
+                current_mtime = os.stat(directory).st_mtime_ns
+            except OSError:
+                current_mtime = None
+            if(current_mtime != mtime):
+                return False
+        return True
+
+
+class WorkspaceScanner(object, metaclass=juniper.runtime.types.framework.singleton.Singleton):
+    def __init__(self):
+        """
+        Manager class which walks and caches each discovery search root
+        """
+        self.__results = {}
+        self.__subsets = {}
+
+    def __key(self, root):
+        return os.path.normpath(root).lower()
+
+    def scan(self, root, force=False):
+        """
+        Scans a root directory - results are cached so each root is only walked once
+        :param <str:root> The directory to scan
+        :param [<bool:force>] If True then the root is re-scanned
+        :return <ScanResult:result> The scan result
+        """
+        key = self.__key(root)
+        if(force or key not in self.__results):
+            self.__results[key] = self.__walk(root)
+            self.__subsets = {k: v for k, v in self.__subsets.items() if not k.startswith(key)}
+        return self.__results[key]
+
+    def find(self, root):
+        """
+        Gets the scan result for a directory - this uses the result of any scanned parent directory
+        where possible, otherwise the directory is scanned itself
+        :param <str:root> The directory to get the result for
+        :return <ScanResult:result> The scan result
+        """
+        key = self.__key(root)
+        if(key in self.__results):
+            return self.__results[key]
+        if(key in self.__subsets):
+            return self.__subsets[key]
+
+        for scanned_key, result in self.__results.items():
+            if(key.startswith(scanned_key.rstrip(os.sep) + os.sep)):
+                output = result.subset(root)
+                self.__subsets[key] = output
+                return output
+
+        return self.scan(root)
+
+    def rescan_changed(self):
+        """
+        Re-scans every cached root directory which has changed since it was scanned (Ie, files were added / removed)
+        Only the directory mtimes are checked - so this is much cheaper than clearing and re-walking every root
+        :return <[ScanResult]:results> The results of the roots which were re-scanned
+        """
+        output = []
+        for result in list(self.__results.values()):
+            if(not result.is_current):
+                output.append(self.scan(result.root, force=True))
+        return output
+
+    def clear(self):
+        """
+        Clears all cached scan results
+        """
+        self.__results = {}
+        self.__subsets = {}
+
+    @property
+    def results(self):
+        """
+        :return <[ScanResult]:results> The results of all scanned root directories
+        """
+        return list(self.__results.values())
+
+    def restore(self, results):
+        """
+        Restores previously scanned results (Ie, from the warm start snapshot) - these are returned by `scan`
+        without walking the root directories
+        :param <[ScanResult]:results> The scan results
+        """
+        for i in results:
+            self.__results[self.__key(i.root)] = i
+        self.__subsets = {}
+
+    # ---------------------------------------------------------------------
+
+    def __walk(self, root):
+        """
+        Walks a directory and sorts all files of interest
+        :param <str:root> The directory to walk
+        :return <ScanResult:result> The scan result
+        """
+        output = ScanResult(root)
+
+        # (directory, category the directory files are sorted into)
+        stack = [(root, None)]
+        try:
+            output.directories[root] = os.stat(root).st_mtime_ns
+        except OSError:
+            output.directories[root] = None
+
+        while(stack):
+            directory, category = stack.pop()
+            try:
+                entries = list(os.scandir(directory))
+            except OSError:
+                continue
+
+            for entry in sorted(entries, key=lambda x: x.name.lower()):
+                name = entry.name.lower()
+                try:
+                    is_dir = entry.is_dir()
+                except OSError:
+                    continue
+
+                if(is_dir):
+                    if(name in PRUNED_DIRECTORIES):
+                        continue
+                    child_category = category
+                    directory_name = os.path.basename(directory).lower()
+                    if(directory_name == "source"):
+                        if(name == "libs"):
+                            continue  # library code never contains discoverable files
+                        elif(name == "scripts"):
+                            child_category = "scripts"
+                        elif(name == "tools"):
+                            child_category = "tools"
+                    elif(category is None and name in ("config", "resources")):
+                        child_category = name
+                    try:
+                        output.directories[entry.path] = entry.stat().st_mtime_ns
+                    except OSError:
+                        output.directories[entry.path] = None
+                    stack.append((entry.path, child_category))
+
+                elif(name.endswith(".jplugin")):
+                    output.jplugins.append(entry.path)
+                elif(name == "__module__.py"):
+                    output.module_descriptors.append(entry.path)
+                elif(category and "." in name):
+                    getattr(output, category).append(entry.path)
+
+        for i in output.categories:
+            getattr(output, i).sort(key=lambda x: x.lower())
+
+        return output
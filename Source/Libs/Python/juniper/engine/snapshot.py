@@ -0,0 +1,199 @@
+"""
+Warm start snapshot of the resolved discovery state
+
+Once discovery has completed the engine writes a snapshot of everything it found to
+"Cached\\Snapshots\\discovery_<host>.json":
+    - the workspace scan results (plugins, module descriptors, scripts, tools..)
+    - the parsed `.jplugin` manifests and `__module__.py` descriptors
+    - the `sys.path` additions and package `__path__` extensions
+    - the host override index and the callback table
+
+The snapshot carries a fingerprint made of the mtime of every scanned directory, `.jplugin`, `__module__.py` and
+script bound to a callback, along with the plugin search directories from the user settings. When the fingerprint
+matches on the next launch the snapshot is restored and discovery is skipped, otherwise a full scan is ran.
+Adding / removing any file changes its directory mtime and editing a bound script invalidates the snapshot - so the
+startup callbacks are never broadcast from stale headers. Only a script which was not bound to any callback gaining
+a `:callbacks` header is picked up late (when the callback table is re-synchronized after startup).
+"""
+import json
+import os
+import sys
+
+import juniper.engine.callbacks
+import juniper.engine.manifest
+import juniper.engine.scanner
+import juniper.engine.types.module
+import juniper.engine.types.plugin
+
+
+SNAPSHOT_VERSION = 3
+
+
+def get_snapshot_path(workspace_root, host):
+    """
+    :param <str:workspace_root> The root directory of the Juniper workspace
+    :param <str:host> The name of the host (Ie, "max")
+    :return <str:path> The path to the discovery snapshot for the host
+    """
+    return os.path.join(workspace_root, f"Cached\\Snapshots\\discovery_{host.lower()}.json")
+
+
+def get_mtime(path):
+    """
+    :param <str:path> The path to a file / directory
+    :return <int:mtime> The mtime in nanoseconds - None if the path does not exist
+    """
+    try:
+        return os.stat(path).st_mtime_ns
+    except OSError:
+        return None
+
+
+def is_current(fingerprint):
+    """
+    :param <dict:fingerprint> Dict of path -> mtime
+    :return <bool:current> True if none of the paths have changed - else False
+    """
+    for path, mtime in fingerprint.items():
+        if(get_mtime(path) != mtime):
+            return False
+    return True
+
+
+class DiscoverySnapshot(object):
+    def __init__(self, snapshot_path, data=None):
+        """
+        The resolved discovery state of a host
+        :param <str:snapshot_path> The path the snapshot is saved to
+        :param [<dict:data>] The snapshot data
+        """
+        self.path = snapshot_path
+        self.data = data or {}
+
+    def __repr__(self):
+        return f"DiscoverySnapshot(\"{self.path}\")"
+
+    def get(self, key, default=None):
+        return self.data.get(key, default)
+
+    @classmethod
+    def load(cls, snapshot_path, search_directories):
+        """
+        Loads a snapshot - if it is still valid for the current workspace
+        Warm starts can be disabled with "juniper:warm_start=false"
+        :param <str:snapshot_path> The path to the snapshot
+        :param <[str]:search_directories> The current plugin search directories
+        :return <DiscoverySnapshot:snapshot> The snapshot - None if it does not exist or is out of date
+        """
+        if("juniper:warm_start=false" in sys.argv or not os.path.isfile(snapshot_path)):
+            return None
+
+        try:
+            with open(snapshot_path, "r") as f:
+                data = json.load(f)
+        except Exception:
+            return None
+
+        if(
+            data.get("version") != SNAPSHOT_VERSION or
+            data.get("search_directories") != list(search_directories) or
+            not is_current(data.get("fingerprint", {}))
+        ):
+            return None
+
+        return cls(snapshot_path, data)
+
+    @classmethod
+    def capture(cls, snapshot_path, engine):
+        """
+        Captures the current discovery state and saves it
+        :param <str:snapshot_path> The path to save the snapshot to
+        :param <JuniperEngine:engine> The engine discovery has been ran for
+        :return <DiscoverySnapshot:snapshot> The snapshot
+        """
+        import juniper.engine.override
+
+        fingerprint = {}
+        scan_results = []
+        for i in juniper.engine.scanner.WorkspaceScanner().results:
+            scan_results.append(i.to_dict())
+            fingerprint.update(i.directories)
+
+        manifest_cache = juniper.engine.manifest.ManifestCache()
+        manifests = {}
+        for i in juniper.engine.types.plugin.PluginManager():
+            manifest = manifest_cache.get(i.jplugin_path)
+            manifests[i.jplugin_path] = manifest.to_dict()
+            fingerprint[i.jplugin_path] = manifest.mtime
+
+        module_descriptors = {}
+        for i in juniper.engine.types.module.ModuleManager():
+            module_descriptors[i.path] = juniper.engine.types.module.scan_module_descriptor(i.path)
+            fingerprint[i.path] = get_mtime(i.path)
+
+        override_index = None
+        import_hook = juniper.engine.override.get_import_hook()
+        if(import_hook is not None):
+            override_index = import_hook.get_index()
+            fingerprint.update(override_index["directories"])
+
+        callbacks = juniper.engine.callbacks.CallbackRegistry().export()
+        for script_path, _, _, callback_names in callbacks:
+            if(callback_names):
+                fingerprint[script_path] = get_mtime(script_path)
+
+        output = cls(snapshot_path, {
+            "version": SNAPSHOT_VERSION,
+            "search_directories": list(engine.plugin_search_directories),
+            "fingerprint": fingerprint,
+            "scan_results": scan_results,
+            "manifests": manifests,
+            "module_descriptors": module_descriptors,
+            "library_paths": engine.get_library_paths(),
+            "host_library_paths": engine.get_host_library_paths(),
+            "override_index": override_index,
+            "callbacks": callbacks
+        })
+        output.save()
+        return output
+
+    def save(self):
+        """
+        Saves the snapshot - written to a temp file first so another host never reads a partial snapshot
+        """
+        temp_path = f"{self.path}.{os.getpid()}.tmp"
+        try:
+            if(not os.path.isdir(os.path.dirname(self.path))):
+                os.makedirs(os.path.dirname(self.path))
+            with open(temp_path, "w") as f:
+                json.dump(self.data, f)
+            os.replace(temp_path, self.path)
+        except Exception:
+            try:
+                os.remove(temp_path)
+            except OSError:
+                pass
+
+    # ---------------------------------------------------------------------
+
+    def restore(self):
+        """
+        Restores the scan results, manifests and module descriptors - so plugins and modules are discovered
+        without reading the workspace
+        """
+        juniper.engine.scanner.WorkspaceScanner().restore(
+            [juniper.engine.scanner.ScanResult.from_dict(x) for x in self.data["scan_results"]]
+        )
+
+        manifest_cache = juniper.engine.manifest.ManifestCache()
+        for path, data in self.data["manifests"].items():
+            manifest_cache.restore(juniper.engine.manifest.PluginManifest.from_dict(path, data))
+
+        for path, data in self.data["module_descriptors"].items():
+            juniper.engine.types.module.restore_module_descriptor(path, data)
+
+    def restore_callbacks(self):
+        """
+        Restores the callback table
+        """
+        juniper.engine.callbacks.CallbackRegistry().restore(self.data["callbacks"])
@@ -0,0 +1,192 @@
+"""
+Dependency aware startup graph for plugins and modules
+
+Plugins and modules may declare the names of the plugins / modules they depend on, and whether their startup
+hooks are thread safe (Ie, they only read config, warm caches or generate files - never touching the host API):
+    .jplugin:       {"dependencies": ["juniper_hub"], "thread_safe": true}
+    __module__.py:  dependencies = ["JuniperInterface"]
+                    thread_safe = True
+
+Each startup stage is ran over the graph - thread safe hooks are ran on a thread pool as soon as their dependencies
+have completed, all other hooks are ran on the main thread in declaration order. Lazily loaded module classes are
+imported and instantiated on the main thread before their hooks are sent to the pool.
+"""
+import concurrent.futures
+import os
+import sys
+
+import juniper
+
+
+def get_max_workers():
+    """
+    :return <int:workers> The number of threads used to run thread safe startup hooks
+    """
+    return min(32, (os.cpu_count() or 1) + 4)
+
+
+class StartupNode(object):
+    def __init__(self, target, index):
+        """
+        Wrapper for a plugin / module in the startup graph
+        :param <object:target> The plugin / module - must implement `name`, `dependencies` and `thread_safe`
+        :param <int:index> The declaration order of the target
+        """
+        self.target = target
+        self.index = index
+        self.name = str(target.name)
+        self.thread_safe = bool(getattr(target, "thread_safe", False))
+        self.dependencies = []  # resolved StartupNodes
+
+    def __repr__(self):
+        return f"StartupNode(\"{self.name}\")"
+
+    def prepare(self, hook_name):
+        """
+        Loads the target for a hook - so a lazily imported module class is never imported / instantiated
+        on a pool thread
+        :param <str:hook_name> The name of the hook (Ie, "on_startup")
+        """
+        overrides = getattr(self.target, "overrides", None)
+        if(overrides is not None and overrides(hook_name)):
+            self.target.module
+
+    def run(self, hook_name, profiler=None):
+        """
+        Runs a hook on the target
+        :param <str:hook_name> The name of the hook (Ie, "on_startup")
+        :param [<StartupProfiler:profiler>] Optional profiler to record the hook duration with
+        """
+        if(profiler is None):
+            getattr(self.target, hook_name)()
+        else:
+            with profiler.phase(f"{hook_name}:{self.name}"):
+                getattr(self.target, hook_name)()
+
+
+class StartupGraph(object):
+    def __init__(self, targets, parallel=None):
+        """
+        Builds the dependency graph for a list of plugins / modules
+        :param <[object]:targets> The plugins / modules in declaration order
+        :param [<bool:parallel>] Should thread safe hooks be ran on a thread pool? Defaults to True unless
+            "juniper:parallel_startup=false" is passed
+        """
+        if(parallel is None):
+            parallel = "juniper:parallel_startup=false" not in sys.argv
+        self.parallel = parallel
+        self.nodes = [StartupNode(x, i) for i, x in enumerate(targets)]
+
+        nodes_by_name = {}
+        for node in self.nodes:
+            nodes_by_name.setdefault(node.name.lower(), node)
+            root = getattr(node.target, "root", None)
+            if(root):
+                nodes_by_name.setdefault(os.path.basename(os.path.normpath(root)).lower(), node)
+
+        for node in self.nodes:
+            for dependency_name in getattr(node.target, "dependencies", None) or []:
+                dependency = nodes_by_name.get(str(dependency_name).lower())
+                if(dependency is None):
+                    # dependencies which are not enabled in the current host are treated as satisfied
+                    continue
+                if(dependency is not node and dependency not in node.dependencies):
+                    node.dependencies.append(dependency)
+
+        self.__break_cycles()
+
+    def __break_cycles(self):
+        """
+        Removes any dependencies which form a cycle - the node declared later loses the dependency
+        """
+        visited = set()
+        for node in self.nodes:
+            stack = [(node, iter(list(node.dependencies)))]
+            path = {node}
+            visited.add(node)
+            while(stack):
+                current, dependencies = stack[-1]
+                dependency = next(dependencies, None)
+                if(dependency is None):
+                    stack.pop()
+                    path.discard(current)
+                elif(dependency in path):
+                    current.dependencies.remove(dependency)
+                    juniper.log.warning(
+                        f"Startup dependency cycle between {current.name} and {dependency.name} - ignoring dependency",
+                        traceback=False,
+                        silent=True
+                    )
+                elif(dependency not in visited):
+                    visited.add(dependency)
+                    path.add(dependency)
+                    stack.append((dependency, iter(list(dependency.dependencies))))
+
+    # ---------------------------------------------------------------------
+
+    def run(self, hook_name, profiler=None):
+        """
+        Runs a hook on all nodes in the graph - respecting dependencies
+        :param <str:hook_name> The name of the hook (Ie, "on_startup")
+        :param [<StartupProfiler:profiler>] Optional profiler to record the duration of each hook with
+        """
+        if(not self.parallel or not any(x.thread_safe for x in self.nodes)):
+            for node in self.__serial_order():
+                node.run(hook_name, profiler=profiler)
+            return
+
+        for node in self.nodes:
+            if(node.thread_safe):
+                node.prepare(hook_name)
+
+        completed = set()
+        pending = list(self.nodes)
+        running = {}
+
+        with concurrent.futures.ThreadPoolExecutor(max_workers=get_max_workers()) as pool:
+            try:
+                while(pending or running):
+                    ready = [x for x in pending if all(y in completed for y in x.dependencies)]
+
+                    # submit all thread safe work first so it overlaps with the main thread hooks
+                    for node in ready:
+                        if(node.thread_safe):
+                            pending.remove(node)
+                            running[pool.submit(node.run, hook_name, profiler=profiler)] = node
+
+                    main_thread_node = next((x for x in ready if not x.thread_safe), None)
+                    if(main_thread_node is not None):
+                        pending.remove(main_thread_node)
+                        main_thread_node.run(hook_name, profiler=profiler)
+                        completed.add(main_thread_node)
+                        continue
+
+                    if(running):
+                        done, _ = concurrent.futures.wait(running, return_when=concurrent.futures.FIRST_COMPLETED)
+                        for future in done:
+                            completed.add(running.pop(future))
+                            future.result()  # re-raise any exception from the hook on the main thread
+            except BaseException:
+                # hooks which have not started yet are dropped - the pool still waits for any hooks already running
+                for future in running:
+                    future.cancel()
+                raise
+
+    def __serial_order(self):
+        """
+        :return <[StartupNode]:nodes> All nodes in declaration order, with dependencies moved before their dependants
+        """
+        output = []
+        added = set()
+
+        def add(node):
+            if(node in added):
+                return
+            added.add(node)
+            for dependency in node.dependencies:
+                add(dependency)
+            output.append(node)
+
+        for node in self.nodes:
+            add(node)
+        return output
@@ -0,0 +1,360 @@
+"""
+Tick scheduler used to run the Juniper tick subscribers at their own rates
+
+Subscribers register with a desired rate (Ie, the command server at 30Hz, the log holder at 2Hz) and are coalesced
+onto a single timer which is re-armed for the next due subscriber after each tick - rather than running every
+subscriber on every event loop iteration.
+
+When the host has had no user input (and no subscriber has reported activity) for `IDLE_TIMEOUT` seconds the interval
+of subscribers which did not request a rate is backed off (up to `IDLE_MAX_INTERVAL`) until activity resumes.
+Subscribers which requested a rate always run at that rate. Input is read from the OS (`GetLastInputInfo` on Windows)
+- on other platforms there is no back off unless the host reports activity itself (see `idle_tracking`).
+
+`delta_seconds` is the time since the running subscriber was last called (as each subscriber runs at its own rate)
+
+Every subscriber call is timed and recorded in a histogram so hitches can be traced back to the plugin / module
+which caused them. Frames which exceed the budget set in "Config\\juniper.json" (`tick.frame_budget_ms`) log a
+warning naming the slowest subscriber. Stats can be queried at runtime with `TickScheduler().get_stats()`
+(Ie, through the command server).
+"""
+import ctypes
+import math
+import os
+import sys
+import threading
+import time
+
+import juniper
+import juniper.engine.paths
+import juniper.runtime.types.framework.singleton
+import juniper.utilities.json as json_utils
+
+
+# rate (Hz) used for subscribers which do not request a rate
+DEFAULT_TICK_RATE = 60
+
+# seconds without activity before the scheduler is considered idle
+IDLE_TIMEOUT = 5.0
+
+# longest interval (seconds) between ticks while idle
+IDLE_MAX_INTERVAL = 0.5
+
+# frame budget (milliseconds) used if none is set in config
+DEFAULT_FRAME_BUDGET_MS = 8
+
+# minimum time (seconds) between budget warnings for the same subscriber
+BUDGET_WARNING_INTERVAL = 30.0
+
+# histogram buckets are spaced at 2^(1/4) intervals (~19% wide) starting at 1 microsecond
+HISTOGRAM_BUCKETS_PER_OCTAVE = 4
+HISTOGRAM_BUCKETS = 25 * HISTOGRAM_BUCKETS_PER_OCTAVE  # up to ~33 seconds
+
+
+class _LASTINPUTINFO(ctypes.Structure):
+    _fields_ = [("cbSize", ctypes.c_uint), ("dwTime", ctypes.c_uint)]
+
+
+def get_input_idle_seconds():
+    """
+    :return <float:seconds> The number of seconds since the last keyboard / mouse input - None if it can't be read
+    """
+    if(sys.platform != "win32"):
+        return None
+    info = _LASTINPUTINFO()
+    info.cbSize = ctypes.sizeof(info)
+    if(not ctypes.windll.user32.GetLastInputInfo(ctypes.byref(info))):
+        return None
+    return ((ctypes.windll.kernel32.GetTickCount() - info.dwTime) & 0xFFFFFFFF) / 1000.0
+
+
+def get_frame_budget():
+    """
+    :return <float:seconds> The tick frame budget as set in "Config\\juniper.json" (`tick.frame_budget_ms`)
+        0 disables budget warnings
+    """
+    try:
+        config_path = os.path.join(juniper.engine.paths.root(), "Config\\juniper.json")
+        budget_ms = json_utils.get_property(config_path, "tick.frame_budget_ms")
+    except Exception:
+        budget_ms = ""
+    if(budget_ms == ""):
+        budget_ms = DEFAULT_FRAME_BUDGET_MS
+    return float(budget_ms) / 1000
+
+
+class TickStats(object):
+    def __init__(self):
+        """
+        Histogram of call durations for a tick subscriber
+        """
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.over_budget = 0
+        self.buckets = [0] * HISTOGRAM_BUCKETS
+
+    def add(self, duration):
+        """
+        Records a call duration
+        :param <float:duration> The duration in seconds
+        """
+        self.count += 1
+        self.total += duration
+        if(duration > self.max):
+            self.max = duration
+        microseconds = duration * 1E6
+        index = int(math.log2(microseconds) * HISTOGRAM_BUCKETS_PER_OCTAVE) if microseconds > 1 else 0
+        self.buckets[min(index, HISTOGRAM_BUCKETS - 1)] += 1
+
+    def percentile(self, percent):
+        """
+        Gets an approximate percentile from the histogram (accurate to the bucket width)
+        :param <float:percent> The percentile (Ie, 95)
+        :return <float:duration> The duration in seconds
+        """
+        if(not self.count):
+            return 0.0
+        target = self.count * percent / 100.0
+        cumulative = 0
+        for index, count in enumerate(self.buckets):
+            cumulative += count
+            if(cumulative >= target):
+                upper_bound = 2 ** ((index + 1) / HISTOGRAM_BUCKETS_PER_OCTAVE) / 1E6
+                return min(upper_bound, self.max)
+        return self.max
+
+    def to_dict(self):
+        """
+        :return <dict:stats> The stats in milliseconds
+        """
+        return {
+            "count": self.count,
+            "mean_ms": self.total / self.count * 1000 if self.count else 0.0,
+            "p50_ms": self.percentile(50) * 1000,
+            "p95_ms": self.percentile(95) * 1000,
+            "max_ms": self.max * 1000,
+            "over_budget": self.over_budget
+        }
+
+
+class TickSubscription(object):
+    def __init__(self, callback, rate=None, name=None):
+        """
+        A callback which is ran by the tick scheduler
+        :param <func:callback> The function to call - if this returns True the call is treated as activity
+        :param [<float:rate>] The number of times per second the callback should run - defaults to `DEFAULT_TICK_RATE`
+            Subscribers which request a rate are never backed off while the host is idle
+        :param [<str:name>] The display name of the subscriber (Ie, the owning plugin / module)
+        """
+        self.callback = callback
+        self.idle_back_off = not rate
+        self.rate = rate or DEFAULT_TICK_RATE
+        self.interval = 1.0 / self.rate
+        self.name = name or getattr(callback, "__qualname__", str(callback))
+        self.next_time = 0.0
+        self.last_time = None
+        self.stats = TickStats()
+        self.last_warning_time = None
+
+    def __repr__(self):
+        return f"TickSubscription(\"{self.name}\", rate={self.rate})"
+
+
+class TickScheduler(object, metaclass=juniper.runtime.types.framework.singleton.Singleton):
+    def __init__(self):
+        """
+        Manager class which runs all tick subscribers from a single coalesced timer
+        """
+        self.__subscriptions = []
+        self.__timer = None
+        self.__last_activity = time.perf_counter()
+        self.__idle_interval = 0.0
+        self.active = False
+        self.delta_seconds = 0.0
+
+        # idle back off is only used when there is a source of host activity
+        # hosts which report activity themselves (through `notify_activity`) can enable this
+        self.idle_tracking = get_input_idle_seconds() is not None
+        self.frame_stats = TickStats()
+        self.frame_budget = get_frame_budget()
+
+    def __iter__(self):
+        """
+        :yield <TickSubscription:subscription> All current subscriptions
+        """
+        for i in self.__subscriptions:
+            yield i
+
+    @property
+    def idle(self):
+        """
+        :return <bool:idle> True if there has been no host input / activity in the last `IDLE_TIMEOUT` seconds
+        """
+        if(not self.idle_tracking):
+            return False
+        now = time.perf_counter()
+        input_idle_seconds = get_input_idle_seconds()
+        if(input_idle_seconds is not None):
+            self.__last_activity = max(self.__last_activity, now - input_idle_seconds)
+        return now - self.__last_activity > IDLE_TIMEOUT
+
+    def subscribe(self, callback, rate=None, name=None):
+        """
+        Subscribes a callback to the tick
+        :param <func:callback> The function to call - if this returns True the call is treated as activity
+        :param [<float:rate>] The number of times per second the callback should run - defaults to `DEFAULT_TICK_RATE`
+            Subscribers which request a rate are never backed off while the host is idle
+        :param [<str:name>] The display name of the subscriber (Ie, the owning plugin / module)
+        :return <TickSubscription:subscription> The subscription
+        """
+        output = TickSubscription(callback, rate=rate, name=name)
+        self.__subscriptions.append(output)
+        self.__rearm(time.perf_counter())
+        return output
+
+    def unsubscribe(self, subscription):
+        """
+        Removes a subscription from the tick
+        :param <TickSubscription:subscription> The subscription to remove
+        """
+        if(subscription in self.__subscriptions):
+            self.__subscriptions.remove(subscription)
+
+    def notify_activity(self):
+        """
+        Marks the host as active - resetting any idle back off
+        Hosts can call this from their own input / idle callbacks
+        """
+        self.__last_activity = time.perf_counter()
+        if(self.__idle_interval):
+            self.__idle_interval = 0.0
+            for i in self.__subscriptions:
+                if(i.idle_back_off):
+                    i.next_time = min(i.next_time, self.__last_activity + i.interval)
+            self.__rearm(self.__last_activity)
+
+    # ---------------------------------------------------------------------
+
+    def attach(self, timer=None):
+        """
+        Attaches the scheduler to the host tick
+        :param [<QTimer:timer>] Single shot timer which calls `tick` - this is re-armed after each tick for the next
+            due subscriber. If None the host is expected to call `tick` itself (Ie, Unreals slate tick)
+        """
+        self.__timer = timer
+        self.active = True
+        if(timer is not None):
+            timer.start(0)  # the first tick runs the post startup callbacks
+
+    def tick(self):
+        """
+        Runs all due subscribers
+        :return <float:delay> The number of seconds until the next subscriber is due
+        """
+        now = time.perf_counter()
+        if(self.idle):
+            self.__idle_interval = min(IDLE_MAX_INTERVAL, max(self.__idle_interval * 2, 1.0 / DEFAULT_TICK_RATE))
+        elif(self.__idle_interval):
+            self.notify_activity()
+
+        slowest = None
+        slowest_duration = 0.0
+        try:
+            for i in list(self.__subscriptions):
+                if(now >= i.next_time):
+                    # set before calling so a failing subscriber does not run every tick
+                    i.next_time = now + (max(i.interval, self.__idle_interval) if i.idle_back_off else i.interval)
+                    self.delta_seconds = 0.0 if i.last_time is None else now - i.last_time
+                    i.last_time = now
+                    start_time = time.perf_counter()
+                    try:
+                        result = i.callback()
+                    finally:
+                        duration = time.perf_counter() - start_time
+                        i.stats.add(duration)
+                        if(duration > slowest_duration):
+                            slowest = i
+                            slowest_duration = duration
+                    if(result is True):
+                        self.__last_activity = now
+                        self.__idle_interval = 0.0
+        finally:
+            end_time = time.perf_counter()
+            if(slowest is not None):
+                frame_duration = end_time - now
+                self.frame_stats.add(frame_duration)
+                if(self.frame_budget and frame_duration > self.frame_budget):
+                    self.__on_over_budget(slowest, slowest_duration, frame_duration)
+            delay = self.__rearm(end_time)
+        return delay
+
+    def __on_over_budget(self, subscription, duration, frame_duration):
+        """
+        Called when a frame exceeds the budget - logs a warning naming the slowest subscriber in the frame
+        :param <TickSubscription:subscription> The slowest subscriber in the frame
+        :param <float:duration> The duration of the subscribers call in seconds
+        :param <float:frame_duration> The duration of the whole frame in seconds
+        """
+        self.frame_stats.over_budget += 1
+        subscription.stats.over_budget += 1
+
+        now = time.perf_counter()
+        if(subscription.last_warning_time is not None and now - subscription.last_warning_time < BUDGET_WARNING_INTERVAL):
+            return
+        subscription.last_warning_time = now
+        juniper.log.warning(
+            f"Tick over budget: {subscription.name} took {duration * 1000:.1f}ms of a "
+            f"{frame_duration * 1000:.1f}ms frame (budget {self.frame_budget * 1000:.1f}ms)",
+            traceback=False,
+            silent=True
+        )
+
+    def __rearm(self, now):
+        """
+        Re-arms the timer for the next due subscriber
+        :param <float:now> The current time
+        :return <float:delay> The number of seconds until the next subscriber is due
+        """
+        if(self.__subscriptions):
+            delay = max(0.0, min(x.next_time for x in self.__subscriptions) - now)
+        else:
+            delay = IDLE_MAX_INTERVAL
+        if(self.__timer is not None and threading.current_thread() is threading.main_thread()):
+            self.__timer.start(int(delay * 1000))  # Qt timers can only be started from the thread they belong to
+        return delay
+
+    # ---------------------------------------------------------------------
+
+    def get_stats(self):
+        """
+        Gets the timing stats for the tick
+        :return <dict:stats> Dict of subscriber name -> stats (count / mean_ms / p50_ms / p95_ms / max_ms / over_budget)
+            The "frame" key contains the stats for each whole tick
+        """
+        output = {"frame": self.frame_stats.to_dict()}
+        for i in self.__subscriptions:
+            output[i.name] = i.stats.to_dict()
+        return output
+
+    def dump_stats(self):
+        """
+        Prints the timing stats for the tick - slowest subscribers (by p95) first
+        :return <dict:stats> The stats (see `get_stats`)
+        """
+        output = self.get_stats()
+        print(f"Tick stats (budget {self.frame_budget * 1000:.1f}ms):")
+        print(f"  {'name':<40} {'count':>8} {'p50':>9} {'p95':>9} {'max':>9} {'over':>6}")
+        for name, stats in sorted(output.items(), key=lambda x: x[1]["p95_ms"], reverse=True):
+            print(
+                f"  {name:<40} {stats['count']:>8} {stats['p50_ms']:>7.2f}ms {stats['p95_ms']:>7.2f}ms "
+                f"{stats['max_ms']:>7.2f}ms {stats['over_budget']:>6}"
+            )
+        return output
+
+    def reset_stats(self):
+        """
+        Clears all recorded timing stats
+        """
+        self.frame_stats = TickStats()
+        for i in self.__subscriptions:
+            i.stats = TickStats()
@@ -1,16 +1,174 @@
+import ast
+import functools
 import inspect
-import glob
 import os
 import sys
-from importlib.machinery import SourceFileLoader
 
+import juniper
+import juniper.engine.bytecode
+import juniper.engine.scanner
+import juniper.engine.types.script
 import juniper.runtime.types.framework.singleton
 import juniper.utilities.string
 
 
+# lifecycle hooks which may be overridden by a module
+MODULE_HOOKS = ("on_pre_startup", "on_startup", "on_post_startup", "on_shutdown", "on_tick")
+
+# class attributes which are read statically from the `__module__.py` (must be literals)
+MODULE_STATIC_ATTRIBUTES = ("supported_hosts", "unsupported_hosts", "dependencies", "thread_safe", "tick_rate")
+
+
+def _is_module_base(node):
+    """
+    :param <ast.expr:node> A base class node from a class definition
+    :return <bool:is_module> True if the base is the `Module` class (Ie, `juniper.engine.types.module.Module`)
+    """
+    if(isinstance(node, ast.Name)):
+        return node.id == "Module"
+    if(isinstance(node, ast.Attribute)):
+        return node.attr == "Module"
+    return False
+
+
+def _binds_static_attribute(node):
+    """
+    :param <ast.AST:node> A statement in a module class body
+    :return <bool:binds> True if the statement binds any of `MODULE_STATIC_ATTRIBUTES` (Ie, within an if / for block)
+    """
+    stack = [node]
+    while(stack):
+        child = stack.pop()
+        if(isinstance(child, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef))):
+            if(child.name in MODULE_STATIC_ATTRIBUTES):
+                return True
+            continue  # names bound within a function / nested class are not class attributes
+        if(isinstance(child, ast.Lambda)):
+            continue
+        if(isinstance(child, ast.Name) and isinstance(child.ctx, ast.Store) and child.id in MODULE_STATIC_ATTRIBUTES):
+            return True
+        if(isinstance(child, ast.alias) and (child.asname or child.name) in MODULE_STATIC_ATTRIBUTES):
+            return True
+        stack.extend(ast.iter_child_nodes(child))
+    return False
+
+
+def _read_static_value(node):
+    """
+    :param <ast.AST:node> The value assigned to a static attribute
+    :return <object:value> The value - lists / tuples are returned as a list of lowercase strings
+    :raises <ValueError> If the value is not a supported literal
+    """
+    value = ast.literal_eval(node)
+    if(isinstance(value, (list, tuple))):
+        return [str(x).lower() for x in value]
+    elif(value is None or isinstance(value, (bool, int, float))):
+        return value
+    raise ValueError(f"Unsupported static value: {value!r}")
+
+
+@functools.lru_cache(maxsize=256)
+def _scan_module_descriptor_cached(module_path, mtime, size):
+    output = {"name": None, "hooks": MODULE_HOOKS, "static": False}
+    try:
+        with open(module_path, "r") as f:
+            tree = ast.parse(f.read(), module_path)
+    except (OSError, SyntaxError, ValueError):
+        return output
+
+    for node in tree.body:
+        if(not isinstance(node, ast.ClassDef) or not any(_is_module_base(x) for x in node.bases)):
+            continue
+
+        output["name"] = node.name
+
+        # classes with decorators / metaclasses may change the class at import - so they cannot be read statically
+        if(node.decorator_list or node.keywords):
+            return output
+
+        hooks = []
+        for child in node.body:
+            if(isinstance(child, (ast.FunctionDef, ast.AsyncFunctionDef)) and child.name in MODULE_HOOKS):
+                hooks.append(child.name)
+            elif(isinstance(child, ast.Assign) and all(isinstance(x, ast.Name) for x in child.targets)):
+                for target in child.targets:
+                    if(target.id in MODULE_STATIC_ATTRIBUTES):
+                        try:
+                            output[target.id] = _read_static_value(child.value)
+                        except ValueError:
+                            return output
+            elif(isinstance(child, ast.AnnAssign) and isinstance(child.target, ast.Name)):
+                if(child.target.id in MODULE_STATIC_ATTRIBUTES and child.value is not None):
+                    try:
+                        output[child.target.id] = _read_static_value(child.value)
+                    except ValueError:
+                        return output
+            elif(_binds_static_attribute(child)):
+                # any other form of assignment (Ie, unpacking, augmented assignment or a property) is left to the class
+                return output
+
+        output["hooks"] = tuple(hooks)
+        output["static"] = True
+        return output
+
+    return output
+
+
+# `__module__.py` path -> scan data restored from the warm start snapshot
+_restored_descriptors = {}
+
+
+def restore_module_descriptor(module_path, data):
+    """
+    Adds previously scanned descriptor data (Ie, from the warm start snapshot) so the file is not read again
+    :param <str:module_path> The path to the `__module__.py`
+    :param <dict:data> The scan data (see `scan_module_descriptor`)
+    """
+    _restored_descriptors[module_path] = data
+
+
+def scan_module_descriptor(module_path):
+    """
+    Statically reads a `__module__.py` without importing it
+    If the module class cannot be fully resolved (Ie, it derives from another module class or is decorated)
+    then the result is marked as non-static and all hooks are assumed to be overridden
+    :param <str:module_path> The path to the `__module__.py`
+    :return <dict:data> Dict containing the class `name`, the overridden `hooks`, any static attributes
+        and `static` - which is True if the data is complete
+    """
+    if(module_path in _restored_descriptors):
+        return _restored_descriptors[module_path]
+    try:
+        stat = os.stat(module_path)
+    except OSError:
+        return {"name": None, "hooks": MODULE_HOOKS, "static": False}
+    return _scan_module_descriptor_cached(module_path, stat.st_mtime_ns, stat.st_size)
+
+
+def is_enabled_in_host(supported_hosts, unsupported_hosts, target_host=None):
+    """
+    Checks a set of host filters against a host
+    :param <[str]:supported_hosts> The hosts the module is limited to - if empty then all hosts are supported
+    :param <[str]:unsupported_hosts> The hosts the module is disabled in
+    :param [<str:target_host>] The name of the host to check - defaults to the current host
+    :return <bool:enabled> True if enabled - else False
+    """
+    if(not target_host):
+        target_host = getattr(juniper, "program_context", None) or "python"
+    target_host = target_host.lower()
+    if(target_host not in unsupported_hosts):
+        if(not supported_hosts or target_host in supported_hosts):
+            return True
+    return False
+
+
 class ModuleManager(object, metaclass=juniper.runtime.types.framework.singleton.Singleton):
     def __init__(self):
-        self.__registered_modules = []
+        self.__descriptors = []
+        self.__descriptors_by_root = {}
+
+        # lazy loading can be disabled to import all modules at startup (Ie, for debugging module side effects)
+        self.lazy = "juniper:lazy_modules=false" not in sys.argv
 
     def get_module_class(self, module_path):
         """
@@ -20,7 +178,8 @@ class ModuleManager(object, metaclass=juniper.runtime.types.framework.singleton.
         module_name = os.path.basename(os.path.dirname(module_path))
         module_name = juniper.utilities.string.friendly_to_code(module_name)
         module_import_name = f"juniper.modules.{module_name}"
-        module = SourceFileLoader(module_import_name, module_path).load_module(module_import_name)
+        loader = juniper.engine.bytecode.CachedSourceFileLoader(module_import_name, module_path)
+        module = loader.load_module(module_import_name)
         for _, member_data in inspect.getmembers(module):
             if(inspect.isclass(member_data) and issubclass(member_data, Module)):
                 return member_data
@@ -28,29 +187,194 @@ class ModuleManager(object, metaclass=juniper.runtime.types.framework.singleton.
 
     def __iter__(self):
         """
-        :yield <Module:module> Yielids all registered modules
+        :yield <ModuleDescriptor:module> Yielids all registered modules
         """
-        for i in self.__registered_modules:
+        for i in self.__descriptors:
             yield i
 
+    def __key(self, root):
+        return os.path.normpath(root).lower()
+
+    def get_descriptor(self, module_path):
+        """
+        Gets the descriptor for a `__module__.py` - registering it on first access
+        If lazy loading is disabled then the module class is imported immediately
+        :param <str:module_path> The path to the `__module__.py`
+        :return <ModuleDescriptor:descriptor> The module descriptor - None if the file does not define a module
+        """
+        key = self.__key(os.path.dirname(module_path))
+        output = self.__descriptors_by_root.get(key)
+        if(output is None):
+            output = ModuleDescriptor(module_path)
+            if(not output.name and output.module is None):
+                return None  # the module class could not be found statically or by importing
+            self.__descriptors.append(output)
+            self.__descriptors_by_root[key] = output
+            if(not self.lazy):
+                output.module
+        return output
+
+    def find_instance(self, root):
+        """
+        Finds the loaded module instance for a module root
+        :param <str:root> The root directory of the module
+        :return <Module:module> The module instance if loaded - else None
+        """
+        descriptor = self.__descriptors_by_root.get(self.__key(root))
+        if(descriptor is not None):
+            return descriptor.instance
+        return None
+
     def register(self, module):
         """
         Registers a module
         :param <Module:module> The module to register
         """
-        self.__registered_modules.append(module)
+        key = self.__key(module.root)
+        descriptor = self.__descriptors_by_root.get(key)
+        if(descriptor is None):
+            descriptor = ModuleDescriptor(os.path.join(module.root, "__module__.py"))
+            self.__descriptors.append(descriptor)
+            self.__descriptors_by_root[key] = descriptor
+        descriptor.instance = module
+
+
+class ModuleDescriptor(object):
+    def __init__(self, module_path):
+        """
+        Lightweight stand in for a module which is read statically from its `__module__.py`
+        The module class is only imported when one of its overridden lifecycle hooks is called
+        :param <str:module_path> The path to the `__module__.py`
+        """
+        self.path = module_path
+        self.root = os.path.dirname(module_path)
+        self.instance = None
+
+        data = scan_module_descriptor(module_path)
+        self.__name = data["name"]
+        self.hooks = frozenset(data["hooks"])
+        self.static = data["static"]
+        self.supported_hosts = data.get("supported_hosts", [])
+        self.unsupported_hosts = data.get("unsupported_hosts", [])
+        self.dependencies = data.get("dependencies", [])
+        self.thread_safe = data.get("thread_safe", False)
+        self.tick_rate = data.get("tick_rate", None)
+
+    def __repr__(self):
+        return f"ModuleDescriptor(\"{self.path}\")"
+
+    @property
+    def name(self):
+        """
+        :return <str:name> The name of the module class
+        """
+        if(self.__name is None and self.instance is not None):
+            return self.instance.name
+        return self.__name
+
+    @property
+    def loaded(self):
+        """
+        :return <bool:loaded> True if the module class has been imported - else False
+        """
+        return self.instance is not None
+
+    @property
+    def module(self):
+        """
+        Gets the module instance - importing the module class on first access
+        :return <Module:module> The module instance - None if the module failed to load
+        """
+        if(self.instance is None):
+            module_class = ModuleManager().get_module_class(self.path)
+            if(module_class is not None):
+                self.instance = module_class()
+            if(not self.static and self.instance is not None):
+                for i in MODULE_STATIC_ATTRIBUTES:
+                    setattr(self, i, getattr(self.instance, i))
+        return self.instance
+
+    def overrides(self, hook_name):
+        """
+        :param <str:hook_name> The name of the lifecycle hook (Ie, "on_tick")
+        :return <bool:overridden> True if the module implements the hook - else False
+        """
+        return hook_name in self.hooks
+
+    def __call_hook(self, hook_name):
+        if(hook_name in self.hooks):
+            module = self.module
+            if(module is not None):
+                return getattr(module, hook_name)()
+        return None
+
+    # ---------------------------------------------------------------------
+
+    def on_pre_startup(self):
+        return self.__call_hook("on_pre_startup")
+
+    def on_startup(self):
+        return self.__call_hook("on_startup")
+
+    def on_post_startup(self):
+        return self.__call_hook("on_post_startup")
+
+    def on_shutdown(self):
+        return self.__call_hook("on_shutdown")
+
+    def on_tick(self):
+        return self.__call_hook("on_tick")
+
+    # ---------------------------------------------------------------------
+
+    def is_enabled_in_host(self, target_host=None):
+        """
+        Checks if this module is enabled in the current host
+        Modules which could not be read statically are imported first - so the host filters of the class are used
+        :param [<str:target_host>] The name of the host to check
+        :return <bool:enabled> True if enabled - else False (or if the module failed to load)
+        """
+        if(not self.static and self.module is None):
+            return False
+        return is_enabled_in_host(self.supported_hosts, self.unsupported_hosts, target_host=target_host)
+
+    @property
+    def scripts(self):
+        output = []
+        for i in juniper.engine.scanner.WorkspaceScanner().find(self.root).scripts:
+            script = juniper.engine.types.script.Script(i)
+            if(script and script.get("type") == "script"):
+                output.append(script)
+        return output
+
+    @property
+    def tools(self):
+        output = []
+        for i in juniper.engine.scanner.WorkspaceScanner().find(self.root).tools:
+            script = juniper.engine.types.script.Script(i)
+            if(script and script.get("type") == "tool"):
+                output.append(script)
+        return output
 
 
 class Module(object):
+    # hosts the module is limited to / disabled in - these are read statically so must be literal lists
+    supported_hosts = []
+    unsupported_hosts = []
+
+    # names of the plugins / modules whose startup hooks must run first, and whether this modules
+    # startup hooks may be ran off the main thread (see `juniper.engine.startup`)
+    dependencies = []
+    thread_safe = False
+
+    # the number of times per second `on_tick` is called - None uses the tick schedulers default rate
+    tick_rate = None
+
     def __init__(self):
         pass
 
     def __new__(cls, *args, **kwargs):
-        output = None
-        root = cls.get_root()
-        for i in ModuleManager():
-            if(i.root == root):
-                output = i
+        output = ModuleManager().find_instance(cls.get_root())
         if(not output):
             output = super(Module, cls).__new__(cls)
             output.__init__(*args, **kwargs)
@@ -107,10 +431,18 @@ class Module(object):
         """
         return self.get_root()
 
+    def is_enabled_in_host(self, target_host=None):
+        """
+        Checks if this module is enabled in the current host
+        :param [<str:target_host>] The name of the host to check
+        :return <bool:enabled> True if enabled - else False
+        """
+        return is_enabled_in_host(self.supported_hosts, self.unsupported_hosts, target_host=target_host)
+
     @property
     def scripts(self):
         output = []
-        for i in glob.iglob(self.root + "\\Source\\Scripts\\**\\*.*", recursive=True):
+        for i in juniper.engine.scanner.WorkspaceScanner().find(self.root).scripts:
             script = juniper.engine.types.script.Script(i)
             if(script and script.get("type") == "script"):
                 output.append(script)
@@ -120,7 +452,7 @@ class Module(object):
     def tools(self):
         # NOTE: Do we want tools for modules? Should  modules just not have tools?
         output = []
-        for i in glob.iglob(self.root + "\\Source\\Tools\\**\\*.*", recursive=True):
+        for i in juniper.engine.scanner.WorkspaceScanner().find(self.root).tools:
             script = juniper.engine.types.script.Script(i)
             if(script and script.get("type") == "tool"):
                 output.append(script)
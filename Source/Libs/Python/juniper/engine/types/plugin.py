@@ -1,55 +1,62 @@
+import juniper.engine.manifest
 import juniper.engine.paths
+import juniper.engine.scanner
 import juniper.engine.types.script
 import juniper.runtime.types.framework.singleton
 import juniper.utilities.string as string_utils
 
 import functools
-import glob
 import importlib
-import json
 import os
 
 
+# plugin priority tiers - plugins are always iterated in tier order, then registration order
+TIER_HOST = 0  # host implementation plugins (Ie, "Source\\Hosts\\JuniperHub") - these have the most control over the workspace
+TIER_JUNIPER = 1  # Juniper plugins - so any workspace additions are initialized before other plugins
+TIER_THIRD_PARTY = 2  # all other plugins
+
+
+def get_plugin_tier(plugin_root):
+    """
+    :param <str:plugin_root> The root directory of a plugin
+    :return <int:tier> The priority tier of the plugin
+    """
+    plugin_root = plugin_root.lower()
+    if("\\source\\hosts\\" in plugin_root or "\\juniperhosts\\" in plugin_root):
+        return TIER_HOST
+    if("\\juniper\\" in plugin_root):
+        return TIER_JUNIPER
+    return TIER_THIRD_PARTY
+
+
 class PluginManager(object, metaclass=juniper.runtime.types.framework.singleton.Singleton):
     def __init__(self):
-        self.plugin_cache = []
-
-        # TODO! This plugin loading logic should all be handled in JuniperEngine, can it be removed?
-        # Initialize all avaliable plugins
-        '''plugins_root = os.path.join(juniper.engine.paths.root(), "Plugins")
-        for plugin_group in os.listdir(plugins_root):
-            plugin_group_dir = os.path.join(plugins_root, plugin_group)
-            if(os.path.isdir(plugin_group_dir)):
-                for plugin_name in os.listdir(plugin_group_dir):
-                    plugin_dir = os.path.join(plugin_group_dir, plugin_name)
-                    if(os.path.isdir(plugin_dir)):
-                        for i in os.listdir(plugin_dir):
-                            if(i.endswith(".jplugin")):
-                                jplugin_path = os.path.join(plugin_dir, i)
-                                self.plugin_cache.append(Plugin(jplugin_path))
-
-        # Sort all avaliable plugins to ensure order of execution is adhered to:
-        # 1) Juniper host plugins should always be first - as these have the most control over the workspace
-        # 2) Juniper plugins should always come after host plugins so any worksplace additions are initialized
-        # 3) All other plugins should come last
-        juniper_plugins = []
-        other_plugins = []
-
-        for i in self.plugin_cache:
-            if("\\juniper\\" in i.root.lower()):
-                juniper_plugins.append(i)
-            else:
-                other_plugins.append(i)
-
-        self.plugin_cache = juniper_plugins + other_plugins'''
+        self.__tiers = ([], [], [])
+        self.__plugins_by_path = {}
+        self.__plugins_by_name = {}
+        self.__plugins_by_host = {}
 
     def __iter__(self):
         """
         Override the iterator method for the PluginManager to iterate over all available plugins
         :yield <Plugin:plugin> The current plugin
         """
-        for i in self.plugin_cache:
-            yield i
+        for tier in self.__tiers:
+            for i in tier:
+                yield i
+
+    def __len__(self):
+        return len(self.__plugins_by_path)
+
+    @property
+    def plugin_cache(self):
+        """
+        :return <[Plugin]:plugins> All registered plugins in priority order
+        """
+        return list(self)
+
+    def __key(self, jplugin_path):
+        return os.path.normpath(jplugin_path).lower()
 
     def find_plugin(self, plugin_name):
         """
@@ -57,37 +64,77 @@ class PluginManager(object, metaclass=juniper.runtime.types.framework.singleton.
         :param <str:plugin_name> The name of the plugin to find
         :return <Plugin:plugin> The plugin if found - else None
         """
-        plugin_name = plugin_name.lower()
-        for i in self.plugin_cache:
-            if(i.name == plugin_name):
-                return i
-        return None
+        return self.__plugins_by_name.get(plugin_name.lower())
+
+    def find_from_path(self, jplugin_path):
+        """
+        Finds a plugin by the path to its `.jplugin`
+        :param <str:jplugin_path> The path to the `.jplugin`
+        :return <Plugin:plugin> The plugin if registered - else None
+        """
+        return self.__plugins_by_path.get(self.__key(jplugin_path))
+
+    def load_plugin(self, jplugin_path):
+        """
+        Gets the plugin for a `.jplugin` - creating and registering it if it has not been loaded
+        :param <str:jplugin_path> The path to the `.jplugin`
+        :return <Plugin:plugin> The plugin
+        """
+        output = self.find_from_path(jplugin_path)
+        if(output is None):
+            output = Plugin(jplugin_path)
+            self.register(output)
+        return output
 
     def register(self, plugin):
         """
         Registers a plugin
         :param <Plugin:plugin> The plugin to register
         """
-        if(plugin not in self.plugin_cache):
-            self.plugin_cache.append(plugin)
+        key = self.__key(plugin.jplugin_path)
+        if(key in self.__plugins_by_path):
+            return
 
-        # reorder the list so Juniper plugins are always first
-        juniper_plugins = []
-        other_plugins = []
+        tier = get_plugin_tier(plugin.root)
+        plugin.tier = tier
+        self.__tiers[tier].append(plugin)
+        self.__plugins_by_path[key] = plugin
 
-        for i in self.plugin_cache:
-            if("\\juniper\\" in i.root.lower()):
-                juniper_plugins.append(i)
-            else:
-                other_plugins.append(i)
+        # higher priority plugins take the name if there are duplicates
+        name = plugin.name.lower()
+        existing = self.__plugins_by_name.get(name)
+        if(existing is None or tier < existing.tier):
+            self.__plugins_by_name[name] = plugin
 
-        self.plugin_cache = juniper_plugins + other_plugins
+        self.__plugins_by_host = {}
+
+    def get_plugins(self, host=None):
+        """
+        Gets all registered plugins which are enabled in a host - in priority order
+        :param [<str:host>] The name of the host - defaults to the current host
+        :return <[Plugin]:plugins> The enabled plugins
+        """
+        host = (host or getattr(juniper, "program_context", None) or "python").lower()
+        output = self.__plugins_by_host.get(host)
+        if(output is None):
+            output = [x for x in self if x.is_enabled_in_host(host)]
+            self.__plugins_by_host[host] = output
+        return list(output)
+
+    def invalidate(self):
+        """
+        Clears the cached host filters (Ie, if any plugin manifests have changed)
+        """
+        self.__plugins_by_host = {}
 
 
 class Plugin(object):
     def __init__(self, jplugin_path):
+        """
+        :param <str:jplugin_path> The path to the `.jplugin` - plugins should be created through `PluginManager().load_plugin`
+        """
         self.jplugin_path = jplugin_path
-        PluginManager().register(self)
+        self.tier = get_plugin_tier(self.root)
 
     def __repr__(self):
         return f"Plugin(\"{self.jplugin_path}\")"
@@ -99,13 +146,18 @@ class Plugin(object):
         return True
 
     @property
-    @functools.lru_cache()
+    def manifest(self):
+        """
+        :return <PluginManifest:manifest> The parsed jplugin - shared with all scripts in the plugin root
+        """
+        return juniper.engine.manifest.ManifestCache().get(self.jplugin_path)
+
+    @property
     def plugin_metadata(self):
         """
         :return <dict:metadata> The jplugin loaded as a dict
         """
-        with open(self.jplugin_path, "r") as f:
-            return json.load(f)
+        return self.manifest.data
 
     @property
     @functools.lru_cache()
@@ -132,7 +184,6 @@ class Plugin(object):
         return string_utils.snake_to_name(self.name)
 
     @property
-    @functools.lru_cache()
     def enabled(self):
         """
         :return <bool:enabled> True if this plugin is enabled - else False
@@ -142,21 +193,35 @@ class Plugin(object):
         if("\\juniperhosts\\" in self.root.lower()):
             if(self.name != juniper.program_context):
                 return False
-        if("enabled" in self.plugin_metadata):
-            return self.plugin_metadata["enabled"]
-        return True
+        return self.manifest.enabled
 
     @property
-    @functools.lru_cache()
     def internal(self):
         """
         :return <bool:internal> True if this is an internal (Juniper) plugin - else False
         """
-        with open(self.jplugin_path, "r") as f:
-            json_data = json.load(f)
-            if("internal" in json_data):
-                return json_data["internal"] is True
-        return False
+        return self.manifest.internal is True
+
+    @property
+    def dependencies(self):
+        """
+        :return <[str]:names> The names of the plugins / modules whose startup hooks must run before this plugins
+        """
+        return self.manifest.get("dependencies")
+
+    @property
+    def thread_safe(self):
+        """
+        :return <bool:thread_safe> True if this plugins startup hooks may be ran off the main thread - else False
+        """
+        return self.manifest.get("thread_safe") is True
+
+    @property
+    def tick_rate(self):
+        """
+        :return <float:rate> The number of times per second `on_tick` is called - None uses the tick schedulers default rate
+        """
+        return self.manifest.get("tick_rate")
 
     # ---------------------------------------------------------------------
 
@@ -225,20 +290,18 @@ class Plugin(object):
         return None
 
     @property
-    @functools.lru_cache()
     def metadata(self):
         """
         :return <dict:data> The jplugin file data loaded as a json dict
         """
-        with open(self.jplugin_path, "r") as f:
-            return json.load(f)
+        return self.manifest.data
 
     # ---------------------------------------------------------------------
 
     @property
     def scripts(self):
         output = []
-        for i in glob.iglob(self.root + "\\Source\\Scripts\\**\\*.*", recursive=True):
+        for i in juniper.engine.scanner.WorkspaceScanner().find(self.root).scripts:
             script = juniper.engine.types.script.Script(i)
             if(script and script.get("type") == "script"):
                 output.append(script)
@@ -247,7 +310,7 @@ class Plugin(object):
     @property
     def tools(self):
         output = []
-        for i in glob.iglob(self.root + "\\Source\\Tools\\**\\*.*", recursive=True):
+        for i in juniper.engine.scanner.WorkspaceScanner().find(self.root).tools:
             script = juniper.engine.types.script.Script(i)
             if(script and script.get("type") == "tool"):
                 output.append(script)
@@ -257,12 +320,11 @@ class Plugin(object):
     def modules(self):
         import juniper.engine.types.module
         output = []
-        module_paths = [x for x in glob.glob(self.root + "\\Source\\Modules\\**\\__module__.py", recursive=True)]
+        module_paths = juniper.engine.scanner.WorkspaceScanner().find(os.path.join(self.root, "Source\\Modules")).module_descriptors
         for module_path in module_paths:
-            module_class = juniper.engine.types.module.ModuleManager().get_module_class(module_path)
-            if(module_class is not None):
-                module_instance = module_class()
-                output.append(module_instance)
+            module = juniper.engine.types.module.ModuleManager().get_descriptor(module_path)
+            if(module is not None and module.is_enabled_in_host()):
+                output.append(module)
         return output
 
     @property
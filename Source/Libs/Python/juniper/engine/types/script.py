@@ -1,50 +1,261 @@
-import json
-import os
 import functools
+import os
+import sys
+import weakref
 
+import juniper
 import juniper.engine
+import juniper.engine.catalog
 import juniper.runtime.types.framework.singleton
 import juniper.utilities.string
 
 
+# The maximum number of lines read when searching for the metadata header of a script
+HEADER_MAX_LINES = 256
+
+# file type -> (header block openers, line comment prefix)
+HEADER_DELIMITERS = {
+    ".py": (('"""', "'''"), "#"),
+    ".ms": (("/*",), "--")
+}
+
+
+def parse_metadata(script_path):
+    """
+    Parses the Juniper file metadata for a script (Ie, the ":key value" lines)
+    Only the header block (the module docstring / leading block comment) is read - the file is streamed
+    and parsing stops as soon as the header is closed, or if the file does not start with a header
+    :param <str:script_path> The path to the script
+    :return <dict:data> The file metadata
+    """
+    output = {}
+    openers, comment_prefix = HEADER_DELIMITERS.get(
+        os.path.splitext(script_path)[1].lower(),
+        (('"""', "'''", "/*"), "#")
+    )
+
+    closer = None
+    try:
+        with open(script_path, "r") as f:
+            for line_index, line in enumerate(f):
+                if(line_index >= HEADER_MAX_LINES):
+                    break
+
+                if(closer is None):
+                    # skip any blank lines / comments (Ie, shebangs, encodings) before the header
+                    stripped_line = line.strip()
+                    if(not stripped_line or stripped_line.startswith(comment_prefix)):
+                        continue
+                    for opener in openers:
+                        if(stripped_line.startswith(opener)):
+                            closer = "*/" if opener == "/*" else opener
+                            line = stripped_line[len(opener):]
+                            break
+                    else:
+                        break  # no header block
+
+                header_closed = closer in line
+                if(header_closed):
+                    line = line.split(closer, 1)[0]
+
+                if(line.startswith(":")):
+                    key, _, value = line.rstrip("\n").partition(" ")
+                    key = sys.intern(key.lower().lstrip(":"))
+                    if(key in output):
+                        output[key] += " " + value
+                    else:
+                        output[key] = value
+
+                if(header_closed):
+                    break
+    except Exception:
+        pass
+
+    # values such as types / categories / hosts are repeated across many scripts
+    return {k: sys.intern(v) for k, v in output.items()}
+
+
+@functools.lru_cache(maxsize=16384)
+def _read_metadata_cached(script_path, mtime, size):
+    return parse_metadata(script_path)
+
+
+def read_metadata(script_path, stat=None):
+    """
+    Reads the Juniper file metadata for a script
+    Results are shared between all callers until the mtime / size of the file changes
+    :param <str:script_path> The path to the script
+    :param [<os.stat_result:stat>] The current stat result for the script - if None then the file is stat'd
+    :return <dict:data> The file metadata - this is shared so should not be modified
+    """
+    if(stat is None):
+        try:
+            stat = os.stat(script_path)
+        except OSError:
+            return {}
+    return _read_metadata_cached(script_path, stat.st_mtime_ns, stat.st_size)
+
+
 class ScriptManager(object, metaclass=juniper.runtime.types.framework.singleton.Singleton):
     def __init__(self):
-        self.__script_cache = []
+        # lowercase path -> Script. Weak so scripts which are not discovered / referenced can be collected
+        self.__script_cache = weakref.WeakValueDictionary()
+
+        # index of all discovered scripts - maintained incrementally via `sync_index`
+        self.__indexed = {}  # Script -> (type, name, root) - the type is the list the script was discovered in
+        self.__scripts_by_name = {}  # type -> {name: Script}
+        self.__scripts_by_root = {}  # root -> {Script: None}
+        self.__duplicates = {}  # (type, name) -> [Script]
+        self.discovered = False
+
+    def __iter__(self):
+        """
+        :yield <Script:script> All discovered scripts / tools
+        """
+        for i in self.__indexed:
+            yield i
 
     def register(self, script):
         """
         Registers a script
         """
-        self.__script_cache.append(script)
+        self.__script_cache[script.path] = script
 
     def find_from_path(self, script_path):
         """
-        Searches through all registered scripts and returns an existing script that matches the input path
+        Returns an existing script that matches the input path
         :param <str:script_path> The path to the target script
         :return <Script:script> The script if found - else None
         """
-        for i in self.__script_cache:
-            if(i.path == script_path):
-                return i
+        return self.__script_cache.get(script_path.lower())
+
+    # ---------------------------------------------------------------------
+
+    def find(self, name, type_=None):
+        """
+        Finds a discovered script by its name
+        :param <str:name> The name of the script
+        :param [<str:type_>] The type of script to find (Ie, "tool", "script") - if None then all types are searched
+            Note: Scripts are indexed by how they were discovered (see `sync_index`) rather than their metadata type
+        :return <Script:script> The script if found - else None
+        """
+        if(type_ is not None):
+            return self.__scripts_by_name.get(type_, {}).get(name)
+        for scripts_by_name in self.__scripts_by_name.values():
+            if(name in scripts_by_name):
+                return scripts_by_name[name]
         return None
 
+    def find_in_root(self, root):
+        """
+        Gets all discovered scripts owned by a plugin / module root
+        :param <str:root> The root directory of the plugin / module
+        :return <[Script]:scripts> The scripts in the root
+        """
+        return list(self.__scripts_by_root.get(os.path.normpath(root).lower(), {}))
+
+    @property
+    def duplicates(self):
+        """
+        :return <dict:duplicates> Dict of (type, name) -> [Script] for all discovered scripts which share a name
+        """
+        return {k: list(v) for k, v in self.__duplicates.items()}
+
+    def add_to_index(self, script, type_=None):
+        """
+        Adds a discovered script to the name / root index
+        If a script of the same type and name has already been indexed the first script is kept
+        and the new script is recorded as a duplicate
+        :param <Script:script> The script to add
+        :param [<str:type_>] The type the script is indexed under - if None then the type from its metadata is used
+        """
+        if(script in self.__indexed):
+            return
+
+        key = (type_ or script.type, script.name)
+        root = script.owner_root
+        self.__indexed[script] = (key[0], key[1], root)
+        self.__scripts_by_root.setdefault(root, {})[script] = None
+
+        scripts_by_name = self.__scripts_by_name.setdefault(key[0], {})
+        existing = scripts_by_name.get(key[1])
+        if(existing is None):
+            scripts_by_name[key[1]] = script
+        else:
+            duplicates = self.__duplicates.setdefault(key, [existing])
+            duplicates.append(script)
+            if(juniper.log):
+                juniper.log.warning(
+                    f"Duplicate {key[0]} name \"{key[1]}\" - \"{script.path}\" is shadowed by \"{existing.path}\"",
+                    traceback=False,
+                    silent=True
+                )
+
+    def remove_from_index(self, script):
+        """
+        Removes a script from the name / root index
+        :param <Script:script> The script to remove
+        """
+        if(script not in self.__indexed):
+            return
+
+        type_, name, root = self.__indexed.pop(script)
+        self.__scripts_by_root.get(root, {}).pop(script, None)
+
+        key = (type_, name)
+        duplicates = self.__duplicates.get(key)
+        if(duplicates):
+            duplicates.remove(script)
+            if(len(duplicates) < 2):
+                self.__duplicates.pop(key)
+
+        scripts_by_name = self.__scripts_by_name.get(type_, {})
+        if(scripts_by_name.get(name) is script):
+            if(duplicates):
+                scripts_by_name[name] = duplicates[0]
+            else:
+                scripts_by_name.pop(name)
+
+    def sync_index(self, scripts, tools=None):
+        """
+        Incrementally synchronizes the index with the discovered scripts and tools
+        Scripts are indexed as "script" and tools as "tool" - so host scripts of any type are found as scripts
+        :param <[Script]:scripts> All discovered scripts in discovery order
+        :param [<[Script]:tools>] All discovered tools in discovery order
+        """
+        discovered = [(x, "script") for x in scripts] + [(x, "tool") for x in tools or []]
+        current = {x for x, _ in discovered}
+        for i in [x for x in self.__indexed if x not in current]:
+            self.remove_from_index(i)
+
+        for i, discovered_type in discovered:
+            if(i in self.__indexed):
+                type_, name, _ = self.__indexed[i]
+                if(type_ == discovered_type and name == i.name):
+                    continue
+                self.remove_from_index(i)
+            self.add_to_index(i, type_=discovered_type)
+
+        self.discovered = True
+
 
 class Script(object):
+    # Scripts are lightweight records - all metadata is held in the shared script catalog
+    __slots__ = ("path", "__weakref__")
+
     def __init__(self, script_path):
         """
         Barebones class for a script - used during the bootstrap phase
-        This is overriden in `juniper.engine.types.script` for a version including more features
+        Note: Registration is handled in `__new__` - this is called again each time a cached script is returned
         """
-        ScriptManager().register(self)
-        self.path = script_path.lower()
+        self.path = sys.intern(script_path.lower())
 
     def __new__(cls, script_path):
         """
-        Cache to avoid duplicates - and also avoid garbace collection for scripts bound
-        to other actions
+        Cache to avoid duplicates - each path maps to a single script instance
         """
         possible_cached = ScriptManager().find_from_path(script_path)
-        if(possible_cached):
+        if(possible_cached is not None):
             output = possible_cached
         else:
             output = super().__new__(cls)
@@ -129,12 +340,7 @@ class Script(object):
         """
         :return <str:category> The category for this script if specified
         """
-        output = self.parent_category
-
-        if("category" in self.metadata and not self.is_core):
-            output += "|" + self.metadata["category"]
-
-        return output
+        return self.catalog_entry.get("category", "Juniper")
 
     @property
     def group(self):
@@ -198,21 +404,7 @@ class Script(object):
         - separate, for scripts which are within the base Juniper implementation, but under their own subcategory
         :return <str:integration_type> The integration type - defaults to integrated if unspecified
         """
-        if(self.path.lower().startswith(
-            os.path.join(juniper.engine.JuniperEngine().workspace_root, "source")
-        )):
-            return "integrated"
-
-        module_root = self.path.lower().split("source")[0]
-        for i in os.listdir(module_root):
-            if(i.endswith(".jplugin")):
-                jplugin_path = os.path.join(module_root, i)
-                with open(jplugin_path, "r") as f:
-                    json_data = json.load(f)
-                    if("integration_type" in json_data):
-                        return json_data["integration_type"]
-
-        return "integrated"
+        return self.catalog_entry.get("integration_type", "integrated")
 
     @property
     def parent_category(self):
@@ -221,28 +413,7 @@ class Script(object):
         (Ie, the name of the outermost menu)
         :return <str:category> The parent category - defaults to "Juniper"
         """
-        output = "Juniper"
-
-        integration_type = self.integration_type
-
-        if(integration_type != "integrated"):
-            # Get the parent module - as this will be either the separate submenu, or standalone menu name
-            parent_module_name = None
-            module_root = self.path.lower().split("source")[0]
-            for i in os.listdir(module_root):
-                if(i.endswith(".jplugin")):
-                    parent_module_name = i.split(".")[0]
-                    parent_module_name = juniper.utilities.string.snake_to_name(parent_module_name)
-                    parent_module_name = parent_module_name.rstrip()
-                    break
-
-            if(integration_type == "separate"):
-                # The "_" prefix is used to denote this is a separate section
-                output += "|_" + parent_module_name
-            elif(integration_type == "standalone"):
-                output = parent_module_name
-
-        return output
+        return self.catalog_entry.get("parent_category", "Juniper")
 
     @property
     def is_core(self):
@@ -262,24 +433,26 @@ class Script(object):
         return self.path.lower().split("source")
 
     @property
-    @functools.lru_cache()
+    def owner_root(self):
+        """
+        :return <str:root> The lowercase root directory of the plugin / module which owns this script
+        """
+        return self.path.lower().rpartition("\\source\\")[0]
+
+    @property
+    def catalog_entry(self):
+        """
+        :return <dict:entry> The entry for this script in the persistent script catalog
+        """
+        return juniper.engine.catalog.ScriptCatalog().get_entry(self.path) or {}
+
+    @property
     def metadata(self):
         """
         Reads the Juniper file metadata for this script
         :return <dict:data> The file metadata
         """
-        output = {}
-        if(os.path.isfile(self.path)):
-            with open(self.path, "r") as f:
-                for line in f.readlines():
-                    if(line.startswith(":")):
-                        key = line.split(" ", 1)[0].lower().lstrip(":")
-                        value = line.split(" ", 1)[1].rstrip("\n")
-                        if(key in output):
-                            output[key] += " " + value
-                        else:
-                            output[key] = value
-        return output
+        return self.catalog_entry.get("metadata", {})
 
     def get(self, key):
         """
@@ -299,12 +472,7 @@ class Script(object):
         """
         :return <[str]:callbacks> The names of all callbacks this script is bound to
         """
-        callbacks = []
-        if(self.get("callbacks")):
-            for i in self.get("callbacks").lstrip("[").rstrip("]").split(","):
-                callback_name = i.replace(" ", "").lower()
-                callbacks.append(callback_name)
-        return callbacks
+        return juniper.engine.catalog.parse_list(self.get("callbacks"))
 
     def is_bound_to_callback(self, callback_name):
         """
@@ -325,18 +493,9 @@ class Script(object):
         :return <bool:enabled> True if enabled - else False
         """
         target_host = target_host.lower()
-        supported_hosts = []
-        unsupported_hosts = []
-
-        if(self.get("supported_hosts")):
-            for i in self.get("supported_hosts").lstrip("[").rstrip("]").split(","):
-                host_name = i.replace(" ", "").lower()
-                supported_hosts.append(host_name)
-
-        if(self.get("unsupported_hosts")):
-            for i in self.get("unsupported_hosts").lstrip("[").rstrip("]").split(","):
-                host_name = i.replace(" ", "").lower()
-                unsupported_hosts.append(host_name)
+        catalog_entry = self.catalog_entry
+        supported_hosts = catalog_entry.get("supported_hosts", ())
+        unsupported_hosts = catalog_entry.get("unsupported_hosts", ())
 
         if(target_host not in unsupported_hosts):
             if(not supported_hosts or target_host in supported_hosts):
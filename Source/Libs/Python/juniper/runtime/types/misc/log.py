@@ -2,6 +2,56 @@ import sys
 import traceback as traceback_
 
 
+class FrameReference(object):
+    __slots__ = ("filename", "lineno", "name", "stack")
+
+    def __init__(self, frame, stack=False):
+        """
+        Lightweight reference to the location of a call - indexable in the same way as a `traceback.FrameSummary`
+        (0 = file name, 1 = line number, 2 = function name).
+        The frame itself is never kept (it would keep all locals of the call stack alive while the record is held)
+        :param <frame:frame> The frame of the call
+        :param [<bool:stack>] Should the full stack be formatted now? (only needed if `format_stack` is used)
+        """
+        self.filename = frame.f_code.co_filename
+        self.lineno = frame.f_lineno
+        self.name = frame.f_code.co_name
+        self.stack = None
+        if(stack):
+            summary = []
+            while(frame is not None):
+                summary.append((frame.f_code.co_filename, frame.f_lineno, frame.f_code.co_name, None))
+                frame = frame.f_back
+            self.stack = traceback_.format_list(traceback_.StackSummary.from_list(reversed(summary)))
+
+    def __getitem__(self, index):
+        return (self.filename, self.lineno, self.name)[index]
+
+    def __iter__(self):
+        return iter((self.filename, self.lineno, self.name))
+
+    def __repr__(self):
+        return f"FrameReference(\"{self.filename}\", line {self.lineno}, in {self.name})"
+
+    @classmethod
+    def capture(cls, depth=0, stack=False):
+        """
+        :param [<int:depth>] The number of frames above the caller to reference (Ie, 1 is the caller of the caller)
+        :param [<bool:stack>] Should the full stack be formatted? (only needed if `format_stack` is used)
+        :return <FrameReference:frame> The reference to the frame
+        """
+        return cls(sys._getframe(depth + 1), stack=stack)
+
+    def format_stack(self):
+        """
+        :return <[str]:lines> The formatted stack up to (and including) the referenced frame
+            Only the referenced frame if the stack was not captured
+        """
+        if(self.stack is not None):
+            return self.stack
+        return traceback_.format_list(traceback_.StackSummary.from_list([(self.filename, self.lineno, self.name, None)]))
+
+
 class _Colours(object):
     RED = "\033[1;31m"
     YELLOW = "\033[33m"
@@ -26,8 +76,8 @@ class log_class(object):
 
     def _log_traceback(self, log_text, context=None, logtype="Error", traceback=True, traceback_stack=None):
         context = self._ensure_context(context)
-        if(not traceback_stack):
-            traceback_stack = traceback_.extract_stack()[-3]
+        if(traceback and not traceback_stack):
+            traceback_stack = FrameReference.capture(2)  # the caller of `error` / `warning`
         if(traceback):
             print(f"{context} ({logtype.upper()}):  File \"{traceback_stack[0]}\", line {traceback_stack[1]}")
             print(f"  \"{log_text}\"")
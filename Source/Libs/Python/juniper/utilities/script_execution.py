@@ -2,7 +2,6 @@
 Utility functions for executing various script/tool files
 """
 import os
-from importlib.machinery import SourceFileLoader
 
 import juniper.engine.paths
 import juniper.utilities.json as json_utils
@@ -39,12 +38,15 @@ def run_file(file_path, plugin=None):
             globals_["__package__"] = os.path.dirname(file_path)
             globals_["__name__"] = "__main__"
             juniper_globals.set("__juniper_exec_file_path__", file_path)
-            exec(open(file_path).read(), globals_)
+            import juniper.engine.bytecode
+            juniper.engine.bytecode.BytecodeCache().exec_file(file_path, globals_)
 
 
 def load_source(module_name, module_path):
     """
     Wrapper for the old 'imp.load_source' method using new method
+    The code object is loaded from the juniper bytecode cache
     :return <Module:module> The loaded module
     """
-    return SourceFileLoader(module_name, module_path).load_module()
+    import juniper.engine.bytecode
+    return juniper.engine.bytecode.CachedSourceFileLoader(module_name, module_path).load_module()
@@ -0,0 +1,32 @@
+"""
+Library containing micro benchmarks for various parts of the Juniper engine
+Each benchmark module exposes a `run` function which prints and returns its timings
+"""
+import time
+
+
+def time_function(func, *args, repeat=1, **kwargs):
+    """
+    Times a function call
+    :param <func:func> The function to time
+    :param [<int:repeat>] The number of times to call the function - the fastest time is returned
+    :return <float:seconds> The fastest duration of all calls in seconds
+    """
+    output = None
+    for _ in range(repeat):
+        start_time = time.perf_counter()
+        func(*args, **kwargs)
+        duration = time.perf_counter() - start_time
+        output = duration if output is None else min(output, duration)
+    return output
+
+
+def print_results(title, results):
+    """
+    Prints the results of a benchmark
+    :param <str:title> The title of the benchmark
+    :param <dict:results> Dict of result name -> duration in seconds
+    """
+    print(f"{title}:")
+    for name, duration in results.items():
+        print(f"  {name}: {duration * 1000:.2f}ms")
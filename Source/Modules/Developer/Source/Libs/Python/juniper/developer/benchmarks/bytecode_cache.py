@@ -0,0 +1,71 @@
+"""
+Benchmark comparing running a tool from source against running it from the bytecode cache
+"""
+import os
+import shutil
+import tempfile
+
+import juniper.engine.bytecode
+import juniper.developer.benchmarks
+
+
+def create_tool(directory, num_functions=2000):
+    """
+    Creates a synthetic "heavy" tool script
+    :param <str:directory> The directory to create the tool in
+    :param [<int:num_functions>] The number of functions defined in the tool
+    :return <str:path> The path to the tool
+    """
+    output = os.path.join(directory, "heavy_tool.py")
+    with open(output, "w") as f:
+        for i in range(num_functions):
+            f.write(f"def function_{i}(a, b):\n")
+            f.write(f"    values = [a * x + b for x in range({i % 10 + 1})]\n")
+            f.write(f"    return {{\"name\": \"function_{i}\", \"values\": values}}\n\n")
+    return output
+
+
+def run_from_source(file_path):
+    with open(file_path, "r") as f:
+        exec(f.read(), {"__name__": "__main__"})
+
+
+def run_from_disk_cache(file_path):
+    cache = juniper.engine.bytecode.BytecodeCache()
+    cache.clear()  # only the persisted bytecode is used (Ie, first run in a new session)
+    cache.exec_file(file_path, {"__name__": "__main__"})
+
+
+def run_from_memory_cache(file_path):
+    juniper.engine.bytecode.BytecodeCache().exec_file(file_path, {"__name__": "__main__"})
+
+
+def run(num_functions=2000, repeat=5):
+    """
+    Runs the benchmark
+    :param [<int:num_functions>] The number of functions defined in the synthetic tool
+    :param [<int:repeat>] The number of times each run is timed - the fastest time is used
+    :return <dict:results> Dict of run mode -> duration in seconds
+    """
+    directory = tempfile.mkdtemp(prefix="juniper_benchmark_")
+    try:
+        tool_path = create_tool(directory, num_functions=num_functions)
+        juniper.engine.bytecode.BytecodeCache().get_code(tool_path)  # first click - compiles and persists
+
+        results = {
+            "source": juniper.developer.benchmarks.time_function(run_from_source, tool_path, repeat=repeat),
+            "bytecode cache (new session)": juniper.developer.benchmarks.time_function(
+                run_from_disk_cache, tool_path, repeat=repeat
+            ),
+            "bytecode cache (same session)": juniper.developer.benchmarks.time_function(
+                run_from_memory_cache, tool_path, repeat=repeat
+            ),
+        }
+
+        juniper.developer.benchmarks.print_results(f"Run tool ({num_functions} functions)", results)
+        return results
+    finally:
+        cache_path = juniper.engine.bytecode.BytecodeCache().cache_path(tool_path)
+        if(os.path.isfile(cache_path)):
+            os.remove(cache_path)
+        shutil.rmtree(directory, ignore_errors=True)
@@ -0,0 +1,100 @@
+"""
+Benchmark comparing the import time of the `juniper` library tree with and without the host override index
+
+Each import pass is ran in a new python process so every module is imported from a clean `sys.modules`
+"""
+import os
+import subprocess
+import sys
+
+import juniper.engine.override
+import juniper.engine.paths
+import juniper.developer.benchmarks
+
+
+IMPORT_SCRIPT = """
+import importlib, os, sys, time
+sys.path.insert(0, {libs_dir!r})
+import juniper.engine.override
+
+class ProbingImportHook(juniper.engine.override.JuniperImportHook):
+    # stand in for the previous hook - every juniper import is claimed and the host directory is probed
+    probes = 0
+
+    def find_spec(self, full_name, path=None, target=None):
+        if(not full_name.startswith("juniper")):
+            return None
+        for finder in sys.meta_path:
+            if(finder is not self and hasattr(finder, "find_spec")):
+                spec = finder.find_spec(full_name, path, target)
+                if(spec is not None):
+                    if(spec.origin):
+                        ProbingImportHook.probes += 1
+                        os.path.isfile(spec.origin.replace({root!r}, os.path.join({root!r}, "Source", "Hosts", {host!r})))
+                    return spec
+        return None
+
+start_time = time.perf_counter()
+if({mode!r} == "override index"):
+    juniper.engine.override.JuniperImportHook(host={host!r}, workspace_root={root!r})
+elif({mode!r} == "probing"):
+    ProbingImportHook(host={host!r}, workspace_root={root!r})
+for name in {module_names!r}:
+    try:
+        importlib.import_module(name)
+    except Exception:
+        pass
+print(time.perf_counter() - start_time, ProbingImportHook.probes)
+"""
+
+
+def get_library_module_names(libs_dir):
+    """
+    :param <str:libs_dir> The python library directory (Ie, "Source\\Libs\\Python")
+    :return <[str]:names> The names of all modules in the `juniper` package
+    """
+    output = []
+    for root, directories, files in os.walk(os.path.join(libs_dir, "juniper")):
+        directories[:] = [x for x in directories if x != "__pycache__"]
+        for file_name in files:
+            if(file_name.endswith(".py")):
+                relative_path = os.path.relpath(os.path.join(root, file_name), os.path.dirname(libs_dir))
+                module_name = juniper.engine.override.get_module_name(os.path.join("Libs", relative_path))
+                if(module_name):
+                    output.append(module_name)
+    return sorted(output)
+
+
+def time_import(mode, libs_dir, root, host, module_names):
+    """
+    Imports all modules in a new python process
+    :param <str:mode> The import hook to install ("none", "probing" or "override index")
+    :return <(float, int):result> The duration of the imports in seconds and the number of host directory probes
+    """
+    script = IMPORT_SCRIPT.format(libs_dir=libs_dir, root=root, host=host, mode=mode, module_names=module_names)
+    output = subprocess.check_output([sys.executable, "-c", script], cwd=os.path.dirname(libs_dir))
+    duration, probes = output.decode().strip().splitlines()[-1].split()
+    return float(duration), int(probes)
+
+
+def run(host="Max", repeat=5):
+    """
+    Runs the benchmark
+    :param [<str:host>] The name of the host whose overrides are indexed
+    :param [<int:repeat>] The number of import passes for each mode - the fastest time is used
+    :return <dict:results> Dict of import hook -> duration in seconds
+    """
+    root = juniper.engine.paths.root()
+    libs_dir = os.path.join(root, "Source\\Libs\\Python")
+    module_names = get_library_module_names(libs_dir)
+
+    results = {}
+    probes = {}
+    for mode in ("none", "probing", "override index"):
+        timings = [time_import(mode, libs_dir, root, host, module_names) for _ in range(repeat)]
+        results[mode] = min(x[0] for x in timings)
+        probes[mode] = timings[0][1]
+
+    juniper.developer.benchmarks.print_results(f"Import juniper ({len(module_names)} modules, host {host})", results)
+    print(f"  host directory probes: {probes}")
+    return results
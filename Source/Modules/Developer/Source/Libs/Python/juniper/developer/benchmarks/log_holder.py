@@ -0,0 +1,53 @@
+"""
+Benchmark for a burst of log entry popups - comparing the pooled log holder against creating a widget per entry
+Should be run outside of a host with "QT_QPA_PLATFORM=offscreen" (set by `run` if no QApplication exists)
+"""
+import os
+
+import juniper.developer.benchmarks
+
+
+def add_pooled_entries(holder, num_entries):
+    for i in range(num_entries):
+        holder.add_entry(f"Failed to export asset {i}", "Warning", "Benchmark")
+
+
+def add_unpooled_entries(parent, num_entries):
+    from juniper.engine.logging.widgets import q_log_entry
+    entries = []
+    for i in range(num_entries):
+        entry = q_log_entry.QLogEntry(f"Failed to export asset {i}", "Warning", "Benchmark")
+        parent.layout().addWidget(entry)
+        entries.append(entry)
+    return entries
+
+
+def run(num_entries=10000):
+    """
+    Runs the benchmark
+    :param [<int:num_entries>] The number of log entries in the burst
+    :return <dict:results> Dict of run mode -> duration in seconds
+    """
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    from qtpy import QtWidgets
+    from juniper.engine.logging.widgets import q_log_holder
+
+    app = QtWidgets.QApplication.instance() or QtWidgets.QApplication([])
+
+    holder = q_log_holder.QLogHolder()
+    unpooled_parent = QtWidgets.QWidget()
+    unpooled_parent.setLayout(QtWidgets.QVBoxLayout())
+
+    results = {
+        "pooled": juniper.developer.benchmarks.time_function(add_pooled_entries, holder, num_entries),
+        "widget per entry": juniper.developer.benchmarks.time_function(add_unpooled_entries, unpooled_parent, num_entries)
+    }
+    app.processEvents()
+
+    juniper.developer.benchmarks.print_results(f"Show {num_entries} log entries", results)
+    print(f"  pooled: {len(holder.children)} visible entries, +{holder.overflow_count} more")
+
+    holder.deleteLater()
+    unpooled_parent.deleteLater()
+    app.processEvents()
+    return results
@@ -0,0 +1,71 @@
+"""
+Benchmark comparing writing log records on the calling thread against queueing them for the log writer thread
+"""
+import contextlib
+import os
+import shutil
+import tempfile
+
+import juniper.engine.logging.pipeline
+import juniper.runtime.types.misc.log
+import juniper.developer.benchmarks
+
+
+def create_writer(directory, num_records, asynchronous):
+    """
+    :param <str:directory> The directory to write the log file to
+    :param <int:num_records> The number of records which will be logged - the queue is sized to hold them all
+    :param <bool:asynchronous> Should records be written from the writer thread?
+    :return <LogWriter:writer> A log writer with a console and a JSONL file sink
+    """
+    return juniper.engine.logging.pipeline.LogWriter(
+        [
+            juniper.engine.logging.pipeline.ConsoleSink(),
+            juniper.engine.logging.pipeline.RotatingJsonlSink(os.path.join(directory, "benchmark.jsonl"))
+        ],
+        max_queue_size=num_records,
+        asynchronous=asynchronous
+    )
+
+
+def log_records(writer, num_records):
+    log_func = juniper.runtime.types.misc.log.log.info
+    for i in range(num_records):
+        writer.write(juniper.engine.logging.pipeline.LogRecord("Info", f"Processed asset {i}", "Benchmark", log_func=log_func))
+
+
+def log_records_and_flush(writer, num_records):
+    log_records(writer, num_records)
+    writer.flush()
+
+
+def run(num_records=100000):
+    """
+    Runs the benchmark - console output is redirected to `os.devnull` so the results are the best case for the console
+    :param [<int:num_records>] The number of records to log
+    :return <dict:results> Dict of run mode -> duration in seconds
+    """
+    directory = tempfile.mkdtemp(prefix="juniper_benchmark_")
+    try:
+        with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+            synchronous_writer = create_writer(directory, num_records, False)
+            asynchronous_writer = create_writer(directory, num_records, True)
+            results = {
+                "synchronous": juniper.developer.benchmarks.time_function(
+                    log_records, synchronous_writer, num_records
+                ),
+                "asynchronous (calling thread)": juniper.developer.benchmarks.time_function(
+                    log_records, asynchronous_writer, num_records
+                ),
+            }
+            asynchronous_writer.flush()
+            results["asynchronous (until written)"] = juniper.developer.benchmarks.time_function(
+                log_records_and_flush, asynchronous_writer, num_records
+            )
+            synchronous_writer.close()
+            asynchronous_writer.close()
+
+        juniper.developer.benchmarks.print_results(f"Log {num_records} records", results)
+        return results
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
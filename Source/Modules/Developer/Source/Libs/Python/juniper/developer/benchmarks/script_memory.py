@@ -0,0 +1,80 @@
+"""
+Benchmark measuring the memory footprint of the script registry
+"""
+import gc
+import os
+import shutil
+import tempfile
+import tracemalloc
+
+import juniper.engine.catalog
+import juniper.engine.types.script
+import juniper.developer.benchmarks.script_metadata
+
+
+class LegacyScript(object):
+    def __init__(self, script_path):
+        """
+        Equivalent of the original `Script` record - a `__dict__` based object which holds its own
+        copy of the metadata (as cached by the `lru_cache` on the original `metadata` property)
+        """
+        self.path = script_path.lower()
+        self.metadata = juniper.developer.benchmarks.script_metadata.read_metadata_legacy(script_path)
+
+
+def measure(factory, script_paths):
+    """
+    Measures the memory allocated when creating records for a list of scripts
+    :param <func:factory> Function called to create a record for each script path
+    :param <[str]:script_paths> The paths to create records for
+    :return <(int, list):result> The number of bytes allocated and the created records
+    """
+    gc.collect()
+    tracemalloc.start()
+    records = [factory(x) for x in script_paths]
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return size, records
+
+
+def run(num_scripts=10000):
+    """
+    Runs the benchmark
+    :param [<int:num_scripts>] The number of synthetic scripts to create records for
+    :return <dict:results> Dict of record type -> bytes allocated
+    """
+    directory = tempfile.mkdtemp(prefix="juniper_benchmark_")
+    try:
+        tools_dir = os.path.join(directory, "benchmark_plugin", "source", "tools")
+        os.makedirs(tools_dir)
+        script_paths = juniper.developer.benchmarks.script_metadata.create_scripts(
+            tools_dir,
+            num_scripts=num_scripts,
+            body_lines=10
+        )
+
+        legacy_size, legacy_records = measure(LegacyScript, script_paths)
+        del legacy_records
+
+        # the catalog entries (metadata, host filters, categories) are shared by all records for a path
+        catalog_size, _ = measure(juniper.engine.catalog.ScriptCatalog().get_entry, script_paths)
+        script_size, script_records = measure(juniper.engine.types.script.Script, script_paths)
+
+        results = {
+            "legacy records (__dict__ + metadata copy)": legacy_size,
+            "script catalog entries": catalog_size,
+            "Script records (__slots__)": script_size,
+        }
+
+        print(f"Script memory ({num_scripts} scripts):")
+        for name, size in results.items():
+            print(f"  {name}: {size / 1024 / 1024:.2f}MB ({size / num_scripts:.0f} bytes per script)")
+
+        # records which are no longer referenced are released from the weak registry
+        del script_records
+        gc.collect()
+        assert juniper.engine.types.script.ScriptManager().find_from_path(script_paths[0]) is None
+
+        return results
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
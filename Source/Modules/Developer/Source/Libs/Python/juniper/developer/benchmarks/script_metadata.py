@@ -0,0 +1,95 @@
+"""
+Benchmark comparing the header-only metadata parser against the legacy whole-file reader
+"""
+import os
+import shutil
+import tempfile
+
+import juniper.engine.types.script
+import juniper.developer.benchmarks
+
+
+SCRIPT_HEADER = '''"""
+:type tool
+:category Benchmark|Group {group}
+:summary Synthetic tool {index} used for benchmarking
+:supported_hosts [max, unreal]
+:callbacks [startup]
+"""
+'''
+
+
+def read_metadata_legacy(script_path):
+    """
+    The original metadata reader - reads and tests every line in the file
+    :param <str:script_path> The path to the script
+    :return <dict:data> The file metadata
+    """
+    output = {}
+    if(os.path.isfile(script_path)):
+        with open(script_path, "r") as f:
+            for line in f.readlines():
+                if(line.startswith(":")):
+                    key = line.split(" ", 1)[0].lower().lstrip(":")
+                    value = line.split(" ", 1)[1].rstrip("\n")
+                    if(key in output):
+                        output[key] += " " + value
+                    else:
+                        output[key] = value
+    return output
+
+
+def create_scripts(directory, num_scripts=5000, body_lines=2000):
+    """
+    Creates a set of synthetic scripts
+    :param <str:directory> The directory to create the scripts in
+    :param [<int:num_scripts>] The number of scripts to create
+    :param [<int:body_lines>] The number of lines of code in the body of each script
+    :return <[str]:paths> The paths to all created scripts
+    """
+    output = []
+    body = "".join(f"value_{i} = {i}  # synthetic line of code\n" for i in range(body_lines))
+    for i in range(num_scripts):
+        script_path = os.path.join(directory, f"tool_{i}.py")
+        with open(script_path, "w") as f:
+            f.write(SCRIPT_HEADER.format(index=i, group=i % 20))
+            f.write(body)
+        output.append(script_path)
+    return output
+
+
+def run(num_scripts=5000, body_lines=2000, repeat=3):
+    """
+    Runs the benchmark
+    :param [<int:num_scripts>] The number of synthetic scripts to parse
+    :param [<int:body_lines>] The number of lines of code in the body of each script
+    :param [<int:repeat>] The number of times each reader is ran - the fastest time is used
+    :return <dict:results> Dict of reader name -> duration in seconds
+    """
+    directory = tempfile.mkdtemp(prefix="juniper_benchmark_")
+    try:
+        script_paths = create_scripts(directory, num_scripts=num_scripts, body_lines=body_lines)
+
+        # sanity check that both readers agree
+        for i in script_paths[:10]:
+            assert read_metadata_legacy(i) == juniper.engine.types.script.parse_metadata(i)
+
+        def run_reader(reader):
+            for i in script_paths:
+                reader(i)
+
+        results = {
+            "legacy (readlines)": juniper.developer.benchmarks.time_function(
+                run_reader, read_metadata_legacy, repeat=repeat
+            ),
+            "header only (streamed)": juniper.developer.benchmarks.time_function(
+                run_reader, juniper.engine.types.script.parse_metadata, repeat=repeat
+            ),
+            "header only (shared cache)": juniper.developer.benchmarks.time_function(
+                run_reader, juniper.engine.types.script.read_metadata, repeat=repeat
+            ),
+        }
+        juniper.developer.benchmarks.print_results(f"Script metadata ({num_scripts} scripts)", results)
+        return results
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
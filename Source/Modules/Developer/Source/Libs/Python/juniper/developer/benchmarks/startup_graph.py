@@ -0,0 +1,84 @@
+"""
+Benchmark comparing serial plugin startup against the dependency aware startup graph
+"""
+import json
+import os
+import shutil
+import tempfile
+import time
+
+import juniper.engine.startup
+import juniper.developer.benchmarks
+
+
+class SyntheticPlugin(object):
+    def __init__(self, directory, index, dependencies, thread_safe, io_latency):
+        """
+        Plugin stand in whose startup does a small amount of I/O bound work (config read / cache write)
+        :param <str:directory> The directory to write the plugins files to
+        :param <int:index> The index of the plugin
+        :param <[str]:dependencies> The names of the plugins this plugin depends on
+        :param <bool:thread_safe> Can the startup hooks be ran off the main thread?
+        :param <float:io_latency> Additional time in seconds each hook blocks for (Ie, network drives)
+        """
+        self.name = f"plugin_{index}"
+        self.root = os.path.join(directory, self.name)
+        self.dependencies = dependencies
+        self.thread_safe = thread_safe
+        self.io_latency = io_latency
+        self.started = False
+
+        os.makedirs(self.root)
+        with open(os.path.join(self.root, "config.json"), "w") as f:
+            json.dump({"name": self.name, "values": list(range(256))}, f)
+
+    def on_startup(self):
+        with open(os.path.join(self.root, "config.json"), "r") as f:
+            json_data = json.load(f)
+        time.sleep(self.io_latency)
+        with open(os.path.join(self.root, "cache.json"), "w") as f:
+            json.dump(json_data, f)
+        self.started = True
+
+
+def create_plugins(directory, num_plugins=50, io_latency=0.01):
+    """
+    Creates a set of synthetic plugins - every 5th plugin depends on the plugin before it,
+    and every 4th plugin touches the host API (so must run on the main thread)
+    :param <str:directory> The directory to create the plugins in
+    :param [<int:num_plugins>] The number of plugins to create
+    :param [<float:io_latency>] Additional time in seconds each startup hook blocks for
+    :return <[SyntheticPlugin]:plugins> The created plugins
+    """
+    output = []
+    for i in range(num_plugins):
+        dependencies = [f"plugin_{i - 1}"] if i and i % 5 == 0 else []
+        output.append(SyntheticPlugin(directory, i, dependencies, i % 4 != 0, io_latency))
+    return output
+
+
+def run(num_plugins=50, io_latency=0.01, repeat=3):
+    """
+    Runs the benchmark
+    :param [<int:num_plugins>] The number of synthetic plugins
+    :param [<float:io_latency>] Additional time in seconds each startup hook blocks for
+    :param [<int:repeat>] The number of times each startup is ran - the fastest time is used
+    :return <dict:results> Dict of startup mode -> duration in seconds
+    """
+    directory = tempfile.mkdtemp(prefix="juniper_benchmark_")
+    try:
+        plugins = create_plugins(directory, num_plugins=num_plugins, io_latency=io_latency)
+
+        serial_graph = juniper.engine.startup.StartupGraph(plugins, parallel=False)
+        parallel_graph = juniper.engine.startup.StartupGraph(plugins, parallel=True)
+
+        results = {
+            "serial": juniper.developer.benchmarks.time_function(serial_graph.run, "on_startup", repeat=repeat),
+            "startup graph": juniper.developer.benchmarks.time_function(parallel_graph.run, "on_startup", repeat=repeat),
+        }
+        assert all(x.started for x in plugins)
+
+        juniper.developer.benchmarks.print_results(f"Plugin startup ({num_plugins} plugins)", results)
+        return results
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
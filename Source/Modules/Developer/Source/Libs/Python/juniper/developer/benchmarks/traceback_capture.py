@@ -0,0 +1,56 @@
+"""
+Benchmark comparing capturing the location of a log call with `traceback.extract_stack` against a `FrameReference`
+"""
+import traceback
+
+import juniper.runtime.types.misc.log
+import juniper.developer.benchmarks
+
+
+def call_at_depth(depth, func, *args):
+    """
+    Calls a function with a number of additional frames on the stack (Ie, a tool called from a deep UI callback)
+    :param <int:depth> The number of frames to add
+    :param <func:func> The function to call
+    """
+    if(depth > 0):
+        return call_at_depth(depth - 1, func, *args)
+    return func(*args)
+
+
+def capture_extract_stack(num_calls):
+    for _ in range(num_calls):
+        traceback.extract_stack()[-2]
+
+
+def capture_frame_reference(num_calls):
+    for _ in range(num_calls):
+        juniper.runtime.types.misc.log.FrameReference.capture(1)
+
+
+def capture_frame_reference_and_format(num_calls):
+    for _ in range(num_calls):
+        juniper.runtime.types.misc.log.FrameReference.capture(1, stack=True).format_stack()
+
+
+def run(num_calls=10000, stack_depth=30, repeat=3):
+    """
+    Runs the benchmark
+    :param [<int:num_calls>] The number of locations captured (Ie, warnings logged)
+    :param [<int:stack_depth>] The number of frames on the stack when capturing
+    :param [<int:repeat>] The number of times each run is timed - the fastest time is used
+    :return <dict:results> Dict of capture method -> duration in seconds
+    """
+    results = {
+        "traceback.extract_stack": juniper.developer.benchmarks.time_function(
+            call_at_depth, stack_depth, capture_extract_stack, num_calls, repeat=repeat
+        ),
+        "FrameReference": juniper.developer.benchmarks.time_function(
+            call_at_depth, stack_depth, capture_frame_reference, num_calls, repeat=repeat
+        ),
+        "FrameReference + format_stack": juniper.developer.benchmarks.time_function(
+            call_at_depth, stack_depth, capture_frame_reference_and_format, num_calls, repeat=repeat
+        ),
+    }
+    juniper.developer.benchmarks.print_results(f"Capture {num_calls} call locations (stack depth {stack_depth})", results)
+    return results
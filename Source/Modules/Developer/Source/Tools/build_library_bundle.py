@@ -0,0 +1,21 @@
+"""
+:type tool
+:category Developer
+:summary Builds the library bundle for the current host - used in place of the loose library directories on the next launch
+"""
+import juniper
+import juniper.engine
+import juniper.bootstrap.bundle as bundle
+
+
+engine = juniper.engine.JuniperEngine()
+workspace_root = engine.workspace_root
+library_dirs = bundle.get_library_dirs(workspace_root, juniper.program_context)
+fingerprint = bundle.get_library_fingerprint(workspace_root, library_dirs)
+library_files = bundle.get_library_files(library_dirs)
+bundle_path = bundle.get_bundle_path(workspace_root, juniper.program_context, bundle.get_content_hash(library_files))
+
+if(bundle.LibraryBundle.build(bundle_path, library_dirs, fingerprint, library_files=library_files) is not None):
+    juniper.log.success(f"Built library bundle ({len(library_files)} files): {bundle_path}", silent=True)
+else:
+    juniper.log.error(f"Failed to build library bundle: {bundle_path}", silent=True)
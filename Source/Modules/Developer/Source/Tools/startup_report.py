@@ -0,0 +1,13 @@
+"""
+:type tool
+:category Developer
+:summary Prints the slowest startup phases for the current host, and any regressions against previous sessions
+"""
+import juniper
+import juniper.engine
+import juniper.engine.profiling
+
+
+juniper.engine.profiling.print_report(
+    juniper.engine.profiling.get_history_path(juniper.engine.JuniperEngine().workspace_root, juniper.program_context)
+)
@@ -0,0 +1,9 @@
+"""
+:type tool
+:category Developer
+:summary Prints the frame time stats (p50 / p95 / max) for each tick subscriber in the current host
+"""
+import juniper.engine.tick
+
+
+juniper.engine.tick.TickScheduler().dump_stats()
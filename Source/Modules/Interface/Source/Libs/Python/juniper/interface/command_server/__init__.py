@@ -1,6 +1,7 @@
 """
 Base module for the Juniper Command Server plugin
 """
+import json
 import socket
 import textwrap
 
@@ -57,3 +58,38 @@ def run_file(file_path, program_name):
         client.close()
         return True
     return False
+
+
+def query_log(program_name, timeout=5.0, **filters):
+    """
+    Queries the in-memory log buffer of a program (see `juniper.engine.logging.ring_buffer.LogBuffer.query`)
+    :param <str:program_name> The name of the program context to query
+    :param [<float:timeout>] The maximum number of seconds to wait for the reply
+    :param [<kwargs:filters>] The query filters (Ie, levels=["Error"], search="export")
+    :return <[dict]:records> The matching records - None if the program could not be queried
+    """
+    port = listen_port(program_name)
+    if(not juniper.interface.command_server.command_server.is_free(port)):
+        command = textwrap.dedent(f"""
+            import json
+            import juniper.engine.logging.ring_buffer
+            reply(json.dumps(juniper.engine.logging.ring_buffer.LogBuffer().query(**{filters!r})))
+        """)
+        client = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        client.settimeout(timeout)
+        try:
+            client.connect(("localhost", port))
+            client.sendall(str(command).encode("utf-8"))
+            data = []
+            while(True):
+                chunk = client.recv(65536)
+                if(not chunk):
+                    break
+                data.append(chunk)
+        except OSError:
+            return None
+        finally:
+            client.close()
+        if(data):
+            return json.loads(b"".join(data).decode("utf-8"))
+    return None
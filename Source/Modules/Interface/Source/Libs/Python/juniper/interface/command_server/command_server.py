@@ -1,4 +1,5 @@
 import contextlib
+import functools
 import os
 import select
 import socket
@@ -13,6 +14,17 @@ import juniper_globals
 import juniper.interface.command_server
 
 
+@functools.lru_cache(maxsize=64)
+def compile_command(data):
+    """
+    Compiles a received command - commands are generated from a small set of templates (Ie, running a tool)
+    so repeated commands reuse the same code object
+    :param <str:data> The command source
+    :return <code:code> The compiled code object
+    """
+    return compile(data, "-", "exec")
+
+
 def is_free(port):
     """
     Returns whether a port is free
@@ -88,9 +100,12 @@ class CommandServer(metaclass=juniper.runtime.types.framework.singleton.Singleto
     def tick(self):
         """
         Update the listen server and check for calls
+        :return <bool:active> True if any commands were received - else False
         """
+        output = False
         if(self.initialized):
-            readable, writable, errored = select.select(self.read_list, [], [])
+            # zero timeout - the tick scheduler must never block the host
+            readable, writable, errored = select.select(self.read_list, [], [], 0)
             for s in readable:
                 if(s is self.server_socket):
                     client_socket, address = self.server_socket.accept()
@@ -99,7 +114,38 @@ class CommandServer(metaclass=juniper.runtime.types.framework.singleton.Singleto
                     # NOTE: We may need to up the size if we end up sending large scripts to run
                     data = (s.recv(1024)).decode("utf-8")
                     if(data):
+                        output = True
+                        replied = []
                         try:
-                            exec(compile(data, "-", "exec"))
+                            exec(compile_command(data), globals(), {"reply": functools.partial(self.reply, s, replied)})
                         except Exception:
                             pass
+                        if(replied):
+                            self.__close_client(s)
+                    else:
+                        self.__close_client(s)  # the client has disconnected
+        return output
+
+    def reply(self, client_socket, replied, data):
+        """
+        Sends a reply to the client which sent the current command - the connection is closed once the command has run
+        Commands call this as `reply(data)`
+        :param <socket:client_socket> The socket of the client
+        :param <list:replied> List the reply is recorded in
+        :param <str:data> The data to send
+        """
+        client_socket.settimeout(5.0)  # replies can be larger than the socket buffer
+        client_socket.sendall(str(data).encode("utf-8"))
+        replied.append(True)
+
+    def __close_client(self, client_socket):
+        """
+        Closes a client connection
+        :param <socket:client_socket> The socket of the client
+        """
+        if(client_socket in self.read_list):
+            self.read_list.remove(client_socket)
+        try:
+            client_socket.close()
+        except OSError:
+            pass
@@ -19,7 +19,7 @@ class ConfigManager(object, metaclass=juniper.runtime.types.framework.singleton.
         """Gets the juniper_tree.json path for juniper tree"""
         tree_plugin = None
         for i in juniper.engine.JuniperEngine().modules:
-            if(type(i).__name__ == "JuniperInterface"):
+            if(i.name == "JuniperInterface"):
                 tree_plugin = i
         return os.path.join(
             tree_plugin.root,
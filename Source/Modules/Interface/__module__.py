@@ -15,6 +15,8 @@ import juniper.engine.types.module
 
 
 class JuniperInterface(juniper.engine.types.module.Module):
+    tick_rate = 30  # command server poll rate
+
     def on_startup(self):
         import juniper
         import juniper.runtime.widgets
@@ -53,4 +55,4 @@ class JuniperInterface(juniper.engine.types.module.Module):
 
     def on_tick(self):
         import juniper.interface.command_server.command_server
-        juniper.interface.command_server.command_server.CommandServer().tick()
+        return juniper.interface.command_server.command_server.CommandServer().tick()